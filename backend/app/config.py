@@ -9,6 +9,16 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./database/kitchenhelper.db"
+    # SQLite Tuning: "tuned" = WAL + synchronous=NORMAL + mmap/Cache, "default" = SQLite-Defaults
+    SQLITE_PROFILE: str = "tuned"
+    SQLITE_CACHE_SIZE_KB: int = 16384  # Page-Cache pro Verbindung
+    SQLITE_MMAP_SIZE_MB: int = 64
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Auf Schreib-Lock warten statt "database is locked"
+    # PostgreSQL (DATABASE_URL=postgresql://...): Connection Pool pro Prozess
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Verbindungen vor Server-/Proxy-Timeouts erneuern
 
     # JWT
     JWT_SECRET_KEY: str = "your-super-secret-key-CHANGE-THIS-IN-PRODUCTION"
@@ -28,6 +38,29 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.0-flash-exp"
     OLLAMA_BASE_URL: str = "http://localhost:11434"  # Local Ollama
     OLLAMA_MODEL: str = "llama3.2"
+    OLLAMA_MAX_CONCURRENT: int = 2  # Gleichzeitige Generierungen (Pi-Schutz)
+    OLLAMA_QUEUE_SIZE: int = 20  # Wartende Anfragen, danach 429
+    GEMINI_MAX_CONCURRENT: int = 10  # Gleichzeitige Gemini-Anfragen (PRO)
+    GEMINI_QUEUE_SIZE: int = 50
+    AI_SLOT_BACKEND: str = "sqlite"  # "sqlite" = Slots über alle uvicorn-Worker geteilt, "local" = pro Prozess
+    AI_SLOT_DB: str = "./database/ai_slots.db"
+
+    # Nutrition (OpenFoodFacts Cache)
+    NUTRITION_CACHE_DB: str = "./database/nutrition_cache.db"
+    NUTRITION_CACHE_TTL_DAYS: int = 30  # Gefundene Produkte
+    NUTRITION_CACHE_NEGATIVE_TTL_HOURS: int = 24  # "Nicht gefunden" merken
+
+    # AI Generation Cache (identische Anfragen → kein neuer LLM-Lauf)
+    GENERATION_CACHE_TTL_MINUTES: int = 60
+    GENERATION_CACHE_SIZE: int = 256
+
+    # User Cache (angemeldeter User pro Request ohne SELECT, 0 = aus)
+    USER_CACHE_TTL_SECONDS: int = 30  # Writes anderer Worker/Nodes sind spätestens dann sichtbar
+    USER_CACHE_SIZE: int = 4096
+
+    # Startup: schwere Services (PDF, E-Mail, Stripe) nach dem Start im Hintergrund laden
+    SERVICE_WARMUP: bool = True
+    SERVICE_WARMUP_DELAY_SECONDS: float = 2.0
 
     # Email (Resend.com)
     RESEND_API_KEY: str = ""  # Resend API Key (get from resend.com)
@@ -1,9 +1,11 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from app.config import settings
-from app.utils.database import init_db
+from app.utils.auth import require_admin
+from app.utils.database import async_engine, init_db
 from app.routes import (
     auth,
     users,
@@ -24,9 +26,13 @@ from app.routes import (
     stripe_routes,
 )
 from app.middleware.logger import APIRequestLoggerMiddleware
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.admission import AdmissionRejected
+from app.middleware.rate_limit import RateLimitMiddleware, admission_controller
 from app.middleware.email_verification import EmailVerificationMiddleware
 from app.middleware.https_redirect import HTTPSRedirectMiddleware
+from app.services.ai_recipe_generator import ai_generator
+from app.services.service_registry import services
+import asyncio
 import os
 
 app = FastAPI(
@@ -35,6 +41,16 @@ app = FastAPI(
     version=settings.APP_VERSION,
 )
 
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """AI-Queue voll → 429 mit ETA + Retry-After"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # Security Headers Middleware
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -97,11 +113,31 @@ app.include_router(stripe_routes.router, prefix="/api")
 
 # Startup Event
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     init_db()
+    # AI-Slot-Pools anlegen (SQLite-Slot-DB erst hier, nicht beim Import)
+    await admission_controller.start()
+    # AI-Provider im Hintergrund prüfen + Ollama-Modell warm halten (blockiert den Start nicht)
+    ai_generator.start_background_tasks()
+    # PDF/E-Mail/Stripe vorwärmen, nachdem die App Anfragen annimmt
+    if settings.SERVICE_WARMUP:
+        app.state.warmup_task = asyncio.create_task(
+            services.warm(delay_seconds=settings.SERVICE_WARMUP_DELAY_SECONDS)
+        )
     print(f"[OK] {settings.APP_NAME} v{settings.APP_VERSION} started!")
 
 
+# Shutdown Event
+@app.on_event("shutdown")
+async def shutdown_event():
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None:
+        warmup_task.cancel()
+    # Keep-Alive Verbindungen zu Gemini/Ollama sauber schließen
+    await ai_generator.aclose()
+    await async_engine.dispose()
+
+
 @app.get("/")
 def read_root():
     return {
@@ -115,3 +151,32 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/health/services")
+def services_status():
+    """Lazy Services: schon gebaut? Build-Dauer, letzter Fehler"""
+    return services.status()
+
+
+@app.get("/health/ai")
+async def ai_slots():
+    """Live-Auslastung der AI-Pools - nur Slot-Zahlen (öffentlich)"""
+    pools = await admission_controller.status()
+    return {
+        "pools": {
+            name: {key: pool[key] for key in ("max_concurrent", "in_use", "queued", "max_queue")}
+            for name, pool in pools.items()
+        }
+    }
+
+
+@app.get("/health/ai/details", dependencies=[Depends(require_admin)])
+async def ai_details():
+    """AI-Interna für Admins: Pools, Routen-Zuordnung, Provider-Breaker, Hedging"""
+    return {
+        "pools": await admission_controller.status(),
+        "routes": admission_controller.routes(app.router),
+        "providers": ai_generator.provider_health(),
+        "hedging": ai_generator.hedging_metrics(),
+    }
@@ -0,0 +1,331 @@
+"""
+Admission Control for AI Routes
+
+Routen deklarieren selbst, aus welchen AI-Pools sie Slots ziehen:
+
+    @router.post("/generate")
+    @ai_admission(pool="ollama", pro_pool="gemini")
+    async def generate_recipes(...): ...
+
+Der AdmissionController findet die Route über das echte Routing
+(Route.matches) - unabhängig davon, unter welchem Prefix der Router
+eingebunden ist (/api, /v2, ...). Das RateLimitMiddleware hängt der
+Anfrage ein AdmissionTicket an (Route-Budget + wer fragt an).
+
+`pool` nennt den Pool für Ollama-Aufrufe der Route, `pro_pool` den für
+Gemini-Aufrufe (nur PRO generiert mit Gemini). Belegt wird ein Slot erst,
+wenn wirklich ein Provider läuft - aus dem Pool, den die Route für diesen
+Provider deklariert:
+
+    async with admission_controller.provider_slot("ollama"):
+        text = await provider.generate(...)
+
+Mock-Generierung, Cache-Treffer und angehängte (coalesced) Anfragen
+kommen so nie in die Ollama/Gemini-Queue. Streams melden die Wartezeit
+per slot.waiting() als QueueStatus (Route → SSE `event: queued`).
+"""
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import time
+
+from starlette.routing import Match
+from starlette.types import Scope
+
+logger = logging.getLogger(__name__)
+
+
+class RouteBudget:
+    """Pools (Ollama → pool, Gemini → pro_pool) + Kosten (Slots pro Provider-Aufruf) einer AI-Route"""
+
+    def __init__(self, pool: str, cost: int = 1, pro_pool: Optional[str] = None):
+        self.pool = pool
+        self.cost = cost
+        self.pro_pool = pro_pool
+
+    def __repr__(self):
+        return f"<RouteBudget(pool='{self.pool}', cost={self.cost}, pro_pool={self.pro_pool!r})>"
+
+
+def ai_admission(pool: str = "ollama", cost: int = 1, pro_pool: Optional[str] = None) -> Callable:
+    """
+    Decorator: jeder Provider-Aufruf der Route zieht `cost` Slots - Ollama-Aufrufe
+    aus `pool`, Gemini-Aufrufe (PRO) aus `pro_pool` (ohne Angabe: Pool "gemini").
+    Unter @router.post(...) anwenden.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__ai_admission__ = RouteBudget(pool, cost=cost, pro_pool=pro_pool)
+        return endpoint
+    return decorator
+
+
+class AdmissionRejected(Exception):
+    """Kein Slot: Queue voll oder Client hat während des Wartens aufgegeben → 429"""
+
+    def __init__(self, detail: Dict[str, Any], retry_after: int = 1):
+        super().__init__(detail.get("message", detail.get("error")))
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """
+    Admission-Kontext einer Anfrage (vom RateLimitMiddleware gesetzt)
+
+    Der User wird erst beim ersten Slot aufgelöst - bis dahin hat
+    get_current_user ihn längst in request.state abgelegt.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[RouteBudget] = None,
+        identify: Optional[Callable[[], Awaitable[Tuple[Any, Optional[str], bool]]]] = None
+    ):
+        self.budget = budget
+        self._identify = identify
+        self._caller: Optional[Tuple[Any, Optional[str]]] = None
+        self.disconnected = asyncio.Event()
+        # Erster Slot dieser Anfrage: Queue-Position beim Einreihen, Wartezeit
+        self.queue_position: Optional[int] = None
+        self.waited: Optional[float] = None
+
+    @property
+    def cost(self) -> int:
+        return self.budget.cost if self.budget else 1
+
+    def pool_for(self, provider: str) -> str:
+        """Pool, aus dem ein Aufruf dieses Providers Slots zieht (ohne Deklaration: Provider-Name)"""
+        if self.budget is None:
+            return provider
+        if provider == "gemini":
+            return self.budget.pro_pool or provider
+        return self.budget.pool
+
+    async def caller(self) -> Tuple[Any, Optional[str]]:
+        """(user_id, Queue-Tier) - Admins werden wie PRO/BUSINESS vorgezogen"""
+        if self._caller is None:
+            user_id, tier, is_admin = None, None, False
+            if self._identify is not None:
+                try:
+                    user_id, tier, is_admin = await self._identify()
+                except Exception as e:
+                    logger.warning(f"Admission could not identify user: {e}")
+            self._caller = (user_id, "pro" if is_admin else tier)
+        return self._caller
+
+
+class QueueStatus:
+    """Zwischenstand einer wartenden Anfrage (position 0 = Slot erhalten)"""
+
+    __slots__ = ("pool", "position", "eta_seconds", "waited_seconds")
+
+    def __init__(self, pool: str, position: int, eta_seconds: float, waited_seconds: float):
+        self.pool = pool
+        self.position = position
+        self.eta_seconds = eta_seconds
+        self.waited_seconds = waited_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pool": self.pool,
+            "position": self.position,
+            "eta_seconds": round(self.eta_seconds),
+            "waited_seconds": round(self.waited_seconds, 1),
+        }
+
+
+# Ticket der laufenden Anfrage (Tasks des Coalescers erben es vom Leader)
+current_ticket: ContextVar[Optional[AdmissionTicket]] = ContextVar("ai_admission_ticket", default=None)
+
+
+class AdmissionSlot:
+    """
+    Slot(s) eines Pools für einen Provider-Aufruf (async with)
+
+    Wartet in der Queue des Pools; Queue voll → AdmissionRejected.
+    Verlässt der Client die Anfrage während des Wartens, wird der Platz
+    in der Queue sofort frei.
+
+    Streams warten per `async for status in slot.waiting()` und bekommen
+    dabei Position + ETA; das anschließende `async with slot` ist dann
+    sofort drin.
+    """
+
+    # Wie oft beim Warten Position/Disconnect geprüft werden
+    CHECK_INTERVAL_SECONDS = 1.0
+    # Erste Meldung kurz nach dem Einreihen (Position steht fest)
+    FIRST_CHECK_SECONDS = 0.05
+
+    def __init__(self, controller: "AdmissionController", pool: str, cost: Optional[int] = None):
+        self.controller = controller
+        self.pool = pool
+        self.ticket = current_ticket.get() or AdmissionTicket()
+        self.cost = cost or self.ticket.cost
+        self.request_id = f"{pool}-{id(self)}-{time.time()}"
+        self.limiter = None
+        self.granted = False
+        self._extra: List[str] = []
+
+    async def waiting(self) -> AsyncIterator[QueueStatus]:
+        """Slot anfordern; solange die Anfrage in der Queue steht, Position + ETA melden"""
+        if self.granted:
+            return
+        self.limiter = await self.controller.limiter(self.pool)
+        user_id, tier = await self.ticket.caller()
+        queued_at = time.time()
+
+        acquire = asyncio.ensure_future(self.limiter.acquire(self.request_id, user_id, tier, self.cost))
+        disconnected = asyncio.ensure_future(self.ticket.disconnected.wait())
+        position = None
+        timeout = self.FIRST_CHECK_SECONDS
+        try:
+            while not acquire.done() and not disconnected.done():
+                await asyncio.wait({acquire, disconnected}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                timeout = self.CHECK_INTERVAL_SECONDS
+                current = self.limiter.position(self.request_id)
+                if current is not None and not acquire.done():
+                    position = position or current
+                    yield QueueStatus(
+                        self.pool, current, self.limiter.eta_seconds(current), time.time() - queued_at
+                    )
+        finally:
+            disconnected.cancel()
+            if not acquire.done():
+                acquire.cancel()
+                await asyncio.gather(acquire, return_exceptions=True)
+
+        if acquire.cancelled():
+            logger.info(f"Request {self.request_id} disconnected while queued")
+            raise AdmissionRejected({"error": "client_disconnected", "message": "Client disconnected while queued"})
+
+        if not acquire.result():
+            _, eta = await self.limiter.estimate(tier)
+            raise AdmissionRejected(
+                {
+                    "error": "rate_limit_exceeded",
+                    "message": "Zu viele gleichzeitige Anfragen. Bitte warte kurz und versuche es erneut.",
+                    "pool": self.pool,
+                    "max_concurrent": self.limiter.max_concurrent,
+                    "current": self.limiter.current_requests,
+                    "queued": len(self.limiter.waiting),
+                    "eta_seconds": round(eta),
+                },
+                retry_after=max(1, math.ceil(eta)),
+            )
+
+        self.granted = True
+        waited = time.time() - queued_at
+        if self.ticket.waited is None:
+            self.ticket.queue_position = position or 0
+            self.ticket.waited = waited
+        if position:
+            yield QueueStatus(self.pool, 0, 0.0, waited)
+
+    async def extend(self, extra: int) -> int:
+        """
+        Bis zu `extra` weitere Slots für parallele Teil-Aufrufe (Fan-out)
+
+        Nur sofort freie Slots, ohne Einreihen - wer in der Queue steht,
+        hat Vorrang. Rückgabe: Anzahl tatsächlich erhaltener Slots.
+        """
+        if not self.granted:
+            raise RuntimeError("extend() requires a granted slot")
+        user_id, _ = await self.ticket.caller()
+        for _ in range(extra):
+            holder = f"{self.request_id}+{len(self._extra) + 1}"
+            if not await self.limiter.try_acquire_now(holder, user_id, self.cost):
+                break
+            self._extra.append(holder)
+        return len(self._extra)
+
+    async def __aenter__(self) -> "AdmissionSlot":
+        async for _ in self.waiting():
+            pass
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.release()
+
+    async def release(self):
+        if self.limiter is not None:
+            while self._extra:
+                await self.limiter.release(self._extra.pop())
+            await self.limiter.release(self.request_id)
+
+
+class AdmissionController:
+    """Ordnet Anfragen ihrer Routen-Deklaration zu und vergibt Slots der Pool-Limiter"""
+
+    def __init__(self, pools: Dict[str, Callable[[], Any]]):
+        # Pool-Name → Factory; Limiter (und Slot-Backend) entstehen erst beim Startup
+        self._factories = pools
+        self.pools: Dict[str, Any] = {}
+        self._creating = asyncio.Lock()
+        self._routes: List[Tuple[Any, RouteBudget]] = []
+        self._routes_key: Optional[Tuple[int, int]] = None
+
+    def _budgeted_routes(self, router) -> List[Tuple[Any, RouteBudget]]:
+        """Nur Routen mit Deklaration (neu aufgebaut, wenn sich die Routen ändern)"""
+        key = (id(router), len(router.routes))
+        if key != self._routes_key:
+            self._routes = [
+                (route, route.endpoint.__ai_admission__)
+                for route in router.routes
+                if hasattr(getattr(route, "endpoint", None), "__ai_admission__")
+            ]
+            self._routes_key = key
+            for route, budget in self._routes:
+                if budget.pool not in self._factories or (budget.pro_pool and budget.pro_pool not in self._factories):
+                    logger.error(f"Route {route.path} uses unknown AI pool: {budget}")
+        return self._routes
+
+    def resolve(self, scope: Scope) -> Optional[RouteBudget]:
+        """RouteBudget der Route, die diese Anfrage bearbeiten wird (oder None)"""
+        app = scope.get("app")
+        router = getattr(app, "router", None)
+        if router is None:
+            return None
+
+        for route, budget in self._budgeted_routes(router):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return budget
+        return None
+
+    async def limiter(self, name: str):
+        """Limiter des Pools, beim ersten Zugriff erzeugt (SQLite-Backend: Datei + Tabelle)"""
+        limiter = self.pools.get(name)
+        if limiter is None:
+            async with self._creating:
+                limiter = self.pools.get(name)
+                if limiter is None:
+                    limiter = await asyncio.to_thread(self._factories[name])
+                    self.pools[name] = limiter
+        return limiter
+
+    async def start(self):
+        """Alle Pools anlegen (App-Startup) - nicht schon beim Import"""
+        for name in self._factories:
+            await self.limiter(name)
+
+    def slot(self, pool: str, cost: Optional[int] = None) -> AdmissionSlot:
+        """Slot aus einem bestimmten Pool (Kosten aus der Route-Deklaration, sonst 1)"""
+        return AdmissionSlot(self, pool, cost)
+
+    def provider_slot(self, provider: str, cost: Optional[int] = None) -> AdmissionSlot:
+        """Slot für einen Aufruf von `provider` - aus dem Pool, den die Route dafür deklariert"""
+        ticket = current_ticket.get()
+        return self.slot(ticket.pool_for(provider) if ticket else provider, cost)
+
+    def routes(self, router) -> Dict[str, Dict[str, Any]]:
+        """Deklarierte AI-Routen (mit vollem Pfad inkl. Prefix)"""
+        return {
+            route.path: {"pool": budget.pool, "pro_pool": budget.pro_pool, "cost": budget.cost}
+            for route, budget in self._budgeted_routes(router)
+        }
+
+    async def status(self) -> Dict[str, Any]:
+        """Live-Auslastung aller (bereits angelegten) Pools"""
+        return {name: await limiter.status() for name, limiter in self.pools.items()}
@@ -2,11 +2,11 @@
 Email Verification Middleware
 Requires users to verify their email before accessing protected endpoints
 """
-from fastapi import Request, HTTPException, status
+from fastapi import Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from app.utils.jwt import decode_access_token
-from app.utils.database import SessionLocal
-from app.models.user import User
+from app.utils.auth import resolve_principal
 import os
 
 
@@ -52,33 +52,23 @@ class EmailVerificationMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         try:
-            token = auth_header.replace("Bearer ", "")
-            payload = decode_access_token(token)
-            user_id = payload.get("user_id")
-
-            if not user_id:
-                return await call_next(request)
-
-            # Check if user's email is verified
-            db = SessionLocal()
-            try:
-                user = db.query(User).filter(User.id == user_id).first()
-
-                if user and not user.email_verified:
-                    # User exists but email not verified
-                    return HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail={
-                            "error": "email_not_verified",
-                            "message": "Bitte verifiziere deine E-Mail-Adresse, um fortzufahren.",
-                            "email": user.email
-                        }
-                    ).json()
-            finally:
-                db.close()
-
+            # Einmal pro Request aufgelöst, geteilt mit get_current_user (User Cache)
+            principal = await run_in_threadpool(resolve_principal, request)
         except Exception:
             # If token verification fails, let auth middleware handle it
-            pass
+            principal = None
+
+        if principal and not principal.email_verified:
+            # User exists but email not verified
+            return JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={
+                    "detail": {
+                        "error": "email_not_verified",
+                        "message": "Bitte verifiziere deine E-Mail-Adresse, um fortzufahren.",
+                        "email": principal.email
+                    }
+                }
+            )
 
         return await call_next(request)
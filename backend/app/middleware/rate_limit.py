@@ -1,101 +1,347 @@
 """
 Rate Limiting Middleware for Ollama AI Generation
 - Limits concurrent requests to prevent Pi overload
-- Queue system for excess requests
+- Queue system for excess requests (bounded, tier priority, per-user fairness)
+- Slots optionally shared across uvicorn workers (see slot_backends.py)
+- Which routes draw from which pool is declared on the route, slots are
+  taken around the actual provider calls (see admission.py)
 """
 import asyncio
+import itertools
 import logging
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Dict, Optional
+import math
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import time
 
+from app.config import settings
+from app.middleware.admission import AdmissionController, AdmissionTicket, current_ticket
+from app.middleware.slot_backends import LocalSlotBackend, create_slot_backend
+
 logger = logging.getLogger(__name__)
 
 
+# Bedienreihenfolge in der Warteschlange (kleiner = früher)
+TIER_PRIORITY = {
+    "business_praxis": 0,
+    "business_team": 0,
+    "business_solo": 0,
+    "pro": 0,
+    "premium": 1,
+    "basic": 1,
+    "free": 2,
+}
+DEFAULT_PRIORITY = 2
+
+
+class _Waiter:
+    """Eintrag in der Warteschlange"""
+
+    __slots__ = ("request_id", "user_id", "priority", "cost", "seq", "future", "enqueued_at")
+
+    def __init__(self, request_id: str, user_id: Any, priority: int, cost: int, seq: int, future: asyncio.Future):
+        self.request_id = request_id
+        self.user_id = user_id
+        self.priority = priority
+        self.cost = cost
+        self.seq = seq
+        self.future = future
+        self.enqueued_at = time.time()
+
+
 class OllamaRateLimiter:
     """
-    Simple rate limiter for Ollama requests
+    Admission scheduler for Ollama requests
     - Max 2-3 concurrent requests
-    - Queue system for waiting requests
+    - Bounded wait queue instead of immediate rejection
+    - PRO/BUSINESS before FREE, within a tier users without a running
+      request go first (one user can't occupy the whole queue)
+
+    Slots come from a backend: process-local by default, or shared between
+    worker processes. With a shared backend, slots freed by another worker
+    are picked up by polling while requests are waiting.
     """
 
-    def __init__(self, max_concurrent: int = 2):
-        self.max_concurrent = max_concurrent
-        self.current_requests = 0
-        self.lock = asyncio.Lock()
-        self.request_times: Dict[str, float] = {}  # Track request timing
-        logger.info(f"OllamaRateLimiter initialized (max_concurrent: {max_concurrent})")
+    # Startwert für die Dauer-Schätzung (EWMA, wird mit echten Laufzeiten angepasst)
+    EXPECTED_DURATION_SECONDS = 30.0
+    DURATION_SMOOTHING = 0.2
+
+    # Wie oft wartende Anfragen einen geteilten Backend-Slot neu versuchen
+    POLL_INTERVAL_SECONDS = 0.25
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        max_queue: int = 20,
+        max_queued_per_user: int = 3,
+        backend=None
+    ):
+        self.backend = backend or LocalSlotBackend(max_concurrent)
+        self.max_concurrent = self.backend.max_concurrent
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.current_requests = 0  # Laufende Anfragen dieses Prozesses
+        self.waiting: List[_Waiter] = []
+        self.active_by_user: Dict[Any, int] = {}
+        self.request_times: Dict[str, Tuple[float, Any]] = {}  # Track request timing
+        self.avg_duration = self.EXPECTED_DURATION_SECONDS
+        self._seq = itertools.count()
+        self._poller: Optional[asyncio.Task] = None
+        self._dispatching = asyncio.Lock()
+        logger.info(
+            f"OllamaRateLimiter initialized (max_concurrent: {self.max_concurrent}, max_queue: {max_queue}, "
+            f"backend: {type(self.backend).__name__})"
+        )
+
+    async def _backend_call(self, method: str, *args):
+        """Geteiltes Backend (SQLite, BEGIN IMMEDIATE mit Busy-Timeout) nicht im Event Loop aufrufen"""
+        if self.backend.shared:
+            return await asyncio.to_thread(getattr(self.backend, method), *args)
+        return getattr(self.backend, method)(*args)
+
+    @staticmethod
+    def priority_for(tier: Optional[str]) -> int:
+        return TIER_PRIORITY.get(tier or "free", DEFAULT_PRIORITY)
 
-    async def acquire(self, request_id: str) -> bool:
+    async def acquire(
+        self,
+        request_id: str,
+        user_id: Any = None,
+        tier: Optional[str] = None,
+        cost: int = 1
+    ) -> bool:
         """
-        Acquire permission to make a request
-        Returns True if allowed, False if rate limited
+        Acquire permission to make a request (waits in queue if all slots are busy)
+        Returns True once a slot is granted, False if the queue is full
+
+        cost: number of slots the request occupies (capped at max_concurrent).
+        Cancelling the awaiting task (client disconnect) removes it from the queue.
         """
-        async with self.lock:
-            if self.current_requests < self.max_concurrent:
-                self.current_requests += 1
-                self.request_times[request_id] = time.time()
-                logger.info(f"Request {request_id} acquired slot ({self.current_requests}/{self.max_concurrent})")
-                return True
-            else:
-                logger.warning(f"Request {request_id} rate limited ({self.current_requests}/{self.max_concurrent})")
+        cost = max(1, min(cost, self.max_concurrent))
+        if not self.waiting and await self._backend_call("try_acquire", request_id, cost):
+            self._grant(request_id, user_id)
+            return True
+
+        if len(self.waiting) >= self.max_queue:
+            logger.warning(f"Request {request_id} rejected - queue full ({len(self.waiting)}/{self.max_queue})")
+            return False
+
+        if user_id is not None:
+            queued_for_user = sum(1 for waiter in self.waiting if waiter.user_id == user_id)
+            if queued_for_user >= self.max_queued_per_user:
+                logger.warning(f"Request {request_id} rejected - user {user_id} already has {queued_for_user} queued")
                 return False
 
+        waiter = _Waiter(
+            request_id, user_id, self.priority_for(tier), cost, next(self._seq),
+            asyncio.get_running_loop().create_future()
+        )
+        self.waiting.append(waiter)
+        logger.info(f"Request {request_id} queued (position {self.position(request_id)}/{len(self.waiting)})")
+        self._ensure_poller()
+
+        try:
+            await waiter.future
+            logger.info(f"Request {request_id} left queue after {time.time() - waiter.enqueued_at:.1f}s")
+            return True
+        except asyncio.CancelledError:
+            if waiter in self.waiting:
+                self.waiting.remove(waiter)
+                logger.info(f"Request {request_id} cancelled while queued")
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Slot wurde gerade noch zugeteilt → sofort weitergeben
+                await self.release(request_id)
+            raise
+
+    async def try_acquire_now(self, request_id: str, user_id: Any = None, cost: int = 1) -> bool:
+        """Slot nur, wenn sofort einer frei ist und niemand wartet (kein Einreihen)"""
+        if self.waiting or not await self._backend_call("try_acquire", request_id, cost):
+            return False
+        self._grant(request_id, user_id)
+        return True
+
     async def release(self, request_id: str):
-        """Release a request slot"""
-        async with self.lock:
-            if self.current_requests > 0:
-                self.current_requests -= 1
+        """Release a request slot and hand it to the next waiter"""
+        entry = self.request_times.pop(request_id, None)
+        if entry is None:
+            return
 
-                # Log duration
-                if request_id in self.request_times:
-                    duration = time.time() - self.request_times[request_id]
-                    logger.info(f"Request {request_id} released slot (duration: {duration:.1f}s, remaining: {self.current_requests}/{self.max_concurrent})")
-                    del self.request_times[request_id]
+        started_at, user_id = entry
+        self.current_requests -= 1
+        self._user_done(user_id)
+
+        # Log duration
+        duration = time.time() - started_at
+        self.avg_duration += self.DURATION_SMOOTHING * (duration - self.avg_duration)
+        logger.info(f"Request {request_id} released slot (duration: {duration:.1f}s, remaining: {self.current_requests}/{self.max_concurrent})")
+
+        await self._backend_call("release", request_id)
+        await self._dispatch()
+
+    def _grant(self, request_id: str, user_id: Any):
+        self.current_requests += 1
+        self.active_by_user[user_id] = self.active_by_user.get(user_id, 0) + 1
+        self.request_times[request_id] = (time.time(), user_id)
+        logger.info(f"Request {request_id} acquired slot ({self.current_requests}/{self.max_concurrent})")
+
+    def _user_done(self, user_id: Any):
+        remaining = self.active_by_user.get(user_id, 0) - 1
+        if remaining > 0:
+            self.active_by_user[user_id] = remaining
+        else:
+            self.active_by_user.pop(user_id, None)
 
+    def _order_key(self, waiter: _Waiter):
+        # Tier → User ohne laufende Anfrage zuerst → Ankunftsreihenfolge
+        return (waiter.priority, self.active_by_user.get(waiter.user_id, 0), waiter.seq)
 
-# Global rate limiter instance
-ollama_limiter = OllamaRateLimiter(max_concurrent=2)
+    async def _dispatch(self):
+        """Freie Slots an die nächsten Wartenden vergeben"""
+        # release() und Poller können gleichzeitig vergeben → einer nach dem anderen
+        async with self._dispatching:
+            while self.waiting:
+                waiter = min(self.waiting, key=self._order_key)
+                if waiter.future.done():
+                    self.waiting.remove(waiter)
+                    continue
+                if not await self._backend_call("try_acquire", waiter.request_id, waiter.cost):
+                    break
+                if waiter.future.done():
+                    # Während des Backend-Aufrufs abgebrochen → Slot sofort zurück
+                    await self._backend_call("release", waiter.request_id)
+                    continue
+                self.waiting.remove(waiter)
+                self._grant(waiter.request_id, waiter.user_id)
+                waiter.future.set_result(True)
 
+    def _ensure_poller(self):
+        """Geteiltes Backend: Slots anderer Worker werden nur per Polling bemerkt"""
+        if self.backend.shared and (self._poller is None or self._poller.done()):
+            self._poller = asyncio.ensure_future(self._poll())
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+    async def _poll(self):
+        while self.waiting:
+            await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
+            await self._dispatch()
+
+    def position(self, request_id: str) -> Optional[int]:
+        """Aktuelle Position in der Warteschlange (1 = als nächstes dran)"""
+        for index, waiter in enumerate(sorted(self.waiting, key=self._order_key), start=1):
+            if waiter.request_id == request_id:
+                return index
+        return None
+
+    def eta_seconds(self, position: int) -> float:
+        """Geschätzte Wartezeit für eine Queue-Position"""
+        if position <= 0:
+            return 0.0
+        return math.ceil(position / self.max_concurrent) * self.avg_duration
+
+    async def estimate(self, tier: Optional[str] = None) -> Tuple[int, float]:
+        """Position + ETA, die eine neue Anfrage dieses Tiers bekäme"""
+        if not self.waiting and await self._backend_call("in_use") < self.max_concurrent:
+            return 0, 0.0
+        priority = self.priority_for(tier)
+        position = sum(1 for waiter in self.waiting if waiter.priority <= priority) + 1
+        return position, self.eta_seconds(position)
+
+    async def status(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "current": self.current_requests,
+            "in_use": await self._backend_call("in_use"),  # Alle Worker (bei geteiltem Backend)
+            "queued": len(self.waiting),
+            "max_queue": self.max_queue,
+            "avg_duration_seconds": round(self.avg_duration, 1),
+        }
+
+
+def pool_limiter(pool: str, max_concurrent: int, max_queue: int) -> Callable[[], OllamaRateLimiter]:
+    """Factory für den Limiter eines Pools - das Slot-Backend entsteht erst beim App-Startup"""
+    def create() -> OllamaRateLimiter:
+        return OllamaRateLimiter(
+            max_queue=max_queue,
+            backend=create_slot_backend(
+                settings.AI_SLOT_BACKEND,
+                max_concurrent=max_concurrent,
+                db_path=settings.AI_SLOT_DB,
+                pool=pool,
+            ),
+        )
+    return create
+
+
+# Routen → Pools (Deklaration per @ai_admission an der Route)
+admission_controller = AdmissionController({
+    "ollama": pool_limiter("ollama", settings.OLLAMA_MAX_CONCURRENT, settings.OLLAMA_QUEUE_SIZE),
+    # Gemini (PRO): kein Pi-Engpass, aber API-Kontingent begrenzen
+    "gemini": pool_limiter("gemini", settings.GEMINI_MAX_CONCURRENT, settings.GEMINI_QUEUE_SIZE),
+})
+
+
+def _lookup_user(request: Request) -> Tuple[Any, Optional[str], bool]:
+    """User-ID, Tier, Admin aus dem JWT (Cookie oder Bearer Header), sonst (None, None, False)"""
+    from app.utils.auth import resolve_principal
+
+    # Geteilt mit get_current_user (request.state + User Cache) → kein eigener SELECT
+    principal = resolve_principal(request)
+    if principal is None:
+        return None, None, False
+    return principal.id, principal.subscription_tier.value, principal.is_admin
+
+
+class RateLimitMiddleware:
     """
-    Middleware to rate limit AI generation endpoints
-    Only applies to /recipes/generate* routes
+    Middleware for the AI generation endpoints
+    Only applies to routes declared with @ai_admission (any mount prefix)
+
+    Attaches an AdmissionTicket to the request - slots themselves are taken
+    by the generator around real provider calls (admission_controller.slot).
+    Plain ASGI (not BaseHTTPMiddleware): the request body is pumped here so
+    that a client disconnecting while queued leaves the queue immediately.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        # Check if this is an AI generation route
-        path = request.url.path
-
-        if path.startswith("/recipes/generate"):
-            # Generate unique request ID
-            request_id = f"{id(request)}-{time.time()}"
-
-            # Try to acquire slot
-            allowed = await ollama_limiter.acquire(request_id)
-
-            if not allowed:
-                # Rate limited - return 429
-                return HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail={
-                        "error": "rate_limit_exceeded",
-                        "message": "Zu viele gleichzeitige Anfragen. Bitte warte kurz und versuche es erneut.",
-                        "max_concurrent": ollama_limiter.max_concurrent,
-                        "current": ollama_limiter.current_requests
-                    }
-                ).json()
-
-            try:
-                # Process request
-                response = await call_next(request)
-                return response
-            finally:
-                # Always release slot
-                await ollama_limiter.release(request_id)
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission_controller
 
-        else:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Check if this is an AI generation route
+        budget = self.controller.resolve(scope) if scope["type"] == "http" else None
+        if budget is None:
             # Not an AI route - pass through
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        ticket = AdmissionTicket(budget, identify=lambda: run_in_threadpool(_lookup_user, request))
+
+        # Nachrichten des Clients weiterreichen, Disconnect sofort ans Ticket melden
+        messages: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    ticket.disconnected.set()
+                    return
+
+        async def send_with_queue_headers(message: Message):
+            # Nur wenn der Slot vor dem Response-Start vergeben wurde (nicht bei SSE)
+            if message["type"] == "http.response.start" and ticket.waited is not None:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-queue-position", str(ticket.queue_position).encode()))
+                headers.append((b"x-queue-wait", f"{ticket.waited:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        pumping = asyncio.ensure_future(pump())
+        context = current_ticket.set(ticket)
+        try:
+            await self.app(scope, messages.get, send_with_queue_headers)
+        finally:
+            current_ticket.reset(context)
+            pumping.cancel()
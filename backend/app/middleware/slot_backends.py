@@ -0,0 +1,188 @@
+"""
+Slot Backends for the AI Rate Limiter
+
+Wo die belegten Generierungs-Slots gezählt werden:
+- LocalSlotBackend:  im Prozess (ein uvicorn-Worker)
+- SQLiteSlotBackend: in einer SQLite-Datei, geteilt von allen Workern auf dem Host
+  (uvicorn --workers N → zusammen trotzdem nur max_concurrent Ollama-Läufe)
+
+Kein externer Dienst nötig: jede Slot-Vergabe ist eine kurze
+BEGIN IMMEDIATE Transaktion (SQLite Schreib-Lock = Advisory Lock).
+
+Ein Holder kann mehrere Slots belegen (cost), max_concurrent ist das Budget.
+"""
+from typing import Dict, Optional
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LocalSlotBackend:
+    """Slots nur innerhalb dieses Prozesses"""
+
+    shared = False
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self._holders: Dict[str, int] = {}
+
+    def try_acquire(self, holder: str, cost: int = 1) -> bool:
+        if self.in_use() + cost > self.max_concurrent:
+            return False
+        self._holders[holder] = cost
+        return True
+
+    def release(self, holder: str):
+        self._holders.pop(holder, None)
+
+    def in_use(self) -> int:
+        return sum(self._holders.values())
+
+
+class SQLiteSlotBackend:
+    """
+    Prozessübergreifende Slots in einer SQLite-Tabelle
+
+    Abgestürzte Worker blockieren keine Slots: Einträge von toten PIDs
+    (gleicher Host) und abgelaufene Leases werden bei jeder Vergabe entfernt.
+    """
+
+    shared = True
+
+    # Obergrenze für einen Slot (Ollama-Timeout 180s + Streaming-Puffer)
+    LEASE_SECONDS = 600
+
+    def __init__(self, db_path: str, max_concurrent: int, pool: str = "ollama"):
+        self.db_path = db_path
+        self.max_concurrent = max_concurrent
+        self.pool = pool
+        self.hostname = socket.gethostname()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        # Reste eines früheren Prozesses mit derselben PID entfernen
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "DELETE FROM ai_slots WHERE pool = ? AND hostname = ? AND pid = ?",
+                (self.pool, self.hostname, os.getpid())
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Nach fork() keine geerbte Verbindung weiterverwenden
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ai_slots (
+                pool TEXT NOT NULL,
+                holder TEXT NOT NULL,
+                hostname TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                cost INTEGER NOT NULL DEFAULT 1,
+                acquired_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (pool, holder)
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(ai_slots)")}
+        if "cost" not in columns:
+            conn.execute("ALTER TABLE ai_slots ADD COLUMN cost INTEGER NOT NULL DEFAULT 1")
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _purge_stale(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM ai_slots WHERE pool = ? AND expires_at < ?", (self.pool, time.time()))
+
+        rows = conn.execute(
+            "SELECT DISTINCT pid FROM ai_slots WHERE pool = ? AND hostname = ?",
+            (self.pool, self.hostname)
+        ).fetchall()
+        for (pid,) in rows:
+            if not self._pid_alive(pid):
+                logger.warning(f"Releasing AI slots of dead worker (pid {pid})")
+                conn.execute(
+                    "DELETE FROM ai_slots WHERE pool = ? AND hostname = ? AND pid = ?",
+                    (self.pool, self.hostname, pid)
+                )
+
+    def try_acquire(self, holder: str, cost: int = 1) -> bool:
+        with self._lock:
+            conn = self._connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._purge_stale(conn)
+                    (in_use,) = conn.execute(
+                        "SELECT COALESCE(SUM(cost), 0) FROM ai_slots WHERE pool = ?", (self.pool,)
+                    ).fetchone()
+                    granted = in_use + cost <= self.max_concurrent
+                    if granted:
+                        now = time.time()
+                        conn.execute(
+                            "INSERT OR REPLACE INTO ai_slots (pool, holder, hostname, pid, cost, acquired_at, expires_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (self.pool, holder, self.hostname, os.getpid(), cost, now, now + self.LEASE_SECONDS)
+                        )
+                    conn.execute("COMMIT")
+                    return granted
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.OperationalError as e:
+                # DB gesperrt/busy → wie "kein Slot frei", nächster Versuch beim Polling
+                logger.warning(f"AI slot acquire failed: {e}")
+                return False
+
+    def release(self, holder: str):
+        with self._lock:
+            try:
+                self._connection().execute(
+                    "DELETE FROM ai_slots WHERE pool = ? AND holder = ?", (self.pool, holder)
+                )
+            except sqlite3.OperationalError as e:
+                # Lease läuft spätestens nach LEASE_SECONDS ab
+                logger.warning(f"AI slot release failed: {e}")
+
+    def in_use(self) -> int:
+        with self._lock:
+            (count,) = self._connection().execute(
+                "SELECT COALESCE(SUM(cost), 0) FROM ai_slots WHERE pool = ? AND expires_at >= ?",
+                (self.pool, time.time())
+            ).fetchone()
+            return count
+
+
+def create_slot_backend(kind: str, max_concurrent: int, db_path: str, pool: str = "ollama"):
+    """Backend aus Konfiguration ("local" oder "sqlite", Fallback: local)"""
+    if kind == "sqlite":
+        try:
+            return SQLiteSlotBackend(db_path, max_concurrent, pool=pool)
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite slot backend unavailable ({db_path}): {e} - using process-local slots")
+    return LocalSlotBackend(max_concurrent)
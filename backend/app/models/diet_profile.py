@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
+from app.utils.db_types import JSONText
 
 
 class DietProfile(Base):
@@ -23,7 +24,7 @@ class DietProfile(Base):
     strict_ingredients_only = Column(Boolean, default=False)
 
     # Settings als JSON (flexibel fuer verschiedene Profile)
-    settings_json = Column(Text, nullable=True)
+    settings_json = Column(JSONText, nullable=True)
     # Beispiel Diabetes: {"unit": "KE", "daily_carb_limit": 180}
     # Beispiel Keto: {"daily_carb_limit": 50, "daily_fat_min": 150}
 
@@ -37,6 +38,8 @@ class DietProfile(Base):
     # Unique Constraint: User kann nicht zweimal gleichen profile_type + name haben
     __table_args__ = (
         UniqueConstraint('user_id', 'profile_type', 'name', name='unique_user_profile_type_name'),
+        # Aktives Diabetes-Profil (Generate, Meal Tracking, Diabetes-Routen)
+        Index("ix_diet_profiles_user_id_type_active", "user_id", "profile_type", "is_active"),
     )
 
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, Index, desc
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
@@ -21,6 +21,10 @@ class Favorite(Base):
     # Unique Constraint: Ein User kann ein Rezept nur einmal favorisieren
     __table_args__ = (
         UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe_favorite'),
+        # Favoriten-Liste: WHERE user_id = ? ORDER BY added_at DESC
+        Index("ix_favorites_user_id_added_at", "user_id", desc("added_at")),
+        # Cascade beim Löschen eines Rezepts (Account löschen)
+        Index("ix_favorites_recipe_id", "recipe_id"),
     )
 
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index, desc
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
@@ -24,6 +24,11 @@ class Ingredient(Base):
     
     # Relationship
     user = relationship("User", back_populates="ingredients")
+
+    # Vorratsliste: WHERE user_id = ? ORDER BY added_at DESC
+    __table_args__ = (
+        Index("ix_ingredients_user_id_added_at", "user_id", desc("added_at")),
+    )
     
     def __repr__(self):
         return f"<Ingredient(name='{self.name}', category='{self.category}')>"
\ No newline at end of file
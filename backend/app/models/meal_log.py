@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -37,5 +37,12 @@ class MealLog(Base):
     user = relationship("User", back_populates="meal_logs")
     recipe = relationship("Recipe", backref="meal_logs")
 
+    # Tages-/Verlaufsansicht: WHERE user_id = ? AND consumed_at BETWEEN ? AND ? ORDER BY consumed_at
+    __table_args__ = (
+        Index("ix_meal_logs_user_id_consumed_at", "user_id", "consumed_at"),
+        # Account löschen: Rezept-Referenz wird per recipe_id auf NULL gesetzt
+        Index("ix_meal_logs_recipe_id", "recipe_id"),
+    )
+
     def __repr__(self):
         return f"<MealLog(id={self.id}, user_id={self.user_id}, meal='{self.meal_name}', ke={self.ke})>"
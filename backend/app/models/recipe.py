@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, desc
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
+from app.utils.db_types import JSONText, jsonb_gin_index
 
 class Recipe(Base):
     """Recipe Model - Generierte Rezepte"""
@@ -18,11 +19,11 @@ class Recipe(Base):
     method = Column(String, nullable=True)  # Pfanne, Ofen, etc.
     servings = Column(Integer, default=2)
     
-    # JSON-Felder (als Text gespeichert)
-    used_ingredients = Column(Text, nullable=True)  # JSON Array
+    # JSON-Felder (SQLite: Text, PostgreSQL: JSONB - die App sieht immer list/dict)
+    used_ingredients = Column(JSONText, nullable=True)  # JSON Array
     leftover_tips = Column(Text, nullable=True)
-    ingredients_json = Column(Text, nullable=True)  # Vollständige Zutatenliste mit Mengen
-    nutrition_json = Column(Text, nullable=True)  # Nährwerte pro Portion
+    ingredients_json = Column(JSONText, nullable=True)  # Vollständige Zutatenliste mit Mengen
+    nutrition_json = Column(JSONText, nullable=True)  # Nährwerte pro Portion
     
     # Metadata
     ai_provider = Column(String, default="mock")  # mock, anthropic, openai, gemini
@@ -31,6 +32,14 @@ class Recipe(Base):
     # Relationships
     user = relationship("User", back_populates="recipes")
     favorites = relationship("Favorite", back_populates="recipe", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Historie: WHERE user_id = ? ORDER BY generated_at DESC
+        Index("ix_recipes_user_id_generated_at", "user_id", desc("generated_at")),
+        # PostgreSQL: Zutatensuche per @> über GIN
+        jsonb_gin_index("ix_recipes_used_ingredients_gin", "used_ingredients"),
+        jsonb_gin_index("ix_recipes_ingredients_json_gin", "ingredients_json"),
+    )
     
     def __repr__(self):
         return f"<Recipe(name='{self.name}', user_id={self.user_id})>"
\ No newline at end of file
@@ -1,10 +1,14 @@
 """
 Recipe Database Model - Kuratierte Rezepte für schnellere Generierung
 """
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, Enum, ForeignKey, event
+from sqlalchemy.orm import attributes
 from sqlalchemy.sql import func
 from sqlalchemy import DateTime
 from app.utils.database import Base
+from app.utils.db_types import JSONDocument, jsonb_gin_index
+from app.utils.ingredient_names import normalize_ingredient_name
+from typing import Any, Dict, List
 import enum
 
 
@@ -40,8 +44,8 @@ class RecipeDB(Base):
     description = Column(Text, nullable=False)
 
     # Zutaten & Anleitung
-    ingredients = Column(JSON, nullable=False)  # [{"name": "...", "amount": "..."}]
-    instructions = Column(JSON, nullable=False)  # ["Schritt 1", "Schritt 2", ...]
+    ingredients = Column(JSONDocument, nullable=False)  # [{"name": "...", "amount": "..."}]
+    instructions = Column(JSONDocument, nullable=False)  # ["Schritt 1", "Schritt 2", ...]
 
     # Metadaten
     servings = Column(Integer, default=2)
@@ -80,6 +84,10 @@ class RecipeDB(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        jsonb_gin_index("ix_recipe_db_ingredients_gin", "ingredients"),
+    )
+
     def __repr__(self):
         return f"<RecipeDB(name='{self.name}', carbs={self.carbs}g, gi={self.gi})>"
 
@@ -123,3 +131,60 @@ class RecipeDB(Base):
             },
             "source": "recipe_db",
         }
+
+
+class RecipeIngredientIndex(Base):
+    """
+    Inverted Index: normalisierte Zutat → Rezept (Posting-Listen)
+
+    Eine Zeile pro Zutat eines Rezepts. Die Anzahl Zeilen pro Rezept entspricht
+    len(RecipeDB.ingredients) und wird für den Match-Score gebraucht.
+    """
+    __tablename__ = "recipe_ingredient_index"
+
+    recipe_id = Column(Integer, ForeignKey("recipe_db.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)  # Index in RecipeDB.ingredients
+    term = Column(String, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RecipeIngredientIndex(term='{self.term}', recipe_id={self.recipe_id})>"
+
+
+def build_index_rows(recipe_id: int, ingredients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Index-Zeilen für ein Rezept (eine pro Zutat)"""
+    return [
+        {
+            "recipe_id": recipe_id,
+            "position": position,
+            "term": normalize_ingredient_name(ing.get("name", "") if isinstance(ing, dict) else str(ing)),
+        }
+        for position, ing in enumerate(ingredients or [])
+    ]
+
+
+def _write_index_rows(connection, target: RecipeDB, replace: bool = True):
+    index_table = RecipeIngredientIndex.__table__
+    if replace:
+        connection.execute(index_table.delete().where(index_table.c.recipe_id == target.id))
+    rows = build_index_rows(target.id, target.ingredients)
+    if rows:
+        connection.execute(index_table.insert(), rows)
+
+
+# Index bei jedem Schreibzugriff auf RecipeDB aktuell halten
+@event.listens_for(RecipeDB, "after_insert")
+def _index_after_insert(mapper, connection, target):
+    _write_index_rows(connection, target, replace=False)
+
+
+@event.listens_for(RecipeDB, "after_update")
+def _index_after_update(mapper, connection, target):
+    # z.B. usage_count += 1 → Zutaten unverändert, Index nicht anfassen
+    if attributes.get_history(target, "ingredients").has_changes():
+        _write_index_rows(connection, target)
+
+
+@event.listens_for(RecipeDB, "after_delete")
+def _index_after_delete(mapper, connection, target):
+    index_table = RecipeIngredientIndex.__table__
+    connection.execute(index_table.delete().where(index_table.c.recipe_id == target.id))
@@ -30,7 +30,7 @@ class User(Base):
         default=SubscriptionTier.FREE,
         nullable=False
     )
-    stripe_customer_id = Column(String, nullable=True)
+    stripe_customer_id = Column(String, nullable=True, index=True)  # Stripe-Webhooks suchen danach
 
     # Admin Override (alle Features kostenlos)
     is_admin = Column(Boolean, default=False, nullable=False)
@@ -39,6 +39,9 @@ class User(Base):
     email_verified = Column(Boolean, default=False, nullable=False)
     email_verified_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Einstellungen
+    use_generation_cache = Column(Boolean, default=True, nullable=False)  # Gecachte AI-Rezepte erlauben
+
     # Limits
     daily_recipe_count = Column(Integer, default=0)
     last_recipe_date = Column(DateTime(timezone=True), nullable=True)
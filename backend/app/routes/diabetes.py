@@ -8,7 +8,6 @@ from app.models.diet_profile import DietProfile
 from app.utils.database import get_db
 from app.utils.auth import get_current_user
 from app.services.diabetes_service import diabetes_service
-import json
 
 router = APIRouter(prefix="/diabetes", tags=["Diabetes"])
 
@@ -64,11 +63,7 @@ def calculate_insulin(
             detail="Kein aktives Diabetes-Profil gefunden. Bitte erst ein Profil erstellen."
         )
 
-    # Parse settings
-    try:
-        settings = json.loads(active_profile.settings_json) if active_profile.settings_json else {}
-    except:
-        settings = {}
+    settings = active_profile.settings_json or {}
 
     # Get ICR and ISF
     icr = settings.get("icr")
@@ -152,10 +147,7 @@ def estimate_bg_impact(
     if not active_profile:
         raise HTTPException(status_code=404, detail="Kein aktives Diabetes-Profil gefunden")
 
-    try:
-        settings = json.loads(active_profile.settings_json) if active_profile.settings_json else {}
-    except:
-        settings = {}
+    settings = active_profile.settings_json or {}
 
     icr = settings.get("icr")
     isf = settings.get("isf")
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-import json
 from app.schemas.diet_profile import (
     DietProfileCreate,
     DietProfileUpdate,
@@ -229,14 +228,9 @@ def validate_settings(profile_type: str, settings: Dict[str, Any]) -> Dict[str,
     return settings
 
 
-def parse_settings_json(settings_json: Optional[str]) -> Dict[str, Any]:
-    """Parse settings_json zu Dict"""
-    if not settings_json:
-        return {}
-    try:
-        return json.loads(settings_json)
-    except json.JSONDecodeError:
-        return {}
+def parse_settings_json(settings_json: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """settings_json (schon als Dict aus der DB) → Dict, leer wenn nicht gesetzt/ungültig"""
+    return settings_json if isinstance(settings_json, dict) else {}
 
 
 def profile_to_response(profile: DietProfile) -> DietProfileResponse:
@@ -335,7 +329,7 @@ def create_profile(
         user_id=current_user.id,
         profile_type=profile_data.profile_type,
         name=profile_data.name,
-        settings_json=json.dumps(validated_settings) if validated_settings else None,
+        settings_json=validated_settings or None,
         is_active=profile_data.is_active,
         strict_ingredients_only=profile_data.strict_ingredients_only
     )
@@ -393,7 +387,7 @@ def create_from_template(
         user_id=current_user.id,
         profile_type=profile_type,
         name=template["name"],
-        settings_json=json.dumps(template["settings"]),
+        settings_json=template["settings"],
         is_active=True
     )
 
@@ -486,7 +480,7 @@ def update_profile(
     if "settings" in update_data:
         # Validiere neue Settings
         validated_settings = validate_settings(profile.profile_type, update_data["settings"] or {})
-        profile.settings_json = json.dumps(validated_settings) if validated_settings else None
+        profile.settings_json = validated_settings or None
 
     if "is_active" in update_data:
         # Pruefe Limit nur wenn von inaktiv -> aktiv gewechselt wird
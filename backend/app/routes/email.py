@@ -18,7 +18,7 @@ import jwt
 from app.models.user import User
 from app.utils.database import get_db
 from app.utils.auth import get_current_user
-from app.services.email_service import EmailService
+from app.services.service_registry import services
 from app.config import settings
 import logging
 
@@ -26,8 +26,8 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/email", tags=["Email"])
 
-# Initialize email service
-email_service = EmailService()
+# Email service (resend wird erst beim ersten Versand importiert)
+email_service = services.lazy("email_service")
 
 # Temporary storage for verification tokens (Production: Use Redis or DB)
 verification_tokens = {}
@@ -8,11 +8,10 @@ from app.utils.database import get_db
 from app.utils.auth import get_current_user
 from app.data.faq_recipes import get_all_faq_categories, get_faq_category
 from app.services.ai_recipe_generator import ai_generator
-from app.routes.recipes import check_daily_limit, increment_recipe_count
-from app.models.recipe import Recipe
-from app.schemas.recipe import RecipeResponse, RecipeIngredient, NutritionInfo
-import json
-from datetime import datetime
+from app.services.generation_cache import generation_cache
+from app.middleware.admission import AdmissionRejected, ai_admission
+from app.routes.recipes import require_daily_limit, store_generated_recipes
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter(prefix="/faq", tags=["FAQ"])
 
@@ -47,7 +46,8 @@ def get_faq_categories(
 
 
 @router.post("/generate/{category_id}", response_model=RecipeListResponse)
-def generate_faq_recipe(
+@ai_admission(pool="ollama", pro_pool="gemini")
+async def generate_faq_recipe(
     category_id: str,
     language: str = Query("en", regex="^(en|de)$"),
     current_user: User = Depends(get_current_user),
@@ -62,17 +62,12 @@ def generate_faq_recipe(
     This uses predefined ingredients and settings from the FAQ category.
     Counts against daily limit like regular recipe generation.
     """
-    # 1. Check daily limit
-    if not check_daily_limit(current_user, db):
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={
-                "error": "daily_limit_reached",
-                "message": f"Tageslimit erreicht ({current_user.daily_limit} Rezepte). Upgrade für mehr!",
-                "daily_limit": current_user.daily_limit,
-                "subscription_tier": current_user.subscription_tier.value
-            }
-        )
+    # Werte vor dem ersten Commit lesen (danach wären sie expired → Lazy Load im Event Loop)
+    user_tier = current_user.subscription_tier.value
+    use_cache = current_user.use_generation_cache
+
+    # 1. Check daily limit (sync Session → Threadpool)
+    await run_in_threadpool(require_daily_limit, current_user, db)
 
     # 2. Load FAQ category
     category = get_faq_category(category_id, language)
@@ -82,17 +77,30 @@ def generate_faq_recipe(
             detail=f"FAQ category '{category_id}' not found"
         )
 
-    # 3. Generate recipes using AI
+    # 3. Generate recipes using AI (FAQ-Kategorien sind ideale Cache-Treffer)
+    provider = ai_generator.provider_for(user_tier)
+    cache_key = generation_cache.fingerprint(
+        category["ingredients"], 3, category["servings"], category["diet_profiles"], "KE", language,
+        provider
+    )
     try:
-        generated_recipes = ai_generator.generate_recipes(
-            ingredients=category["ingredients"],
-            count=3,
-            servings=category["servings"],
-            diet_profiles=category["diet_profiles"],
-            diabetes_unit="KE",  # Default
-            language=language,
-            user_tier=current_user.subscription_tier.value
+        generated_recipes = await generation_cache.get_or_generate(
+            cache_key,
+            lambda: ai_generator.generate_recipes(
+                ingredients=category["ingredients"],
+                count=3,
+                servings=category["servings"],
+                diet_profiles=category["diet_profiles"],
+                diabetes_unit="KE",  # Default
+                language=language,
+                user_tier=user_tier
+            ),
+            use_cache=use_cache,
+            provider=provider
         )
+    except AdmissionRejected:
+        # Queue voll → 429 mit ETA (Exception-Handler in main.py)
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -103,55 +111,12 @@ def generate_faq_recipe(
             }
         )
 
-    # 4. Save recipes to database
-    saved_recipes = []
-    for recipe_data in generated_recipes:
-        new_recipe = Recipe(
-            user_id=current_user.id,
-            name=recipe_data["name"],
-            description=recipe_data["description"],
-            difficulty=recipe_data["difficulty"],
-            cooking_time=recipe_data["cooking_time"],
-            method=recipe_data["method"],
-            servings=recipe_data["servings"],
-            used_ingredients=json.dumps(recipe_data["used_ingredients"]),
-            leftover_tips=recipe_data["leftover_tips"],
-            ingredients_json=json.dumps(recipe_data["ingredients"]),
-            nutrition_json=json.dumps(recipe_data["nutrition_per_serving"]),
-            ai_provider=recipe_data["ai_provider"]
-        )
-
-        db.add(new_recipe)
-        db.flush()
-
-        # Response format
-        recipe_response = RecipeResponse(
-            id=new_recipe.id,
-            user_id=new_recipe.user_id,
-            name=new_recipe.name,
-            description=new_recipe.description,
-            difficulty=new_recipe.difficulty,
-            cooking_time=new_recipe.cooking_time,
-            method=new_recipe.method,
-            servings=new_recipe.servings,
-            used_ingredients=recipe_data["used_ingredients"],
-            leftover_tips=recipe_data["leftover_tips"],
-            ingredients=[RecipeIngredient(**ing) for ing in recipe_data["ingredients"]],
-            nutrition_per_serving=NutritionInfo(**recipe_data["nutrition_per_serving"]),
-            ai_provider=new_recipe.ai_provider,
-            generated_at=new_recipe.generated_at
-        )
-
-        saved_recipes.append(recipe_response)
-
-    db.commit()
-
-    # 5. Increment counter
-    increment_recipe_count(current_user, db)
-
-    # 6. Response
-    remaining = current_user.daily_limit - current_user.daily_recipe_count
+    # 4. Save recipes to database + increment counter
+    saved_recipes, remaining = await run_in_threadpool(
+        store_generated_recipes, generated_recipes, current_user, category["servings"], db
+    )
 
+    # 5. Response
     return RecipeListResponse(
         recipes=saved_recipes,
         count=len(saved_recipes),
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List
-import json
 from app.schemas.favorite import (
     FavoriteCreate, FavoriteResponse, FavoriteListResponse,
     RecipeInfo, RecipeIngredientInfo, NutritionInfoEmbed
@@ -17,43 +16,31 @@ router = APIRouter(prefix="/favorites", tags=["Favorites"])
 
 def parse_recipe_for_response(recipe: Recipe) -> RecipeInfo:
     """Parse Recipe Model zu RecipeInfo Schema mit JSON-Feldern"""
-    # Parse JSON fields
+    # JSON-Felder kommen schon als list/dict aus der DB (JSONText)
     ingredients = []
-    if recipe.ingredients_json:
-        try:
-            raw_ingredients = json.loads(recipe.ingredients_json)
-            ingredients = [
-                RecipeIngredientInfo(
-                    name=ing.get("name", ""),
-                    amount=ing.get("amount", ""),
-                    carbs=ing.get("carbs")
-                )
-                for ing in raw_ingredients
-            ]
-        except (json.JSONDecodeError, TypeError):
-            ingredients = []
+    if isinstance(recipe.ingredients_json, list):
+        ingredients = [
+            RecipeIngredientInfo(
+                name=ing.get("name", ""),
+                amount=ing.get("amount", ""),
+                carbs=ing.get("carbs")
+            )
+            for ing in recipe.ingredients_json
+        ]
 
     nutrition = None
-    if recipe.nutrition_json:
-        try:
-            raw_nutrition = json.loads(recipe.nutrition_json)
-            nutrition = NutritionInfoEmbed(
-                calories=raw_nutrition.get("calories"),
-                protein=raw_nutrition.get("protein"),
-                carbs=raw_nutrition.get("carbs"),
-                fat=raw_nutrition.get("fat"),
-                ke=raw_nutrition.get("ke"),
-                be=raw_nutrition.get("be")
-            )
-        except (json.JSONDecodeError, TypeError):
-            nutrition = None
-
-    used_ingredients = []
-    if recipe.used_ingredients:
-        try:
-            used_ingredients = json.loads(recipe.used_ingredients)
-        except (json.JSONDecodeError, TypeError):
-            used_ingredients = []
+    if isinstance(recipe.nutrition_json, dict):
+        raw_nutrition = recipe.nutrition_json
+        nutrition = NutritionInfoEmbed(
+            calories=raw_nutrition.get("calories"),
+            protein=raw_nutrition.get("protein"),
+            carbs=raw_nutrition.get("carbs"),
+            fat=raw_nutrition.get("fat"),
+            ke=raw_nutrition.get("ke"),
+            be=raw_nutrition.get("be")
+        )
+
+    used_ingredients = recipe.used_ingredients if isinstance(recipe.used_ingredients, list) else []
 
     return RecipeInfo(
         id=recipe.id,
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime, date, timedelta
@@ -9,9 +9,8 @@ from app.models.user import User
 from app.models.meal_log import MealLog
 from app.models.recipe import Recipe
 from app.models.diet_profile import DietProfile
-from app.utils.database import get_db
-from app.utils.auth import get_current_user
-import json
+from app.utils.database import get_async_db
+from app.utils.auth import get_current_user_async
 
 router = APIRouter(prefix="/meals", tags=["Meal Tracking"])
 
@@ -63,10 +62,10 @@ class DailyTrackingResponse(BaseModel):
 
 
 @router.post("/log", response_model=MealLogResponse)
-def log_meal(
+async def log_meal(
     meal: MealLogCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Log a consumed meal
@@ -98,16 +97,16 @@ def log_meal(
     )
 
     db.add(new_log)
-    db.commit()
-    db.refresh(new_log)
+    await db.commit()
+    await db.refresh(new_log)
 
     return new_log
 
 
 @router.get("/today", response_model=DailyTrackingResponse)
-def get_today_tracking(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_today_tracking(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get today's meal tracking summary
@@ -125,11 +124,13 @@ def get_today_tracking(
     end_of_day = datetime.combine(today, datetime.max.time())
 
     # Get today's meals
-    meals = db.query(MealLog).filter(
-        MealLog.user_id == current_user.id,
-        MealLog.consumed_at >= start_of_day,
-        MealLog.consumed_at <= end_of_day
-    ).order_by(MealLog.consumed_at.asc()).all()
+    meals = (await db.scalars(
+        select(MealLog).where(
+            MealLog.user_id == current_user.id,
+            MealLog.consumed_at >= start_of_day,
+            MealLog.consumed_at <= end_of_day
+        ).order_by(MealLog.consumed_at.asc())
+    )).all()
 
     # Calculate totals
     total_carbs = sum(m.carbs_grams for m in meals)
@@ -142,15 +143,15 @@ def get_today_tracking(
     remaining_ke = None
     percentage_used = None
 
-    active_profile = db.query(DietProfile).filter(
+    active_profile = await db.scalar(select(DietProfile).where(
         DietProfile.user_id == current_user.id,
         DietProfile.profile_type == "diabetic",
         DietProfile.is_active == True
-    ).first()
+    ).limit(1))
 
     if active_profile and active_profile.settings_json:
         try:
-            settings = json.loads(active_profile.settings_json)
+            settings = active_profile.settings_json
             daily_carb_limit = settings.get("daily_carb_limit")
             if daily_carb_limit:
                 daily_limit_ke = round(daily_carb_limit / 10, 1)
@@ -174,10 +175,10 @@ def get_today_tracking(
 
 
 @router.get("/history", response_model=List[DailyTrackingResponse])
-def get_meal_history(
+async def get_meal_history(
     days: int = Query(7, ge=1, le=90),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get meal tracking history
@@ -188,18 +189,26 @@ def get_meal_history(
     Useful for trends/charts!
     """
     results = []
+    today = date.today()
+    start_of_range = datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+    end_of_range = datetime.combine(today, datetime.max.time())
+
+    # Alle Mahlzeiten des Zeitraums in einer Abfrage, dann nach Tag gruppieren
+    meals_by_day = {}
+    for meal in (await db.scalars(
+        select(MealLog).where(
+            MealLog.user_id == current_user.id,
+            MealLog.consumed_at >= start_of_range,
+            MealLog.consumed_at <= end_of_range
+        ).order_by(MealLog.consumed_at.asc())
+    )).all():
+        meals_by_day.setdefault(meal.consumed_at.date(), []).append(meal)
 
     for i in range(days):
-        target_date = date.today() - timedelta(days=i)
-        start_of_day = datetime.combine(target_date, datetime.min.time())
-        end_of_day = datetime.combine(target_date, datetime.max.time())
+        target_date = today - timedelta(days=i)
 
         # Get day's meals
-        meals = db.query(MealLog).filter(
-            MealLog.user_id == current_user.id,
-            MealLog.consumed_at >= start_of_day,
-            MealLog.consumed_at <= end_of_day
-        ).order_by(MealLog.consumed_at.asc()).all()
+        meals = meals_by_day.get(target_date, [])
 
         if not meals and i > 0:  # Skip empty days (except today)
             continue
@@ -227,21 +236,21 @@ def get_meal_history(
 
 
 @router.delete("/{meal_id}")
-def delete_meal_log(
+async def delete_meal_log(
     meal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a meal log entry"""
-    meal = db.query(MealLog).filter(
+    meal = await db.scalar(select(MealLog).where(
         MealLog.id == meal_id,
         MealLog.user_id == current_user.id
-    ).first()
+    ))
 
     if not meal:
         raise HTTPException(status_code=404, detail="Meal log nicht gefunden")
 
-    db.delete(meal)
-    db.commit()
+    await db.delete(meal)
+    await db.commit()
 
     return {"message": "Meal log gelöscht"}
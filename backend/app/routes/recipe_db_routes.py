@@ -2,12 +2,14 @@
 Recipe Database API Routes - BASIC Tier+
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.utils.database import get_db
+from app.utils.database import get_async_db
 from app.models.recipe_db import RecipeDB
 from app.models.user import User
-from app.routes.auth import get_current_user
+from app.utils.auth import get_current_user_async
+from app.services.recipe_fts import recipe_fts, paginate_with_total
 
 router = APIRouter(prefix="/recipe-db", tags=["Recipe Database"])
 
@@ -21,8 +23,8 @@ async def search_recipes(
     quick_only: bool = Query(False, description="Only recipes <30min"),
     limit: int = Query(20, le=100),
     offset: int = Query(0),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Search recipes in database (BASIC Tier+)
@@ -36,15 +38,7 @@ async def search_recipes(
             detail="Recipe database requires BASIC tier or higher. Upgrade at /settings"
         )
 
-    # Base query
-    recipes_query = db.query(RecipeDB)
-
-    # Text search
-    if query:
-        recipes_query = recipes_query.filter(
-            (RecipeDB.name.ilike(f"%{query}%")) |
-            (RecipeDB.description.ilike(f"%{query}%"))
-        )
+    filters = []
 
     # Category filter
     if category:
@@ -58,24 +52,39 @@ async def search_recipes(
             "quick": RecipeDB.is_quick,
         }
         if category in category_map:
-            recipes_query = recipes_query.filter(category_map[category] == True)
+            filters.append(category_map[category] == True)
 
     # Nutritional filters
     if max_carbs is not None:
-        recipes_query = recipes_query.filter(RecipeDB.carbs <= max_carbs)
+        filters.append(RecipeDB.carbs <= max_carbs)
 
     if max_gi is not None:
-        recipes_query = recipes_query.filter(RecipeDB.gi <= max_gi)
+        filters.append(RecipeDB.gi <= max_gi)
 
     if quick_only:
-        recipes_query = recipes_query.filter(RecipeDB.is_quick == True)
+        filters.append(RecipeDB.is_quick == True)
+
+    match_query = recipe_fts.build_match_query(query) if query else None
+
+    def run_search(session):
+        if match_query and recipe_fts.enabled:
+            # Full-Text Search (FTS5): BM25 + Quality Score, Total + Seite in einer Abfrage
+            return recipe_fts.search(session, match_query, filters, limit, offset)
 
-    # Sort by quality score (curated recipes first)
-    recipes_query = recipes_query.order_by(RecipeDB.quality_score.desc())
+        recipes_query = session.query(RecipeDB).filter(*filters)
 
-    # Pagination
-    total = recipes_query.count()
-    recipes = recipes_query.offset(offset).limit(limit).all()
+        # Text search (Fallback ohne FTS5)
+        if query:
+            recipes_query = recipes_query.filter(
+                (RecipeDB.name.ilike(f"%{query}%")) |
+                (RecipeDB.description.ilike(f"%{query}%"))
+            )
+
+        # Sort by quality score (curated recipes first), Total + Seite in einer Abfrage
+        return paginate_with_total(recipes_query, RecipeDB.quality_score.desc(), limit, offset)
+
+    # Sync Query-Code über den async Treiber ausführen (kein Blockieren des Event Loops)
+    total, recipes = await db.run_sync(run_search)
 
     return {
         "total": total,
@@ -90,8 +99,8 @@ async def search_recipes(
 @router.get("/{recipe_id}")
 async def get_recipe(
     recipe_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get single recipe by ID (BASIC Tier+)
@@ -102,22 +111,22 @@ async def get_recipe(
             detail="Recipe database requires BASIC tier or higher"
         )
 
-    recipe = db.query(RecipeDB).filter(RecipeDB.id == recipe_id).first()
+    recipe = await db.get(RecipeDB, recipe_id)
 
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     # Increment usage count
     recipe.usage_count += 1
-    db.commit()
+    await db.commit()
 
     return recipe.to_dict()
 
 
 @router.get("/categories/list")
 async def list_categories(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get available categories with counts
@@ -128,17 +137,26 @@ async def list_categories(
             detail="Recipe database requires BASIC tier or higher"
         )
 
-    categories = {
-        "low_carb": db.query(RecipeDB).filter(RecipeDB.is_low_carb == True).count(),
-        "low_gi": db.query(RecipeDB).filter(RecipeDB.is_low_gi == True).count(),
-        "diabetic_friendly": db.query(RecipeDB).filter(RecipeDB.is_diabetic_friendly == True).count(),
-        "vegetarian": db.query(RecipeDB).filter(RecipeDB.is_vegetarian == True).count(),
-        "vegan": db.query(RecipeDB).filter(RecipeDB.is_vegan == True).count(),
-        "gluten_free": db.query(RecipeDB).filter(RecipeDB.is_gluten_free == True).count(),
-        "quick": db.query(RecipeDB).filter(RecipeDB.is_quick == True).count(),
+    category_columns = {
+        "low_carb": RecipeDB.is_low_carb,
+        "low_gi": RecipeDB.is_low_gi,
+        "diabetic_friendly": RecipeDB.is_diabetic_friendly,
+        "vegetarian": RecipeDB.is_vegetarian,
+        "vegan": RecipeDB.is_vegan,
+        "gluten_free": RecipeDB.is_gluten_free,
+        "quick": RecipeDB.is_quick,
     }
 
-    total = db.query(RecipeDB).count()
+    # Alle Zähler in einer Abfrage (COUNT(*) FILTER (WHERE ...))
+    counts = (await db.execute(
+        select(
+            func.count().label("total"),
+            *(func.count().filter(column == True).label(name) for name, column in category_columns.items())
+        ).select_from(RecipeDB)
+    )).one()
+
+    categories = {name: counts._mapping[name] for name in category_columns}
+    total = counts.total
 
     return {
         "total_recipes": total,
@@ -148,13 +166,13 @@ async def list_categories(
 
 @router.get("/stats")
 async def get_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get database statistics (FREE tier - info only)
     """
-    total = db.query(RecipeDB).count()
+    total = await db.scalar(select(func.count()).select_from(RecipeDB))
 
     return {
         "total_recipes": total,
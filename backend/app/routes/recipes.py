@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, NamedTuple, Tuple
 from datetime import datetime, date
 import json
 import re
@@ -17,20 +21,28 @@ from app.models.recipe import Recipe
 from app.models.ingredient import Ingredient
 from app.models.user import User
 from app.models.diet_profile import DietProfile
-from app.utils.database import get_db
-from app.utils.auth import get_current_user
+from app.utils.database import get_async_db, get_db, SessionLocal
+from app.utils.auth import get_current_user, get_current_user_async
 from app.services.mock_recipe_generator import mock_generator
 from app.services.ai_recipe_generator import ai_generator
-from app.services.pdf_generator import pdf_generator
+from app.services.generation_cache import generation_cache
+from app.services.request_coalescer import request_coalescer
+from app.services.recipe_stream_parser import IncrementalRecipeParser
+from app.services.service_registry import services
+from app.services.user_cache import user_cache
+from app.middleware.admission import AdmissionRejected, QueueStatus, ai_admission
 from app.services.ingredient_service import reduce_ingredient_quantity
 
 router = APIRouter(prefix="/recipes", tags=["Recipes"])
 
+# reportlab erst beim ersten PDF-Export laden
+pdf_generator = services.lazy("pdf_generator")
+
 
 def recipe_to_response(recipe: Recipe) -> RecipeResponse:
     """
     Convert Recipe DB model to RecipeResponse schema
-    Handles JSON parsing for ingredients, nutrition, and used_ingredients
+    JSON-Spalten kommen schon als list/dict aus der DB (JSONText)
     """
     return RecipeResponse(
         id=recipe.id,
@@ -41,104 +53,318 @@ def recipe_to_response(recipe: Recipe) -> RecipeResponse:
         cooking_time=recipe.cooking_time,
         method=recipe.method,
         servings=recipe.servings,
-        used_ingredients=json.loads(recipe.used_ingredients) if recipe.used_ingredients else [],
+        used_ingredients=recipe.used_ingredients or [],
         leftover_tips=recipe.leftover_tips,
-        ingredients=[RecipeIngredient(**ing) for ing in json.loads(recipe.ingredients_json)] if recipe.ingredients_json else [],
-        nutrition_per_serving=NutritionInfo(**json.loads(recipe.nutrition_json)) if recipe.nutrition_json else {},
+        ingredients=[RecipeIngredient(**ing) for ing in recipe.ingredients_json or []],
+        nutrition_per_serving=NutritionInfo(**recipe.nutrition_json) if recipe.nutrition_json else {},
         ai_provider=recipe.ai_provider,
         generated_at=recipe.generated_at
     )
 
 
+def build_generated_recipe(recipe_data: dict, user_id: int, servings: int, ai_provider: str) -> RecipeResponse:
+    """
+    KI-Rezept gegen RecipeResponse validieren (noch ohne DB-Zeile)
+    Raises ValidationError bei fehlenden/ungültigen Feldern
+    """
+    return RecipeResponse(
+        id=0,
+        user_id=user_id,
+        name=recipe_data.get("name"),
+        description=recipe_data.get("description"),
+        difficulty=recipe_data.get("difficulty"),
+        cooking_time=recipe_data.get("cooking_time"),
+        method=recipe_data.get("method"),
+        servings=recipe_data.get("servings") or servings,
+        used_ingredients=recipe_data.get("used_ingredients") or [],
+        leftover_tips=recipe_data.get("leftover_tips"),
+        ingredients=recipe_data.get("ingredients") or [],
+        nutrition_per_serving=recipe_data.get("nutrition_per_serving"),
+        ai_provider=recipe_data.get("ai_provider") or ai_provider,
+        generated_at=datetime.now()
+    )
+
+
+def save_generated_recipe(db: Session, recipe: RecipeResponse) -> RecipeResponse:
+    """Validiertes Rezept als Recipe speichern, Response mit echter ID zurückgeben"""
+    new_recipe = Recipe(
+        user_id=recipe.user_id,
+        name=recipe.name,
+        description=recipe.description,
+        difficulty=recipe.difficulty,
+        cooking_time=recipe.cooking_time,
+        method=recipe.method,
+        servings=recipe.servings,
+        used_ingredients=recipe.used_ingredients,
+        leftover_tips=recipe.leftover_tips,
+        ingredients_json=[ing.model_dump() for ing in recipe.ingredients],
+        nutrition_json=recipe.nutrition_per_serving.model_dump(exclude_none=True),
+        ai_provider=recipe.ai_provider
+    )
+    db.add(new_recipe)
+    db.commit()
+
+    return recipe.model_copy(update={"id": new_recipe.id, "generated_at": new_recipe.generated_at})
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Benanntes SSE-Event (event: <name>)"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 def check_daily_limit(user: User, db: Session) -> bool:
-    """Prüfe ob User noch Rezepte generieren darf"""
+    """
+    Prüfe ob User noch Rezepte generieren darf
+    Zähler + Tier frisch aus der DB - der User aus get_current_user ist ein
+    Cache-Snapshot, Writes anderer Worker wären darin noch nicht sichtbar
+    """
+    db.refresh(user)
     today = date.today()
-    
-    # Reset Counter wenn neuer Tag
+
+    # Reset Counter wenn neuer Tag (bedingtes UPDATE: zählt keinen parallelen Request weg)
     if user.last_recipe_date is None or user.last_recipe_date.date() < today:
-        user.daily_recipe_count = 0
-        user.last_recipe_date = datetime.utcnow()
+        today_start = datetime.combine(today, datetime.min.time())
+        db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .where(or_(User.last_recipe_date.is_(None), User.last_recipe_date < today_start))
+            .values(daily_recipe_count=0, last_recipe_date=datetime.utcnow())
+        )
         db.commit()
-    
+        user_cache.invalidate(user.id)
+
     # Prüfe Limit
     return user.daily_recipe_count < user.daily_limit
 
 def increment_recipe_count(user: User, db: Session):
-    """Erhöhe täglichen Rezept-Counter"""
-    user.daily_recipe_count += 1
-    user.last_recipe_date = datetime.utcnow()
-    db.commit()
-
-@router.post("/generate/stream")
-def generate_recipes_stream(
-    request: RecipeGenerateRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
     """
-    Stream recipe generation in real-time (Server-Sent Events)
-
-    - Returns text tokens as they are generated
-    - User sees AI "typing" the recipe live
-    - Only works with Ollama (Free tier) - Pro users use fast non-streaming Gemini
+    Erhöhe täglichen Rezept-Counter
+    Atomar in der DB (count = count + 1) statt Read-Modify-Write auf dem User
     """
-    # 1. Daily Limit Check
-    if not check_daily_limit(current_user, db):
+    db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(daily_recipe_count=User.daily_recipe_count + 1, last_recipe_date=datetime.utcnow())
+    )
+    db.commit()
+    # Core-UPDATE löst keine Mapper-Events aus → Cache-Eintrag selbst entfernen
+    user_cache.invalidate(user.id)
+
+def require_daily_limit(user: User, db: Session):
+    """Tageslimit erreicht → 429 (sync, aus async Routen per run_in_threadpool)"""
+    if not check_daily_limit(user, db):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={"error": "daily_limit_reached", "message": "Tageslimit erreicht"}
+            detail={
+                "error": "daily_limit_reached",
+                "message": f"Tageslimit erreicht ({user.daily_limit} Rezepte). Upgrade für mehr!",
+                "daily_limit": user.daily_limit,
+                "subscription_tier": user.subscription_tier.value
+            }
         )
 
-    # 2. Load ingredients
+
+class GenerationInputs(NamedTuple):
+    """Was eine Generierung aus der DB braucht"""
+    ingredient_names: List[str]
+    diabetes_unit: str
+    user_id: int
+    user_tier: str
+    use_cache: bool
+
+
+def load_generation_inputs(request: RecipeGenerateRequest, user: User, db: Session) -> GenerationInputs:
+    """
+    Tageslimit prüfen, Zutaten + Diabetes-Einheit laden
+    Sync Session → aus async Routen per run_in_threadpool aufrufen
+    """
+    # 1. Daily Limit Check
+    require_daily_limit(user, db)
+
+    # 2. Zutaten laden
     ingredients = db.query(Ingredient).filter(
         Ingredient.id.in_(request.ingredient_ids),
-        Ingredient.user_id == current_user.id
+        Ingredient.user_id == user.id
     ).all()
 
     if not ingredients:
-        raise HTTPException(status_code=400, detail="Keine Zutaten gefunden")
-
-    ingredient_names = [ing.name for ing in ingredients]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Keine gültigen Zutaten gefunden"
+        )
 
-    # 3. Get diabetes unit
+    # 3. Diabetes-Einheit aus aktivem Profil laden (oder aus Request)
     diabetes_unit = request.diabetes_unit or "KE"
+
+    # Aktives Diabetes-Profil pruefen fuer Unit-Einstellung
     active_diabetes_profile = db.query(DietProfile).filter(
-        DietProfile.user_id == current_user.id,
+        DietProfile.user_id == user.id,
         DietProfile.profile_type == "diabetic",
         DietProfile.is_active == True
     ).first()
 
-    if active_diabetes_profile and active_diabetes_profile.settings_json:
-        try:
-            settings = json.loads(active_diabetes_profile.settings_json)
-            diabetes_unit = settings.get("unit", "KE")
-        except:
-            pass
+    if active_diabetes_profile and isinstance(active_diabetes_profile.settings_json, dict):
+        diabetes_unit = active_diabetes_profile.settings_json.get("unit", "KE")
+
+    return GenerationInputs(
+        ingredient_names=[ing.name for ing in ingredients],
+        diabetes_unit=diabetes_unit,
+        user_id=user.id,
+        user_tier=user.subscription_tier.value,
+        use_cache=user.use_generation_cache
+    )
+
+
+def store_generated_recipes(
+    generated_recipes: List[dict], user: User, servings: int, db: Session
+) -> Tuple[List[RecipeResponse], int]:
+    """
+    Generierte Rezepte speichern + Tageszähler erhöhen → (Responses, heute noch verfügbar)
+    Sync Session → aus async Routen per run_in_threadpool aufrufen
+    """
+    saved_recipes = []
+    for recipe_data in generated_recipes:
+        new_recipe = Recipe(
+            user_id=user.id,
+            name=recipe_data["name"],
+            description=recipe_data["description"],
+            difficulty=recipe_data["difficulty"],
+            cooking_time=recipe_data["cooking_time"],
+            method=recipe_data["method"],
+            servings=recipe_data.get("servings", servings),  # AI-Rezepte liefern keine servings
+            used_ingredients=recipe_data["used_ingredients"],
+            leftover_tips=recipe_data["leftover_tips"],
+            ingredients_json=recipe_data["ingredients"],
+            nutrition_json=recipe_data["nutrition_per_serving"],
+            ai_provider=recipe_data["ai_provider"]
+        )
+
+        db.add(new_recipe)
+        db.flush()  # Um ID zu bekommen
+
+        # Response-Format erstellen
+        recipe_response = RecipeResponse(
+            id=new_recipe.id,
+            user_id=new_recipe.user_id,
+            name=new_recipe.name,
+            description=new_recipe.description,
+            difficulty=new_recipe.difficulty,
+            cooking_time=new_recipe.cooking_time,
+            method=new_recipe.method,
+            servings=new_recipe.servings,
+            used_ingredients=recipe_data["used_ingredients"],
+            leftover_tips=recipe_data["leftover_tips"],
+            ingredients=[RecipeIngredient(**ing) for ing in recipe_data["ingredients"]],
+            nutrition_per_serving=NutritionInfo(**recipe_data["nutrition_per_serving"]),
+            ai_provider=new_recipe.ai_provider,
+            generated_at=new_recipe.generated_at
+        )
+
+        saved_recipes.append(recipe_response)
+
+    db.commit()
+
+    # Counter erhöhen
+    increment_recipe_count(user, db)
+
+    return saved_recipes, user.daily_limit - user.daily_recipe_count
+
+
+@router.post("/generate/stream")
+@ai_admission(pool="ollama", pro_pool="gemini")
+async def generate_recipes_stream(
+    request: RecipeGenerateRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream recipe generation in real-time (Server-Sent Events)
+
+    - Returns text tokens as they are generated
+    - User sees AI "typing" the recipe live
+    - Each recipe is parsed, validated and saved as soon as its JSON object
+      is complete, then sent as a typed `event: recipe` (RecipeResponse)
+    - While waiting for an AI slot: `event: queued` with position + ETA
+      (position 0 = slot granted), queue full: `event: rate_limit_exceeded`
+    - Free tier streams from Ollama, Pro tier from Gemini (Ollama fallback)
+    """
+    # 1.-3. Tageslimit, Zutaten, Diabetes-Einheit (sync Session → Threadpool)
+    inputs = await run_in_threadpool(load_generation_inputs, request, current_user, db)
+    ingredient_names, diabetes_unit = inputs.ingredient_names, inputs.diabetes_unit
 
     # 4. Stream generator function
-    def event_stream():
-        """SSE format: data: <content>\n\n"""
+    # Werte aus inputs: der Stream startet erst, wenn die Request-Session schon zu ist
+    user_id, user_tier = inputs.user_id, inputs.user_tier
+
+    def token_source():
+        return ai_generator.generate_with_streaming(
+            ingredients=ingredient_names,
+            count=3,
+            servings=request.servings,
+            diet_profiles=request.diet_profiles,
+            diabetes_unit=diabetes_unit,
+            language=request.language,
+            user_tier=user_tier
+        )
+
+    # Identische Streams, die gerade laufen, teilen sich einen Ollama-Lauf
+    if inputs.use_cache:
+        # PRO streamt von Gemini, alle anderen von Ollama → getrennte Läufe
+        stream_key = generation_cache.fingerprint(
+            ingredient_names, 3, request.servings, request.diet_profiles, diabetes_unit, request.language,
+            ai_generator.provider_for(user_tier)
+        )
+        tokens = request_coalescer.stream(stream_key, token_source)
+    else:
+        tokens = token_source()
+
+    async def event_stream():
+        """SSE format: data: <content>\n\n (+ event: recipe / recipe_error)"""
+        parser = IncrementalRecipeParser()
+        # Eigene Session: die Request-Session ist beim Streamen schon geschlossen.
+        # Commits laufen im Threadpool - parallel laufende Streams warten nicht darauf
+        stream_db = SessionLocal()
+        saved = 0
+        provider = "ollama"
         try:
-            for token in ai_generator.generate_with_streaming(
-                ingredients=ingredient_names,
-                count=3,
-                servings=request.servings,
-                diet_profiles=request.diet_profiles,
-                diabetes_unit=diabetes_unit,
-                language=request.language,
-                user_tier=current_user.subscription_tier.value
-            ):
+            async for token in tokens:
+                if isinstance(token, QueueStatus):
+                    # Wartet auf einen AI-Slot: Position + ETA (position 0 = Slot erhalten)
+                    yield sse_event("queued", token.to_dict())
+                    continue
+                provider = getattr(token, "provider", provider)
                 # SSE format
                 yield f"data: {json.dumps({'token': token})}\n\n"
 
+                # Fertige Rezept-Objekte sofort validieren + speichern
+                for recipe_data in parser.feed(token):
+                    try:
+                        recipe = build_generated_recipe(recipe_data, user_id, request.servings, provider)
+                    except ValidationError as e:
+                        yield sse_event("recipe_error", {
+                            "index": parser.recipes_found - 1,
+                            "message": f"Ungültiges Rezept übersprungen ({e.error_count()} Fehler)"
+                        })
+                        continue
+
+                    recipe = await run_in_threadpool(save_generated_recipe, stream_db, recipe)
+                    saved += 1
+                    yield sse_event("recipe", recipe.model_dump(mode="json"))
+
             # Signal completion
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            yield f"data: {json.dumps({'done': True, 'recipes_saved': saved})}\n\n"
 
+        except AdmissionRejected as e:
+            # Header sind schon raus → Ablehnung (Queue voll, ETA) als eigenes Event
+            yield sse_event("rate_limit_exceeded", e.detail)
         except Exception as e:
+            await run_in_threadpool(stream_db.rollback)
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            await run_in_threadpool(stream_db.close)
 
     # Increment counter
-    increment_recipe_count(current_user, db)
+    await run_in_threadpool(increment_recipe_count, current_user, db)
 
     # Return SSE stream
     return StreamingResponse(
@@ -151,7 +377,8 @@ def generate_recipes_stream(
     )
 
 @router.post("/generate", response_model=RecipeListResponse)
-def generate_recipes(
+@ai_admission(pool="ollama", pro_pool="gemini")
+async def generate_recipes(
     request: RecipeGenerateRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -173,53 +400,15 @@ def generate_recipes(
     - Basic: 50 Rezepte/Tag
     - Premium: Unbegrenzt
     """
-    # 1. Daily Limit Check
-    if not check_daily_limit(current_user, db):
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={
-                "error": "daily_limit_reached",
-                "message": f"Tageslimit erreicht ({current_user.daily_limit} Rezepte). Upgrade für mehr!",
-                "daily_limit": current_user.daily_limit,
-                "subscription_tier": current_user.subscription_tier.value
-            }
-        )
-    
-    # 2. Zutaten laden
-    ingredients = db.query(Ingredient).filter(
-        Ingredient.id.in_(request.ingredient_ids),
-        Ingredient.user_id == current_user.id
-    ).all()
-    
-    if not ingredients:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Keine gültigen Zutaten gefunden"
-        )
-    
-    ingredient_names = [ing.name for ing in ingredients]
-    
-    # 3. Diabetes-Einheit aus aktivem Profil laden (oder aus Request)
-    diabetes_unit = request.diabetes_unit or "KE"
-
-    # Aktives Diabetes-Profil pruefen fuer Unit-Einstellung
-    active_diabetes_profile = db.query(DietProfile).filter(
-        DietProfile.user_id == current_user.id,
-        DietProfile.profile_type == "diabetic",
-        DietProfile.is_active == True
-    ).first()
-
-    if active_diabetes_profile and active_diabetes_profile.settings_json:
-        try:
-            settings = json.loads(active_diabetes_profile.settings_json)
-            diabetes_unit = settings.get("unit", "KE")
-        except (json.JSONDecodeError, TypeError):
-            pass
+    # 1.-3. Tageslimit, Zutaten, Diabetes-Einheit (sync Session → Threadpool)
+    inputs = await run_in_threadpool(load_generation_inputs, request, current_user, db)
+    ingredient_names, diabetes_unit = inputs.ingredient_names, inputs.diabetes_unit
 
     # 4. Generate recipes based on provider and user tier
     if request.ai_provider == "mock":
-        # Mock Generator - Always free
-        generated_recipes = mock_generator.generate_recipes(
+        # Mock Generator - Always free (Nährwerte per sync OpenFoodFacts-Lookup → Threadpool)
+        generated_recipes = await run_in_threadpool(
+            mock_generator.generate_recipes,
             ingredients=ingredient_names,
             count=3,
             servings=request.servings,
@@ -229,16 +418,30 @@ def generate_recipes(
         )
     elif request.ai_provider == "ai":
         # AI Generator - Tier-based (Free: Ollama, Pro: Gemini with Ollama fallback)
+        # Identische Anfrage kürzlich generiert → Ergebnis aus dem Cache
+        provider = ai_generator.provider_for(inputs.user_tier)
+        cache_key = generation_cache.fingerprint(
+            ingredient_names, 3, request.servings, request.diet_profiles, diabetes_unit, request.language,
+            provider
+        )
         try:
-            generated_recipes = ai_generator.generate_recipes(
-                ingredients=ingredient_names,
-                count=3,
-                servings=request.servings,
-                diet_profiles=request.diet_profiles,
-                diabetes_unit=diabetes_unit,
-                language=request.language,
-                user_tier=current_user.subscription_tier.value
+            generated_recipes = await generation_cache.get_or_generate(
+                cache_key,
+                lambda: ai_generator.generate_recipes(
+                    ingredients=ingredient_names,
+                    count=3,
+                    servings=request.servings,
+                    diet_profiles=request.diet_profiles,
+                    diabetes_unit=diabetes_unit,
+                    language=request.language,
+                    user_tier=inputs.user_tier
+                ),
+                use_cache=inputs.use_cache,
+                provider=provider
             )
+        except AdmissionRejected:
+            # Queue voll → 429 mit ETA (Exception-Handler in main.py)
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -254,55 +457,12 @@ def generate_recipes(
             detail=f"Ungültiger AI Provider '{request.ai_provider}'. Nutze 'mock' oder 'ai'."
         )
 
-    # 5. In Datenbank speichern
-    saved_recipes = []
-    for recipe_data in generated_recipes:
-        new_recipe = Recipe(
-            user_id=current_user.id,
-            name=recipe_data["name"],
-            description=recipe_data["description"],
-            difficulty=recipe_data["difficulty"],
-            cooking_time=recipe_data["cooking_time"],
-            method=recipe_data["method"],
-            servings=recipe_data["servings"],
-            used_ingredients=json.dumps(recipe_data["used_ingredients"]),
-            leftover_tips=recipe_data["leftover_tips"],
-            ingredients_json=json.dumps(recipe_data["ingredients"]),
-            nutrition_json=json.dumps(recipe_data["nutrition_per_serving"]),
-            ai_provider=recipe_data["ai_provider"]
-        )
-        
-        db.add(new_recipe)
-        db.flush()  # Um ID zu bekommen
-        
-        # Response-Format erstellen
-        recipe_response = RecipeResponse(
-            id=new_recipe.id,
-            user_id=new_recipe.user_id,
-            name=new_recipe.name,
-            description=new_recipe.description,
-            difficulty=new_recipe.difficulty,
-            cooking_time=new_recipe.cooking_time,
-            method=new_recipe.method,
-            servings=new_recipe.servings,
-            used_ingredients=recipe_data["used_ingredients"],
-            leftover_tips=recipe_data["leftover_tips"],
-            ingredients=[RecipeIngredient(**ing) for ing in recipe_data["ingredients"]],
-            nutrition_per_serving=NutritionInfo(**recipe_data["nutrition_per_serving"]),
-            ai_provider=new_recipe.ai_provider,
-            generated_at=new_recipe.generated_at
-        )
-        
-        saved_recipes.append(recipe_response)
-    
-    db.commit()
-    
-    # 5. Counter erhöhen
-    increment_recipe_count(current_user, db)
-    
+    # 5. In Datenbank speichern + Counter erhöhen
+    saved_recipes, remaining = await run_in_threadpool(
+        store_generated_recipes, generated_recipes, current_user, request.servings, db
+    )
+
     # 6. Response
-    remaining = current_user.daily_limit - current_user.daily_recipe_count
-    
     return RecipeListResponse(
         recipes=saved_recipes,
         count=len(saved_recipes),
@@ -311,19 +471,22 @@ def generate_recipes(
     )
 
 @router.get("/history", response_model=List[RecipeResponse])
-def get_recipe_history(
+async def get_recipe_history(
     limit: int = 20,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Rezept-Historie abrufen
     
     - **limit**: Max. Anzahl Rezepte (default: 20)
     """
-    recipes = db.query(Recipe).filter(
-        Recipe.user_id == current_user.id
-    ).order_by(Recipe.generated_at.desc()).limit(limit).all()
+    recipes = (await db.scalars(
+        select(Recipe)
+        .where(Recipe.user_id == current_user.id)
+        .order_by(Recipe.generated_at.desc())
+        .limit(limit)
+    )).all()
     
     # Parse JSON fields using helper function
     return [recipe_to_response(recipe) for recipe in recipes]
@@ -384,8 +547,8 @@ def calculate_portions(
         )
 
     # Parse ingredients
-    ingredients = json.loads(recipe.ingredients_json) if recipe.ingredients_json else []
-    nutrition = json.loads(recipe.nutrition_json) if recipe.nutrition_json else {}
+    ingredients = recipe.ingredients_json or []
+    nutrition = recipe.nutrition_json or {}
 
     # Calculate multiplier
     original_servings = recipe.servings or 2
@@ -421,7 +584,7 @@ def calculate_portions(
         cooking_time=recipe.cooking_time,
         method=recipe.method,
         servings=servings,  # New servings
-        used_ingredients=json.loads(recipe.used_ingredients) if recipe.used_ingredients else [],
+        used_ingredients=recipe.used_ingredients or [],
         leftover_tips=recipe.leftover_tips,
         ingredients=[RecipeIngredient(**ing) for ing in adjusted_ingredients],
         nutrition_per_serving=NutritionInfo(**nutrition),  # Per serving stays same
@@ -463,8 +626,8 @@ def export_recipe_as_pdf(
         "cooking_time": recipe.cooking_time,
         "method": recipe.method,
         "servings": recipe.servings,
-        "ingredients": json.loads(recipe.ingredients_json) if recipe.ingredients_json else [],
-        "nutrition_per_serving": json.loads(recipe.nutrition_json) if recipe.nutrition_json else {}
+        "ingredients": recipe.ingredients_json or [],
+        "nutrition_per_serving": recipe.nutrition_json or {}
     }
 
     # Generate PDF
@@ -487,15 +650,15 @@ def export_recipe_as_pdf(
 @router.post("/{recipe_id}/mark-cooked")
 async def mark_recipe_as_cooked(
     recipe_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Als gekocht markieren - reduziert Zutatenmengen"""
 
-    recipe = db.query(Recipe).filter(
+    recipe = await db.scalar(select(Recipe).where(
         Recipe.id == recipe_id,
         Recipe.user_id == current_user.id
-    ).first()
+    ))
 
     if not recipe:
         raise HTTPException(404, "Rezept nicht gefunden")
@@ -503,10 +666,8 @@ async def mark_recipe_as_cooked(
     if not recipe.ingredients_json:
         raise HTTPException(400, "Keine Zutaten vorhanden")
 
-    # Parse Zutaten
-    try:
-        ingredients = json.loads(recipe.ingredients_json)
-    except:
+    ingredients = recipe.ingredients_json
+    if not isinstance(ingredients, list):
         raise HTTPException(400, "Ungültige Zutatendaten")
 
     # Reduziere Mengen
@@ -3,7 +3,6 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
-import json
 import secrets
 import hashlib
 
@@ -111,8 +110,8 @@ def create_share_link(
             "cooking_time": recipe.cooking_time,
             "method": recipe.method,
             "servings": recipe.servings,
-            "ingredients": json.loads(recipe.ingredients_json) if recipe.ingredients_json else [],
-            "nutrition_per_serving": json.loads(recipe.nutrition_json) if recipe.nutrition_json else {},
+            "ingredients": recipe.ingredients_json or [],
+            "nutrition_per_serving": recipe.nutrition_json or {},
         }
 
     # Load favorite (favorites reference recipes via recipe_id)
@@ -143,8 +142,8 @@ def create_share_link(
             "cooking_time": favorite.recipe.cooking_time,
             "method": favorite.recipe.method,
             "servings": favorite.recipe.servings,
-            "ingredients": json.loads(favorite.recipe.ingredients_json) if favorite.recipe.ingredients_json else [],
-            "nutrition_per_serving": json.loads(favorite.recipe.nutrition_json) if favorite.recipe.nutrition_json else {},
+            "ingredients": favorite.recipe.ingredients_json or [],
+            "nutrition_per_serving": favorite.recipe.nutrition_json or {},
         }
 
     # Generate share ID
@@ -18,6 +18,7 @@ from app.models.favorite import Favorite
 from app.models.user import User
 from app.utils.database import get_db
 from app.utils.auth import get_current_user
+from app.utils.ingredient_lexicon import IngredientLexicon
 
 router = APIRouter(prefix="/shopping-list", tags=["Shopping List"])
 
@@ -70,13 +71,13 @@ INGREDIENT_CATEGORIES = {
 }
 
 
+# Compiled once: longest matching key wins (independent of dict order)
+CATEGORY_LEXICON = IngredientLexicon(INGREDIENT_CATEGORIES)
+
+
 def categorize_ingredient(name: str) -> str:
     """Determine category for an ingredient"""
-    normalized = name.lower().strip()
-    for key, category in INGREDIENT_CATEGORIES.items():
-        if key in normalized:
-            return category
-    return 'Other'
+    return CATEGORY_LEXICON.lookup(name, default='Other')
 
 
 def parse_amount(amount_str: str) -> tuple:
@@ -171,8 +172,8 @@ def generate_shopping_list(
         for recipe in recipes:
             recipe_names.append(recipe.name)
             if recipe.ingredients_json:
-                ingredients = json.loads(recipe.ingredients_json)
-                for ing in ingredients:
+                # Kopien: die Liste gehört zum geladenen Recipe
+                for ing in map(dict, recipe.ingredients_json):
                     # Scale amounts
                     if request.scale_factor != 1.0:
                         num, unit = parse_amount(ing.get('amount', '1'))
@@ -191,8 +192,7 @@ def generate_shopping_list(
             if fav.recipe:
                 recipe_names.append(fav.recipe.name)
                 if fav.recipe.ingredients_json:
-                    ingredients = json.loads(fav.recipe.ingredients_json)
-                    for ing in ingredients:
+                    for ing in map(dict, fav.recipe.ingredients_json):
                         # Scale amounts
                         if request.scale_factor != 1.0:
                             num, unit = parse_amount(ing.get('amount', '1'))
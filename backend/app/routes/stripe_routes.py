@@ -11,18 +11,20 @@ Freemium Tiers:
 - BUSINESS Praxis: 79,99€/Monat
 """
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.utils.database import get_db
+from app.utils.database import get_async_db, get_db
 from app.models.user import User, SubscriptionTier
-from app.routes.auth import get_current_user
+from app.utils.auth import get_current_user, get_current_user_for_update
 from app.config import settings
-import stripe
+from app.services.service_registry import services
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Stripe API Key (aus .env)
-stripe.api_key = getattr(settings, "STRIPE_SECRET_KEY", "")
+# Stripe SDK erst beim ersten Zugriff importieren (API Key wird dabei aus .env gesetzt)
+stripe = services.lazy("stripe")
 
 router = APIRouter(prefix="/stripe", tags=["Stripe"])
 
@@ -50,7 +52,7 @@ PRICE_IDS = {
 @router.post("/create-checkout-session")
 async def create_checkout_session(
     data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_for_update),  # setzt stripe_customer_id
     db: Session = Depends(get_db)
 ):
     """
@@ -113,7 +115,7 @@ async def create_checkout_session(
 @router.post("/webhook")
 async def stripe_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Stripe Webhook Handler
@@ -161,12 +163,16 @@ async def stripe_webhook(
     return {"status": "success"}
 
 
-async def _handle_subscription_created(data: dict, db: Session):
+async def _user_for_customer(db: AsyncSession, customer_id: str):
+    return await db.scalar(select(User).where(User.stripe_customer_id == customer_id).limit(1))
+
+
+async def _handle_subscription_created(data: dict, db: AsyncSession):
     """Subscription erstellt"""
     customer_id = data.get("customer")
     price_id = data["items"]["data"][0]["price"]["id"]
 
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    user = await _user_for_customer(db, customer_id)
     if not user:
         logger.error(f"User not found for customer: {customer_id}")
         return
@@ -174,49 +180,49 @@ async def _handle_subscription_created(data: dict, db: Session):
     # Setze Tier basierend auf Price ID
     tier = _get_tier_from_price_id(price_id)
     user.subscription_tier = tier
-    db.commit()
+    await db.commit()
 
     logger.info(f"Subscription created: {user.email} → {tier.value}")
 
 
-async def _handle_subscription_updated(data: dict, db: Session):
+async def _handle_subscription_updated(data: dict, db: AsyncSession):
     """Subscription aktualisiert (z.B. Upgrade/Downgrade)"""
     customer_id = data.get("customer")
     price_id = data["items"]["data"][0]["price"]["id"]
 
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    user = await _user_for_customer(db, customer_id)
     if not user:
         logger.error(f"User not found for customer: {customer_id}")
         return
 
     tier = _get_tier_from_price_id(price_id)
     user.subscription_tier = tier
-    db.commit()
+    await db.commit()
 
     logger.info(f"Subscription updated: {user.email} → {tier.value}")
 
 
-async def _handle_subscription_deleted(data: dict, db: Session):
+async def _handle_subscription_deleted(data: dict, db: AsyncSession):
     """Subscription gekündigt"""
     customer_id = data.get("customer")
 
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    user = await _user_for_customer(db, customer_id)
     if not user:
         logger.error(f"User not found for customer: {customer_id}")
         return
 
     # Zurück zu FREE Tier
     user.subscription_tier = SubscriptionTier.FREE
-    db.commit()
+    await db.commit()
 
     logger.info(f"Subscription deleted: {user.email} → FREE")
 
 
-async def _handle_payment_failed(data: dict, db: Session):
+async def _handle_payment_failed(data: dict, db: AsyncSession):
     """Zahlung fehlgeschlagen"""
     customer_id = data.get("customer")
 
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    user = await _user_for_customer(db, customer_id)
     if not user:
         return
 
@@ -4,7 +4,7 @@ from app.schemas.user import UserResponse, UserUpdate
 from app.utils.password import hash_password
 from app.models.user import User
 from app.utils.database import get_db
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, get_current_user_for_update
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -20,7 +20,7 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
 @router.patch("/me", response_model=UserResponse)
 def update_user_profile(
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_for_update),
     db: Session = Depends(get_db)
 ):
     """
@@ -29,6 +29,7 @@ def update_user_profile(
     - **name**: Neuer Name
     - **email**: Neue Email (muss unique sein!)
     - **password**: Neues Passwort (wird gehasht)
+    - **use_generation_cache**: false = AI-Rezepte immer neu generieren
     """
     update_fields = user_data.model_dump(exclude_unset=True)
 
@@ -66,7 +67,7 @@ def update_user_profile(
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_account(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_for_update),
     db: Session = Depends(get_db)
 ):
     """
@@ -35,6 +35,7 @@ class UserResponse(BaseModel):
     subscription_tier: str
     daily_recipe_count: int
     daily_limit: int
+    use_generation_cache: bool = True
     created_at: datetime
 
     class Config:
@@ -59,6 +60,7 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     password: Optional[str] = None
     emoji: Optional[str] = None
+    use_generation_cache: Optional[bool] = None
 
     @field_validator('username')
     @classmethod
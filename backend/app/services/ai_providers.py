@@ -0,0 +1,284 @@
+"""
+AI Provider Layer - Async HTTP Clients für Gemini und Ollama
+
+- Ein langlebiger httpx.AsyncClient pro Provider (Keep-Alive, Connection Pool)
+- Verbindungslimits pro Provider (Ollama auf dem Pi: wenige, Gemini: mehr)
+- Laufende Generierungen kosten Coroutinen statt Threadpool-Worker
+- Jeder Aufruf meldet Erfolg/Fehler an den Circuit Breaker des Providers
+- Optional: `usage` Dict wird mit output_tokens + truncated (Token-Limit erreicht) gefüllt
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+import json
+import logging
+
+import httpx
+
+from app.services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class StreamToken(str):
+    """Token-Text + Provider, der ihn erzeugt hat (verhält sich wie str)"""
+
+    provider: str
+
+    def __new__(cls, text: str, provider: str):
+        token = super().__new__(cls, text)
+        token.provider = provider
+        return token
+
+
+class AIProvider(ABC):
+    """Basis: lazy erzeugter, geteilter AsyncClient mit Pool-Limits"""
+
+    name = "base"
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        max_connections: int,
+        keepalive_expiry: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.breaker = breaker or CircuitBreaker(self.name)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+        return self._client
+
+    @contextmanager
+    def _tracked(self):
+        """
+        Ergebnis eines Aufrufs an den Breaker melden (Abbruch zählt nicht als Fehler)
+        half_open: nur ein Probeaufruf gleichzeitig, alle anderen → CircuitOpenError
+        """
+        trial = self.breaker.begin_call()
+        try:
+            yield
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Abgebrochen (Client weg, Hedge verloren) → kein Ergebnis, Probeaufruf wieder frei
+            if trial:
+                self.breaker.cancel_trial()
+            raise
+        else:
+            self.breaker.record_success()
+
+    @abstractmethod
+    async def health_check(self, timeout: float) -> bool:
+        """Günstiger Request gegen den Provider: True = erreichbar und einsatzbereit"""
+
+    async def probe(self, timeout: float = 2.0) -> bool:
+        """Günstiger Erreichbarkeits-Check (Health Probe), Ergebnis geht an den Breaker"""
+        try:
+            healthy = await self.health_check(timeout)
+        except Exception as e:
+            logger.warning(f"{self.name} health probe failed: {e}")
+            healthy = False
+        self.breaker.record_probe(healthy)
+        return healthy
+
+    async def aclose(self):
+        """Client schließen (App-Shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+class OllamaProvider(AIProvider):
+    """Lokales Ollama (/api/generate)"""
+
+    name = "ollama"
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        timeout: float = 180.0,
+        max_connections: int = 4,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        super().__init__(base_url, timeout, max_connections, breaker=breaker)
+        self.model = model
+        self.residency = None  # OllamaResidencyManager (keep_alive + Load-Events), optional
+
+    def _payload(self, prompt: str, options: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options,
+        }
+        if self.residency is not None:
+            payload["keep_alive"] = self.residency.keep_alive_for_request()
+        return payload
+
+    def _observe(self, response: Dict[str, Any], usage: Optional[Dict[str, Any]]):
+        if usage is not None:
+            usage["output_tokens"] = response.get("eval_count", 0)
+            usage["truncated"] = response.get("done_reason") == "length"
+        if self.residency is not None:
+            self.residency.observe(response, source="request")
+
+    async def generate(self, prompt: str, options: Dict[str, Any], usage: Optional[Dict[str, Any]] = None) -> str:
+        """Komplette Antwort (stream=False)"""
+        with self._tracked():
+            response = await self.client.post("/api/generate", json=self._payload(prompt, options, stream=False))
+            response.raise_for_status()
+            result = response.json()
+            self._observe(result, usage)
+            return result["response"]
+
+    async def stream(
+        self, prompt: str, options: Dict[str, Any], usage: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Tokens, sobald sie ankommen (NDJSON-Stream)"""
+        with self._tracked():
+            async with self.client.stream(
+                "POST", "/api/generate", json=self._payload(prompt, options, stream=True)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("done"):
+                        self._observe(chunk, usage)
+                    if chunk.get("response"):
+                        yield StreamToken(chunk["response"], self.name)
+
+    async def health_check(self, timeout: float) -> bool:
+        response = await self.client.get("/api/tags", timeout=timeout)
+        return response.status_code == 200
+
+    async def warm(self, keep_alive: str) -> Dict[str, Any]:
+        """Modell laden bzw. geladen halten (leerer Prompt → keine Generierung)"""
+        response = await self.client.post("/api/generate", json={
+            "model": self.model,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": keep_alive,
+        })
+        response.raise_for_status()
+        return response.json()
+
+    async def loaded(self) -> bool:
+        """Ist das Modell gerade im Speicher? (/api/ps)"""
+        response = await self.client.get("/api/ps", timeout=5.0)
+        response.raise_for_status()
+        names = {entry.get("name", "") for entry in response.json().get("models", [])}
+        return any(name == self.model or name.split(":")[0] == self.model for name in names)
+
+
+class GeminiProvider(AIProvider):
+    """Google Gemini (generateContent)"""
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str,
+        base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        super().__init__(base_url, timeout, max_connections, breaker=breaker)
+        self.api_key = api_key
+        self.model = model
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _auth_headers(self) -> Dict[str, str]:
+        # Key als Header statt ?key=... → taucht nicht in URLs/Fehlermeldungen auf
+        return {"x-goog-api-key": self.api_key or ""}
+
+    @staticmethod
+    def _record_usage(chunk: Dict[str, Any], usage: Optional[Dict[str, Any]]):
+        """finishReason/usageMetadata (bei Streams kumulativ, letzter Wert zählt)"""
+        if usage is None:
+            return
+        if "usageMetadata" in chunk:
+            usage["output_tokens"] = chunk["usageMetadata"].get("candidatesTokenCount", 0)
+        for candidate in chunk.get("candidates", [])[:1]:
+            if candidate.get("finishReason"):
+                usage["truncated"] = candidate["finishReason"] == "MAX_TOKENS"
+
+    @staticmethod
+    def _payload(prompt: str, generation_config: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "contents": [{
+                "parts": [{"text": prompt}]
+            }],
+            "generationConfig": generation_config,
+        }
+
+    async def generate(
+        self, prompt: str, generation_config: Dict[str, Any], usage: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Komplette Antwort"""
+        with self._tracked():
+            response = await self.client.post(
+                f"/models/{self.model}:generateContent",
+                headers=self._auth_headers(),
+                json=self._payload(prompt, generation_config),
+            )
+            response.raise_for_status()
+
+            result = response.json()
+            self._record_usage(result, usage)
+            return result["candidates"][0]["content"]["parts"][0]["text"]
+
+    async def stream(
+        self, prompt: str, generation_config: Dict[str, Any], usage: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Tokens per streamGenerateContent (alt=sse: eine JSON-Antwort pro data:-Zeile)"""
+        with self._tracked():
+            async with self.client.stream(
+                "POST",
+                f"/models/{self.model}:streamGenerateContent",
+                params={"alt": "sse"},
+                headers=self._auth_headers(),
+                json=self._payload(prompt, generation_config),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = json.loads(line[len("data:"):].strip())
+                    self._record_usage(chunk, usage)
+                    for candidate in chunk.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield StreamToken(part["text"], self.name)
+
+    async def health_check(self, timeout: float) -> bool:
+        # Modell-Metadaten abfragen: prüft Erreichbarkeit + Key, kostet keine Tokens
+        response = await self.client.get(
+            f"/models/{self.model}", headers=self._auth_headers(), timeout=timeout
+        )
+        return response.status_code == 200
@@ -2,12 +2,24 @@
 AI Recipe Generator with Gemini (Pro) and Ollama (Free) Support
 - Pro users: Fast Gemini API with Ollama fallback
 - Free users: Local Ollama (cost-free, privacy-friendly)
+- Provider-Verfügbarkeit: Circuit Breaker + Health Probe im Hintergrund
+- Ollama/Gemini-Slots (Admission) nur für die Dauer echter Provider-Aufrufe
 """
 import os
 import logging
-from typing import List, Dict, Optional, Any, Generator
-import requests
+from collections import deque
+from typing import List, Dict, Optional, Any, AsyncIterator
+import asyncio
 import json
+import time
+
+from app.middleware.admission import QueueStatus
+from app.middleware.rate_limit import admission_controller
+from app.services.ai_providers import AIProvider, GeminiProvider, OllamaProvider, StreamToken
+from app.services.circuit_breaker import CLOSED, CircuitBreaker
+from app.services.fanout_planner import PARALLEL, SERIAL, FanoutPlanner
+from app.services.ollama_residency import OllamaResidencyManager
+from app.services.token_budget import BucketKey, TokenBudgetEstimator
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +27,9 @@ logger = logging.getLogger(__name__)
 class AIRecipeGenerator:
     """Intelligenter Recipe Generator mit Tier-basierter AI-Auswahl"""
 
+    # Fan-out: jedes Einzel-Rezept bekommt eine andere Zubereitungsart (keine Duplikate)
+    FANOUT_METHOD_HINTS = ["pan", "oven", "pot", "salad / no-cook", "grill", "steamer"]
+
     def __init__(self):
         # API Keys
         self.gemini_api_key = os.getenv("GOOGLE_AI_API_KEY")
@@ -24,22 +39,146 @@ class AIRecipeGenerator:
         self.gemini_model = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3.2")
 
-        # Check availability
-        self.gemini_available = bool(self.gemini_api_key)
-        self.ollama_available = self._check_ollama_available()
-
-        logger.info(f"AI Generator initialized - Gemini: {self.gemini_available}, Ollama: {self.ollama_available}")
+        # Async Clients (ein Connection Pool pro Provider, Keep-Alive)
+        self.gemini = GeminiProvider(
+            api_key=self.gemini_api_key,
+            model=self.gemini_model,
+            base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta"),
+            max_connections=int(os.getenv("GEMINI_MAX_CONNECTIONS", "20")),
+            breaker=self._create_breaker("gemini"),
+        )
+        self.ollama = OllamaProvider(
+            base_url=self.ollama_base_url,
+            model=self.ollama_model,
+            max_connections=int(os.getenv("OLLAMA_MAX_CONNECTIONS", "4")),
+            breaker=self._create_breaker("ollama"),
+        )
+
+        # Modell warm halten + keep_alive pro Anfrage (Kaltstart nicht beim User)
+        self.ollama.residency = OllamaResidencyManager(
+            self.ollama,
+            active_hours=os.getenv("OLLAMA_ACTIVE_HOURS", "7-23"),
+            ping_interval_seconds=float(os.getenv("OLLAMA_KEEP_WARM_INTERVAL", "240")),
+            keep_alive_active=os.getenv("OLLAMA_KEEP_ALIVE_ACTIVE", "30m"),
+            keep_alive_idle=os.getenv("OLLAMA_KEEP_ALIVE_IDLE", "5m"),
+            busy_requests=int(os.getenv("OLLAMA_BUSY_REQUESTS", "3")),
+        )
+
+        # Token-Budget pro Anfrage (statt pauschal 2048), abgeschnitten → Continuation
+        self.token_budget = TokenBudgetEstimator(
+            default_budget=int(os.getenv("AI_TOKEN_BUDGET_DEFAULT", "2048")),
+            min_budget=int(os.getenv("AI_TOKEN_BUDGET_MIN", "256")),
+            max_budget=int(os.getenv("AI_TOKEN_BUDGET_MAX", "4096")),
+            margin=float(os.getenv("AI_TOKEN_BUDGET_MARGIN", "1.25")),
+        )
+        self.max_continuations = int(os.getenv("AI_MAX_CONTINUATIONS", "2"))
+
+        # Fan-out: count Einzel-Prompts parallel statt einem langen Prompt (wenn messbar schneller)
+        fanout_parallelism = {
+            "gemini": int(os.getenv("GEMINI_FANOUT_PARALLEL", "3")),
+            "ollama": int(os.getenv("OLLAMA_NUM_PARALLEL", "1")),
+        }
+        # Gleichzeitige Einzel-Prompts = belegte Admission-Slots (keine eigene Semaphore)
+        self.fanout = FanoutPlanner(fanout_parallelism, mode=os.getenv("AI_FANOUT_MODE", "auto"))
+
+        # Slots pro Provider-Pool (Queue, Tier-Priorität, über Worker geteilt)
+        self.admission = admission_controller
+
+        # Health Probe (läuft im Event Loop, gestartet beim App-Startup)
+        self.health_probe_interval = float(os.getenv("AI_HEALTH_PROBE_INTERVAL", "10"))
+        self._probe_task: Optional[asyncio.Task] = None
+
+        # Hedging (PRO): kein erstes Byte von Gemini innerhalb des Budgets → Ollama parallel starten
+        # Budget = gemessenes First-Byte-p95 von Gemini, AI_HEDGE_AFTER_SECONDS ist Untergrenze/Default
+        self.hedge_enabled = os.getenv("AI_HEDGE_ENABLED", "False").lower() == "true"
+        self.hedge_after_seconds = float(os.getenv("AI_HEDGE_AFTER_SECONDS", "5"))
+        self.hedge_min_samples = int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_max_inflight = int(os.getenv("AI_HEDGE_MAX_INFLIGHT", "1"))  # Pi schützen
+        self._hedges_inflight = 0
+        self._first_byte_samples: deque = deque(maxlen=200)
+        self.hedge_stats = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_skipped": 0,
+            "primary_won": 0,
+            "secondary_won": 0,
+            "both_failed": 0,
+        }
 
-    def _check_ollama_available(self) -> bool:
-        """Check if Ollama server is reachable"""
-        try:
-            response = requests.get(f"{self.ollama_base_url}/api/tags", timeout=2)
-            return response.status_code == 200
-        except Exception as e:
-            logger.warning(f"Ollama not available: {e}")
-            return False
+        logger.info(f"AI Generator initialized - Gemini configured: {self.gemini.available}")
+
+    @staticmethod
+    def _create_breaker(name: str) -> CircuitBreaker:
+        return CircuitBreaker(
+            name,
+            failure_rate_threshold=float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5")),
+            min_calls=int(os.getenv("AI_BREAKER_MIN_CALLS", "3")),
+            window_size=int(os.getenv("AI_BREAKER_WINDOW", "20")),
+            open_seconds=float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30")),
+        )
+
+    @property
+    def gemini_available(self) -> bool:
+        """Key konfiguriert und Breaker nicht offen"""
+        return self.gemini.available and self.gemini.breaker.allow_request()
+
+    @property
+    def ollama_available(self) -> bool:
+        return self.ollama.breaker.allow_request()
+
+    def provider_for(self, user_tier: str) -> str:
+        """Provider, mit dem dieses Tier generiert (Cache-/Coalescing-Schlüssel)"""
+        return "gemini" if user_tier == "pro" and self.gemini.available else "ollama"
+
+    def _probed_providers(self) -> List[AIProvider]:
+        return [self.ollama] + ([self.gemini] if self.gemini.available else [])
+
+    async def probe_providers(self) -> Dict[str, bool]:
+        """Alle Provider einmal prüfen (parallel)"""
+        providers = self._probed_providers()
+        results = await asyncio.gather(*(provider.probe() for provider in providers))
+        return {provider.name: healthy for provider, healthy in zip(providers, results)}
+
+    async def _probe_loop(self):
+        while True:
+            try:
+                await self.probe_providers()
+            except Exception as e:
+                logger.error(f"AI health probe error: {e}")
+            await asyncio.sleep(self.health_probe_interval)
+
+    def start_health_probe(self):
+        """Health Probe im laufenden Event Loop starten (App-Startup)"""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    def start_background_tasks(self):
+        """Health Probe + Ollama Keep-Warm (App-Startup)"""
+        self.start_health_probe()
+        self.ollama.residency.start()
+
+    def provider_health(self) -> Dict[str, Any]:
+        return {
+            "gemini": {"configured": self.gemini.available, **self.gemini.breaker.status()},
+            "ollama": self.ollama.breaker.status(),
+            "ollama_residency": self.ollama.residency.status(),
+            "token_budget": self.token_budget.status(),
+            "fanout": self.fanout.status(),
+            "probe_interval_seconds": self.health_probe_interval,
+            "probe_running": self._probe_task is not None and not self._probe_task.done(),
+        }
 
-    def generate_recipes(
+    async def aclose(self):
+        """Hintergrund-Tasks stoppen, Provider-Clients schließen (App-Shutdown)"""
+        await self.ollama.residency.stop()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+        await self.gemini.aclose()
+        await self.ollama.aclose()
+
+    async def generate_recipes(
         self,
         ingredients: List[str],
         count: int = 3,
@@ -62,27 +201,33 @@ class AIRecipeGenerator:
             user_tier: "free" or "pro"
 
         Returns:
-            List of recipe dictionaries
+            List of recipe dictionaries - "ai_provider" names the provider
+            that actually produced them (Ollama after a Gemini fallback/hedge)
         """
         # Pro users: Try Gemini first, fallback to Ollama
         if user_tier == "pro":
+            if self.gemini_available and self.hedge_enabled and self.ollama_available:
+                logger.info("Pro user - Using Gemini API (hedged)")
+                return await self._generate_hedged(
+                    ingredients, count, servings, diet_profiles, diabetes_unit, language
+                )
             if self.gemini_available:
                 try:
                     logger.info("Pro user - Using Gemini API")
-                    return self._generate_with_gemini(
+                    return await self._generate_with_gemini(
                         ingredients, count, servings, diet_profiles, diabetes_unit, language
                     )
                 except Exception as e:
                     logger.error(f"Gemini failed: {e} - Falling back to Ollama")
                     if self.ollama_available:
-                        return self._generate_with_ollama(
+                        return await self._generate_with_ollama(
                             ingredients, count, servings, diet_profiles, diabetes_unit, language
                         )
                     else:
                         raise Exception("Both Gemini and Ollama unavailable")
             elif self.ollama_available:
                 logger.warning("Pro user but Gemini not configured - Using Ollama")
-                return self._generate_with_ollama(
+                return await self._generate_with_ollama(
                     ingredients, count, servings, diet_profiles, diabetes_unit, language
                 )
             else:
@@ -92,13 +237,13 @@ class AIRecipeGenerator:
         else:
             if self.ollama_available:
                 logger.info("Free user - Using Ollama")
-                return self._generate_with_ollama(
+                return await self._generate_with_ollama(
                     ingredients, count, servings, diet_profiles, diabetes_unit, language
                 )
             else:
                 raise Exception("Ollama not available")
 
-    def _generate_with_gemini(
+    async def _generate_with_gemini(
         self,
         ingredients: List[str],
         count: int,
@@ -108,45 +253,225 @@ class AIRecipeGenerator:
         language: str
     ) -> List[Dict[str, Any]]:
         """Generate recipes using Gemini API"""
-        prompt = self._build_prompt(ingredients, count, servings, diet_profiles, diabetes_unit, language)
+        return await self._generate(
+            self.gemini, ingredients, count, servings, diet_profiles, diabetes_unit, language
+        )
 
-        # Gemini API Request
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.gemini_model}:generateContent"
-        headers = {"Content-Type": "application/json"}
-        params = {"key": self.gemini_api_key}
-
-        payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 2048,
-            }
-        }
+    async def _generate_with_ollama(
+        self,
+        ingredients: List[str],
+        count: int,
+        servings: int,
+        diet_profiles: Optional[List[str]],
+        diabetes_unit: str,
+        language: str
+    ) -> List[Dict[str, Any]]:
+        """Generate recipes using local Ollama"""
+        return await self._generate(
+            self.ollama, ingredients, count, servings, diet_profiles, diabetes_unit, language
+        )
 
-        response = requests.post(url, headers=headers, params=params, json=payload, timeout=30)
-        response.raise_for_status()
+    async def _generate(
+        self,
+        provider: AIProvider,
+        ingredients: List[str],
+        count: int,
+        servings: int,
+        diet_profiles: Optional[List[str]],
+        diabetes_unit: str,
+        language: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Seriell (ein Prompt für count Rezepte) oder Fan-out - je nach gemessenem Durchsatz
 
-        # Parse response
-        result = response.json()
-        text = result["candidates"][0]["content"]["parts"][0]["text"]
+        Fan-out braucht einen Admission-Slot pro gleichzeitigem Einzel-Prompt;
+        sind keine zusätzlichen Slots frei, wird seriell generiert.
+        """
+        mode = self.fanout.choose(provider.name, count)
+        if mode == PARALLEL and provider.breaker.state != CLOSED:
+            # half_open: genau ein Probeaufruf → ein Prompt statt Fan-out
+            mode = SERIAL
+
+        async with self.admission.provider_slot(provider.name) as slot:
+            width = 1
+            if mode == PARALLEL:
+                wanted = min(count, self.fanout.parallelism.get(provider.name, 1))
+                width += await slot.extend(wanted - 1)
+                if width < 2:
+                    logger.info(f"{provider.name} fan-out: no spare slots - generating serially")
+                    mode = SERIAL
+
+            started = time.perf_counter()
+            if mode == PARALLEL:
+                recipes = await self._generate_fanout(
+                    provider, ingredients, count, servings, diet_profiles, diabetes_unit, language, width
+                )
+            else:
+                prompt = self._build_prompt(ingredients, count, servings, diet_profiles, diabetes_unit, language)
+                budget_key = self.token_budget.bucket(count, language, diet_profiles)
+                text = await self._complete(provider, prompt, budget_key)
+                recipes = self._parse_recipes(text, provider.name)
 
-        # Extract JSON from markdown code blocks if present
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
+        self.fanout.record(provider.name, mode, time.perf_counter() - started, len(recipes))
+        return recipes
+
+    async def _generate_fanout(
+        self,
+        provider: AIProvider,
+        ingredients: List[str],
+        count: int,
+        servings: int,
+        diet_profiles: Optional[List[str]],
+        diabetes_unit: str,
+        language: str,
+        width: int
+    ) -> List[Dict[str, Any]]:
+        """count Einzel-Rezept-Prompts, höchstens `width` gleichzeitig (= belegte Slots), Ergebnisse zusammenführen"""
+        budget_key = self.token_budget.bucket(1, language, diet_profiles)
+        slots = asyncio.Semaphore(width)
+
+        async def single(index: int) -> List[Dict[str, Any]]:
+            hint = self.FANOUT_METHOD_HINTS[index % len(self.FANOUT_METHOD_HINTS)]
+            prompt = self._build_prompt(
+                ingredients, 1, servings, diet_profiles, diabetes_unit, language,
+                variation=f"This is variation {index + 1} of {count}: prefer the cooking method \"{hint}\"."
+            )
+            async with slots:
+                text = await self._complete(provider, prompt, budget_key)
+            return self._parse_recipes(text, provider.name)
+
+        results = await asyncio.gather(*(single(index) for index in range(count)), return_exceptions=True)
+
+        recipes: List[Dict[str, Any]] = []
+        seen_names = set()
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for result in results:
+            if isinstance(result, BaseException):
+                continue
+            for recipe in result[:1]:
+                name = str(recipe.get("name", "")).strip().lower()
+                if name in seen_names:
+                    continue
+                seen_names.add(name)
+                recipes.append(recipe)
+
+        if not recipes:
+            raise errors[0]
+        if errors:
+            logger.warning(f"{provider.name} fan-out: {len(errors)}/{count} recipes failed: {errors[0]}")
+        return recipes
 
-        recipes = json.loads(text)
+    def _generation_options(self, provider: AIProvider, max_tokens: int) -> Dict[str, Any]:
+        limit_key = "maxOutputTokens" if provider is self.gemini else "num_predict"
+        return {"temperature": 0.7, limit_key: max_tokens}
 
-        # Add AI provider info
-        for recipe in recipes:
-            recipe["ai_provider"] = "gemini"
+    @staticmethod
+    def _continuation_prompt(prompt: str, partial: str) -> str:
+        """Abgeschnittene Antwort fortsetzen lassen (nur der fehlende Rest)"""
+        return f"""{prompt}
 
-        return recipes
+Your previous answer was cut off. This is what you wrote so far:
+{partial}
+
+Continue EXACTLY where the text above stops. Output ONLY the missing remainder, do not repeat anything, no explanations."""
 
-    def _generate_with_ollama(
+    def _next_continuation(self, provider: AIProvider, attempt: int) -> bool:
+        """Antwort war abgeschnitten: noch ein Continuation-Versuch erlaubt?"""
+        if attempt >= self.max_continuations:
+            logger.warning(f"{provider.name}: output still truncated after {attempt} continuations")
+            return False
+        self.token_budget.record_continuation()
+        logger.info(f"{provider.name}: output hit the token budget - requesting continuation")
+        return True
+
+    async def _complete(self, provider: AIProvider, prompt: str, budget_key: BucketKey) -> str:
+        """Komplette Antwort mit Token-Budget; abgeschnitten → Rest per Continuation holen"""
+        max_tokens = self.token_budget.budget(budget_key)
+        text, output_tokens, truncated, rambled, attempt = "", 0, False, False, 0
+
+        while True:
+            usage: Dict[str, Any] = {}
+            request_prompt = self._continuation_prompt(prompt, text) if attempt else prompt
+            text += await provider.generate(
+                request_prompt, self._generation_options(provider, max_tokens), usage=usage
+            )
+            output_tokens += usage.get("output_tokens", 0)
+            if not usage.get("truncated"):
+                break
+            if self._is_complete(text):
+                # JSON fertig, danach nur "weitergeredet" → kein Messwert fürs Budget
+                rambled = True
+                break
+            truncated = True
+            if not self._next_continuation(provider, attempt):
+                break
+            attempt += 1
+            max_tokens = self.token_budget.continuation_budget(max_tokens)
+
+        if not rambled:
+            self.token_budget.record(budget_key, output_tokens, truncated=truncated)
+        return text
+
+    async def _stream(self, provider: AIProvider, prompt: str, budget_key: BucketKey) -> AsyncIterator[StreamToken]:
+        """Wie _complete, aber Tokens sofort weiterreichen (Continuation hängt nahtlos an)"""
+        max_tokens = self.token_budget.budget(budget_key)
+        parts: List[str] = []
+        output_tokens, truncated, rambled, attempt = 0, False, False, 0
+
+        while True:
+            usage: Dict[str, Any] = {}
+            request_prompt = self._continuation_prompt(prompt, "".join(parts)) if attempt else prompt
+            async for token in provider.stream(
+                request_prompt, self._generation_options(provider, max_tokens), usage=usage
+            ):
+                parts.append(token)
+                yield token
+            output_tokens += usage.get("output_tokens", 0)
+            if not usage.get("truncated"):
+                break
+            if self._is_complete("".join(parts)):
+                # JSON fertig, danach nur "weitergeredet" → kein Messwert fürs Budget
+                rambled = True
+                break
+            truncated = True
+            if not self._next_continuation(provider, attempt):
+                break
+            attempt += 1
+            max_tokens = self.token_budget.continuation_budget(max_tokens)
+
+        if not rambled:
+            self.token_budget.record(budget_key, output_tokens, truncated=truncated)
+
+    async def _admitted_stream(
+        self, provider: AIProvider, prompt: str, budget_key: BucketKey
+    ) -> AsyncIterator[Any]:
+        """_stream mit Slot: erst QueueStatus (solange in der Queue), dann die Tokens"""
+        slot = self.admission.provider_slot(provider.name)
+        try:
+            async for status in slot.waiting():
+                yield status
+            async for token in self._stream(provider, prompt, budget_key):
+                yield token
+        finally:
+            await slot.release()
+
+    async def _collect_gemini_stream(
+        self, prompt: str, budget_key: BucketKey, slot_held: asyncio.Event, first_byte: asyncio.Event
+    ) -> List[Dict[str, Any]]:
+        """Gemini per Stream lesen (erstes Byte ab Slot-Zuteilung messbar), Ergebnis wie generateContent"""
+        parts = []
+        async with self.admission.provider_slot(self.gemini.name):
+            slot_held.set()
+            started = time.perf_counter()
+            async for token in self._stream(self.gemini, prompt, budget_key):
+                if not first_byte.is_set():
+                    self._first_byte_samples.append(time.perf_counter() - started)
+                    first_byte.set()
+                parts.append(token)
+
+        return self._parse_recipes("".join(parts), "gemini")
+
+    async def _generate_hedged(
         self,
         ingredients: List[str],
         count: int,
@@ -155,42 +480,135 @@ class AIRecipeGenerator:
         diabetes_unit: str,
         language: str
     ) -> List[Dict[str, Any]]:
-        """Generate recipes using local Ollama"""
+        """
+        Gemini starten; kommt innerhalb des Hedge-Budgets (ab Slot-Zuteilung - Queue-Zeit
+        ist keine Provider-Latenz) kein erstes Byte, parallel Ollama starten.
+        Das erste gültige Ergebnis gewinnt, der Rest wird abgebrochen.
+        """
+        self.hedge_stats["requests"] += 1
         prompt = self._build_prompt(ingredients, count, servings, diet_profiles, diabetes_unit, language)
 
-        # Ollama API Request
-        url = f"{self.ollama_base_url}/api/generate"
-        payload = {
-            "model": self.ollama_model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.7,
-                "num_predict": 2048,
-            }
-        }
+        budget_key = self.token_budget.bucket(count, language, diet_profiles)
 
-        response = requests.post(url, json=payload, timeout=180)
-        response.raise_for_status()
+        slot_held = asyncio.Event()
+        first_byte = asyncio.Event()
+        primary = asyncio.ensure_future(self._collect_gemini_stream(prompt, budget_key, slot_held, first_byte))
+        tasks = {primary}
+        hedged = False
 
-        result = response.json()
-        text = result["response"]
+        try:
+            # Uhr läuft erst, wenn Gemini den Slot hat
+            slot_wait = asyncio.ensure_future(slot_held.wait())
+            try:
+                await asyncio.wait({primary, slot_wait}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                slot_wait.cancel()
+
+            hedge_after = self.hedge_timeout()
+            first_byte_wait = asyncio.ensure_future(first_byte.wait())
+            try:
+                await asyncio.wait(
+                    {primary, first_byte_wait},
+                    timeout=hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                first_byte_wait.cancel()
+
+            if not primary.done() and not first_byte.is_set():
+                if self._hedges_inflight < self.hedge_max_inflight:
+                    logger.warning(f"Gemini: no first byte after {hedge_after:.2f}s - hedging with Ollama")
+                    self.hedge_stats["hedged"] += 1
+                    self._hedges_inflight += 1
+                    hedged = True
+                    tasks.add(asyncio.ensure_future(self._generate_with_ollama(
+                        ingredients, count, servings, diet_profiles, diabetes_unit, language
+                    )))
+                else:
+                    self.hedge_stats["hedge_skipped"] += 1
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_stats["primary_won" if task is primary else "secondary_won"] += 1
+                        return task.result()
+                    logger.error(f"{'Gemini' if task is primary else 'Ollama'} failed: {task.exception()}")
+
+            # Alles gescheitert - ohne Hedge wie bisher seriell auf Ollama ausweichen
+            if not hedged:
+                return await self._generate_with_ollama(
+                    ingredients, count, servings, diet_profiles, diabetes_unit, language
+                )
+            self.hedge_stats["both_failed"] += 1
+            raise Exception("Both Gemini and Ollama unavailable")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if hedged:
+                self._hedges_inflight -= 1
+
+    def _first_byte_percentile(self, p: float) -> Optional[float]:
+        """Beobachtete Gemini First-Byte-Latenz (Sekunden ab Slot-Zuteilung)"""
+        samples = sorted(self._first_byte_samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    def hedge_timeout(self) -> float:
+        """Hedge-Budget: Gemini First-Byte-p95, nie unter AI_HEDGE_AFTER_SECONDS (Default bis genug Samples)"""
+        if len(self._first_byte_samples) < self.hedge_min_samples:
+            return self.hedge_after_seconds
+        return max(self.hedge_after_seconds, self._first_byte_percentile(0.95))
+
+    def hedging_metrics(self) -> Dict[str, Any]:
+        """Hedge-Zähler + beobachtete Gemini First-Byte-Latenz (p50/p95) + aktuelles Budget"""
+        def percentile(p: float) -> Optional[float]:
+            value = self._first_byte_percentile(p)
+            return round(value, 3) if value is not None else None
+
+        requests_total = self.hedge_stats["requests"]
+        return {
+            "enabled": self.hedge_enabled,
+            "hedge_after_seconds": round(self.hedge_timeout(), 3),
+            "hedge_floor_seconds": self.hedge_after_seconds,
+            "first_byte_samples": len(self._first_byte_samples),
+            **self.hedge_stats,
+            "hedge_rate": round(self.hedge_stats["hedged"] / requests_total, 3) if requests_total else 0.0,
+            "gemini_first_byte_p50": percentile(0.50),
+            "gemini_first_byte_p95": percentile(0.95),
+        }
 
+    @staticmethod
+    def _extract_json(text: str) -> str:
         # Extract JSON from markdown code blocks if present
         if "```json" in text:
             text = text.split("```json")[1].split("```")[0].strip()
         elif "```" in text:
             text = text.split("```")[1].split("```")[0].strip()
+        return text
 
-        recipes = json.loads(text)
+    def _is_complete(self, text: str) -> bool:
+        """Token-Limit erreicht, aber JSON schon vollständig? (Modell hat nur weitergeredet)"""
+        try:
+            json.loads(self._extract_json(text))
+            return True
+        except ValueError:
+            return False
+
+    def _parse_recipes(self, text: str, provider: str) -> List[Dict[str, Any]]:
+        """JSON-Array aus der Modell-Antwort extrahieren"""
+        recipes = json.loads(self._extract_json(text))
 
         # Add AI provider info
         for recipe in recipes:
-            recipe["ai_provider"] = "ollama"
+            recipe["ai_provider"] = provider
 
         return recipes
 
-    def generate_with_streaming(
+    async def generate_with_streaming(
         self,
         ingredients: List[str],
         count: int,
@@ -199,44 +617,39 @@ class AIRecipeGenerator:
         diabetes_unit: str,
         language: str,
         user_tier: str = "free"
-    ) -> Generator[str, None, None]:
+    ) -> AsyncIterator[Any]:
         """
         Stream recipe generation tokens in real-time (SSE-compatible)
-        Yields text chunks as they arrive from Ollama
+        Yields text chunks as they arrive (token.provider = "gemini"/"ollama"),
+        while waiting for a provider slot QueueStatus items (position, ETA)
 
-        NOTE: Gemini API doesn't support streaming in the same way,
-        so this is Ollama-only for now. Pro users get fast non-streamed Gemini.
+        Same tier logic as generate_recipes:
+        - Pro users: Gemini streamGenerateContent, Ollama fallback if Gemini
+          fails before the first token
+        - Free users: Ollama only
         """
         prompt = self._build_prompt(ingredients, count, servings, diet_profiles, diabetes_unit, language)
-
-        # Ollama API Request with streaming
-        url = f"{self.ollama_base_url}/api/generate"
-        payload = {
-            "model": self.ollama_model,
-            "prompt": prompt,
-            "stream": True,  # Enable streaming!
-            "options": {
-                "temperature": 0.7,
-                "num_predict": 2048,
-            }
-        }
-
-        # Stream response
-        response = requests.post(url, json=payload, stream=True, timeout=180)
-        response.raise_for_status()
-
-        # Yield chunks as they arrive
-        full_text = ""
-        for line in response.iter_lines():
-            if line:
-                chunk = json.loads(line)
-                if "response" in chunk:
-                    token = chunk["response"]
-                    full_text += token
+        budget_key = self.token_budget.bucket(count, language, diet_profiles)
+
+        if user_tier == "pro" and self.gemini_available:
+            logger.info("Pro user - Streaming with Gemini API")
+            started = False
+            try:
+                async for token in self._admitted_stream(self.gemini, prompt, budget_key):
+                    started = started or not isinstance(token, QueueStatus)
                     yield token
-
-        # After streaming completes, parse and return final JSON
-        # (This will be handled by the route, not yielded here)
+                return
+            except Exception as e:
+                # Bereits gesendete Tokens lassen sich nicht zurücknehmen
+                if started or not self.ollama_available:
+                    raise
+                logger.error(f"Gemini streaming failed: {e} - Falling back to Ollama")
+        elif not self.ollama_available:
+            raise Exception("Ollama not available")
+
+        # Yield chunks as they arrive (parsing happens in the route)
+        async for token in self._admitted_stream(self.ollama, prompt, budget_key):
+            yield token
 
     def _sanitize_input(self, text: str) -> str:
         """
@@ -276,9 +689,10 @@ class AIRecipeGenerator:
         servings: int,
         diet_profiles: Optional[List[str]],
         diabetes_unit: str,
-        language: str
+        language: str,
+        variation: str = ""
     ) -> str:
-        """Build recipe generation prompt"""
+        """Build recipe generation prompt (variation: Zusatz-Hinweis für Fan-out Einzel-Prompts)"""
         # Sanitize all user inputs
         safe_ingredients = [self._sanitize_input(ing) for ing in ingredients]
         safe_diet_profiles = [self._sanitize_input(dp) for dp in (diet_profiles or [])]
@@ -320,6 +734,9 @@ Format:
 Calculate {diabetes_unit} values: {"KE = carbs/10" if diabetes_unit == "KE" else "BE = carbs/12"}
 Ensure recipes are realistic, nutritionally balanced, and suitable for the dietary restrictions."""
 
+        if variation:
+            prompt += f"\n{variation}"
+
         return prompt
 
 
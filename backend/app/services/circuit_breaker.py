@@ -0,0 +1,151 @@
+"""
+Circuit Breaker für AI-Provider
+
+Zustände:
+- closed:    Anfragen laufen normal, Ergebnisse landen im Sliding Window
+- open:      Fehlerquote über dem Schwellwert → Provider gilt als down,
+             Routing weicht sofort aus (kein 180s-Timeout pro Anfrage)
+- half_open: nach open_seconds (oder erfolgreicher Health Probe) darf der
+             Provider wieder getestet werden - mit genau einem Probeaufruf;
+             Erfolg → closed, Fehler → wieder open. Bis zum Ergebnis gilt
+             der Provider für alle anderen Anfragen weiter als nicht verfügbar
+
+Gefüttert wird er von echten Aufrufen und vom Health Probe im Hintergrund
+(Probe-Ergebnisse landen wie echte Aufrufe im Sliding Window - Erfolge wie
+Fehler). Zustandsabfragen sind reine Speicherzugriffe (kein I/O).
+"""
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Provider-Aufruf abgelehnt: Breaker offen oder Probeaufruf läuft schon"""
+
+
+class CircuitBreaker:
+    """Fehlerquote über die letzten `window_size` Ergebnisse eines Providers"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 3,
+        window_size: int = 20,
+        open_seconds: float = 30.0
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._window: Deque[bool] = deque(maxlen=window_size)  # True = Fehler
+        self._state = CLOSED
+        self._opened_at: Optional[float] = None
+        self._trial_running = False  # half_open: Probeaufruf unterwegs
+        self.stats = {"successes": 0, "failures": 0, "opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        # open → half_open, sobald die Wartezeit abgelaufen ist
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Darf der Provider gerade benutzt werden? (closed, half_open ohne laufenden Probeaufruf)"""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._trial_running)
+
+    def begin_call(self) -> bool:
+        """
+        Aufruf anmelden (direkt vor dem Request an den Provider)
+        Rückgabe True = dieser Aufruf ist der Probeaufruf von half_open.
+        Offen oder Probeaufruf schon unterwegs → CircuitOpenError
+        """
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.stats["rejected"] += 1
+        raise CircuitOpenError(f"{self.name} circuit breaker is {state}")
+
+    def cancel_trial(self):
+        """Probeaufruf ohne Ergebnis abgebrochen → nächster Aufruf darf testen"""
+        self._trial_running = False
+
+    def failure_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return sum(self._window) / len(self._window)
+
+    def record_success(self):
+        self.stats["successes"] += 1
+        if self.state == HALF_OPEN:
+            self._window.clear()
+            self._transition(CLOSED)
+        self._window.append(False)
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        state = self.state
+        if state == HALF_OPEN:
+            self._open()
+            return
+        if state == OPEN:
+            # Weiterer Fehler während open → Wartezeit neu starten
+            self._opened_at = time.monotonic()
+            return
+
+        self._window.append(True)
+        if len(self._window) >= self.min_calls and self.failure_rate() >= self.failure_rate_threshold:
+            self._open()
+
+    def record_probe(self, healthy: bool):
+        """
+        Ergebnis des Health Probes - im Window wie ein echter Aufruf, in beide
+        Richtungen. Erreichbarkeit ist aber ein schwächeres Signal als eine
+        erfolgreiche Generierung: ein gesunder Probe macht aus open nur
+        half_open, schließen darf erst der Probeaufruf
+        """
+        if not healthy:
+            self.record_failure()
+            return
+
+        state = self.state
+        if state == OPEN:
+            self._transition(HALF_OPEN)
+        elif state == CLOSED:
+            self.stats["successes"] += 1
+            self._window.append(False)
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state != self._state:
+            self._trial_running = False
+            logger.warning(f"Circuit breaker '{self.name}': {self._state} → {state}")
+            self._state = state
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "window": len(self._window),
+            "trial_running": self._trial_running,
+            **self.stats,
+        }
+
+    def __repr__(self):
+        return f"<CircuitBreaker(name='{self.name}', state='{self._state}')>"
@@ -0,0 +1,98 @@
+"""
+Fan-out Planner - count Rezepte seriell (ein Prompt) oder parallel (count Prompts)?
+
+Ein Prompt für 3 Rezepte dekodiert die Rezepte nacheinander. Hat der
+Provider freie Parallelität (Gemini, Ollama mit OLLAMA_NUM_PARALLEL > 1),
+sind 3 Einzel-Prompts gleichzeitig schneller - auf einem ausgelasteten
+CPU-Host aber nicht unbedingt. Deshalb entscheidet die Messung:
+
+- Sekunden pro Rezept (EWMA) je Provider und Modus
+- erst beide Modi messen, dann den schnelleren nehmen
+- alle `explore_every` Entscheidungen den anderen Modus neu messen
+"""
+from typing import Any, Dict, Optional
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SERIAL = "serial"
+PARALLEL = "parallel"
+
+
+class FanoutPlanner:
+    """Modus-Wahl pro Provider anhand gemessener Sekunden pro Rezept"""
+
+    def __init__(
+        self,
+        parallelism: Dict[str, int],
+        mode: str = "auto",
+        min_samples: int = 3,
+        explore_every: int = 20,
+        alpha: float = 0.3
+    ):
+        if mode not in ("auto", SERIAL, PARALLEL):
+            raise ValueError(f"Invalid fan-out mode: {mode!r}")
+        self.parallelism = parallelism
+        self.mode = mode
+        self.min_samples = min_samples
+        self.explore_every = explore_every
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._decisions: Dict[str, int] = {}
+        self._seconds_per_recipe: Dict[str, Dict[str, Optional[float]]] = {}
+        self._samples: Dict[str, Dict[str, int]] = {}
+
+    def _mode_stats(self, provider: str):
+        seconds = self._seconds_per_recipe.setdefault(provider, {SERIAL: None, PARALLEL: None})
+        samples = self._samples.setdefault(provider, {SERIAL: 0, PARALLEL: 0})
+        return seconds, samples
+
+    def choose(self, provider: str, count: int) -> str:
+        if count < 2 or self.parallelism.get(provider, 1) < 2 or self.mode == SERIAL:
+            return SERIAL
+        if self.mode == PARALLEL:
+            return PARALLEL
+
+        with self._lock:
+            seconds, samples = self._mode_stats(provider)
+            decision = self._decisions[provider] = self._decisions.get(provider, 0) + 1
+
+            # Erst beide Modi messen
+            for mode in (PARALLEL, SERIAL):
+                if samples[mode] < self.min_samples:
+                    return mode
+
+            best = min((SERIAL, PARALLEL), key=lambda mode: seconds[mode])
+            if decision % self.explore_every == 0:
+                # Gelegentlich den langsameren Modus neu messen (Last ändert sich)
+                return PARALLEL if best == SERIAL else SERIAL
+            return best
+
+    def record(self, provider: str, mode: str, seconds: float, recipes: int):
+        """Dauer einer erfolgreichen Generierung (Wall-Clock) für `recipes` Rezepte"""
+        if recipes <= 0:
+            return
+        value = seconds / recipes
+        with self._lock:
+            stats, samples = self._mode_stats(provider)
+            previous = stats[mode]
+            stats[mode] = value if previous is None else self.alpha * value + (1 - self.alpha) * previous
+            samples[mode] += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "parallelism": dict(self.parallelism),
+                "providers": {
+                    provider: {
+                        mode: {
+                            "seconds_per_recipe": round(value, 3) if value is not None else None,
+                            "samples": self._samples[provider][mode],
+                        }
+                        for mode, value in stats.items()
+                    }
+                    for provider, stats in self._seconds_per_recipe.items()
+                },
+            }
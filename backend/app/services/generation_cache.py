@@ -0,0 +1,132 @@
+"""
+Generation Cache - Ergebnis-Cache für AI-Rezeptgenerierung
+
+Schlüssel: Fingerprint der normalisierten _build_prompt-Eingaben
+(Zutaten + Diät-Profile sortiert, Groß/Klein und Umlaute gefaltet) plus
+Provider - ein FREE-User bekommt nie ein gecachtes Gemini-Ergebnis (PRO).
+Gespeichert wird nur, was der Provider des Schlüssels selbst erzeugt hat:
+ein PRO-Lauf, der auf Ollama ausweicht (Gemini-Fehler, Hedge), landet nicht
+unter dem Gemini-Schlüssel.
+Gleiche Anfrage → gleiches Ergebnis ohne neuen Ollama/Gemini-Lauf.
+
+Der Cache liefert nur die generierten Rezept-Daten - Speichern der
+Recipe-Zeilen und Tageslimit passieren weiterhin in der Route.
+Bei einem Miss läuft die Generierung über den RequestCoalescer: identische
+Anfragen, die gleichzeitig eintreffen, teilen sich einen LLM-Lauf.
+Treffer und angehängte Anfragen belegen keinen AI-Slot - den nimmt erst
+der Generator um den Provider-Aufruf des einen Laufs.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import copy
+import hashlib
+import json
+import logging
+
+from app.config import settings
+from app.services.nutrition_cache import TTLCache
+from app.services.request_coalescer import request_coalescer
+from app.utils.ingredient_names import normalize_ingredient_name
+
+logger = logging.getLogger(__name__)
+
+# Wie AIRecipeGenerator._sanitize_input: mehr landet nicht im Prompt
+MAX_INPUT_LENGTH = 50
+
+
+def _canonical_terms(values: Optional[List[str]]) -> List[str]:
+    """Normalisiert, dedupliziert und sortiert (Reihenfolge egal für den Prompt)"""
+    terms = {normalize_ingredient_name(value)[:MAX_INPUT_LENGTH] for value in (values or [])}
+    return sorted(term for term in terms if term)
+
+
+class GenerationCache:
+    """In-Memory LRU mit TTL für generierte Rezept-Listen"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def fingerprint(
+        ingredients: List[str],
+        count: int,
+        servings: int,
+        diet_profiles: Optional[List[str]],
+        diabetes_unit: str,
+        language: str,
+        provider: str
+    ) -> str:
+        """Kanonischer Schlüssel der Prompt-Eingaben + Provider (SHA-256)"""
+        canonical = {
+            "provider": provider,
+            "ingredients": _canonical_terms(ingredients),
+            "count": count,
+            "servings": servings,
+            "diet_profiles": _canonical_terms(diet_profiles),
+            "diabetes_unit": (diabetes_unit or "KE").upper(),
+            "language": (language or "en").lower(),
+        }
+        payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        hit, recipes = self.cache.get(key)
+        if not hit:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        # Kopie: Aufrufer dürfen das Ergebnis verändern
+        return copy.deepcopy(recipes)
+
+    def set(self, key: str, recipes: List[Dict[str, Any]]):
+        if recipes:
+            self.cache.set(key, copy.deepcopy(recipes))
+
+    def invalidate(self, key: str):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        use_cache: bool = True,
+        provider: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Gecachtes Ergebnis, laufende identische Generierung oder generate()
+
+        use_cache=False (User-Opt-out): weder lesen noch schreiben, eigener Lauf
+        provider: Provider des Schlüssels - Rezepte eines anderen Providers
+        (Fallback) gehen an die Wartenden, werden aber nicht gespeichert
+        """
+        if not use_cache:
+            return await generate()
+
+        recipes = self.get(key)
+        if recipes is not None:
+            logger.info(f"Generation cache hit ({key[:12]})")
+            return recipes
+
+        async def generate_and_store():
+            generated = await generate()
+            produced_by = {recipe.get("ai_provider") for recipe in generated}
+            if provider is None or produced_by == {provider}:
+                self.set(key, generated)
+            else:
+                logger.info(f"Generation cache: not storing {sorted(map(str, produced_by))} result under {provider} key")
+            return generated
+
+        # Ergebnis wird zwischen allen Wartenden geteilt → Kopie pro Aufrufer
+        recipes = await request_coalescer.run(key, generate_and_store)
+        return copy.deepcopy(recipes)
+
+
+# Global instance
+generation_cache = GenerationCache(
+    maxsize=settings.GENERATION_CACHE_SIZE,
+    ttl_seconds=settings.GENERATION_CACHE_TTL_MINUTES * 60,
+)
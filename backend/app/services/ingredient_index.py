@@ -0,0 +1,207 @@
+"""
+Ingredient Index Service - Posting-Listen für die Recipe-DB Zutatensuche
+
+Statt bei jeder Suche bis zu 50.000 RecipeDB-Zeilen zu laden und jede Zutat
+per Substring-Vergleich zu prüfen, wird der Index (recipe_ingredient_index)
+einmal in den Speicher geladen:
+
+    term → {recipe_id, ...}      (Posting-Liste)
+    trigram → {term, ...}        (welche Terme enthalten das Trigramm)
+    recipe_id → Anzahl Zutaten   (für den Match-Score)
+
+Eine Suche schlägt pro User-Zutat nur Posting-Listen nach: Terme, die in
+der User-Zutat enthalten sind, über ihre Teilstrings (Dict-Lookups), Terme,
+die die User-Zutat enthalten, über die Schnittmenge ihrer Trigramme. Nur
+Zutaten unter 3 Zeichen ohne eigene Posting-Liste fallen auf den Scan des
+Vokabulars zurück.
+"""
+from collections import Counter
+from typing import Dict, Iterator, List, Set
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, attributes
+
+from app.models.recipe_db import RecipeDB, RecipeIngredientIndex, build_index_rows
+from app.utils.ingredient_names import normalize_ingredient_name
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM = 3
+
+
+def _trigrams(term: str) -> Iterator[str]:
+    return (term[i:i + TRIGRAM] for i in range(len(term) - TRIGRAM + 1))
+
+
+class IngredientIndex:
+    """In-Memory Posting-Listen (normalisierte Zutat → Rezept-IDs)"""
+
+    # Schreibzugriffe aus anderen Prozessen (z.B. seed_recipe_db.py) spätestens nach 5 Min sichtbar
+    REFRESH_SECONDS = 300
+    REBUILD_BATCH_SIZE = 1000
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._trigram_terms: Dict[str, Set[str]] = {}
+        self._ingredient_counts: Dict[int, int] = {}
+        self._loaded_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    @property
+    def recipe_count(self) -> int:
+        """Anzahl indexierter Rezepte"""
+        return len(self._ingredient_counts)
+
+    def invalidate(self):
+        """Markiert den In-Memory Index als veraltet (wird bei nächster Suche neu geladen)"""
+        self._stale = True
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Baut die Index-Tabelle komplett aus RecipeDB neu auf
+
+        Returns:
+            Anzahl geschriebener Index-Zeilen
+        """
+        index_table = RecipeIngredientIndex.__table__
+        db.execute(index_table.delete())
+
+        written = 0
+        batch = []
+        for recipe_id, ingredients in db.query(RecipeDB.id, RecipeDB.ingredients).yield_per(self.REBUILD_BATCH_SIZE):
+            batch.extend(build_index_rows(recipe_id, ingredients))
+            if len(batch) >= self.REBUILD_BATCH_SIZE:
+                db.execute(index_table.insert(), batch)
+                written += len(batch)
+                batch = []
+
+        if batch:
+            db.execute(index_table.insert(), batch)
+            written += len(batch)
+
+        db.commit()
+        self.invalidate()
+        logger.info(f"Ingredient index rebuilt ({written} postings)")
+        return written
+
+    def _ensure_loaded(self, db: Session):
+        if not self._stale and time.time() - self._loaded_at < self.REFRESH_SECONDS:
+            return
+
+        with self._lock:
+            if not self._stale and time.time() - self._loaded_at < self.REFRESH_SECONDS:
+                return
+
+            rows = db.query(RecipeIngredientIndex.term, RecipeIngredientIndex.recipe_id).all()
+
+            # Bestehende Datenbank ohne Index → einmalig aufbauen
+            if not rows and db.query(RecipeDB.id).first() is not None:
+                self.rebuild(db)
+                rows = db.query(RecipeIngredientIndex.term, RecipeIngredientIndex.recipe_id).all()
+
+            postings: Dict[str, Set[int]] = {}
+            ingredient_counts: Dict[int, int] = {}
+            for term, recipe_id in rows:
+                ingredient_counts[recipe_id] = ingredient_counts.get(recipe_id, 0) + 1
+                if term:
+                    postings.setdefault(term, set()).add(recipe_id)
+
+            trigram_terms: Dict[str, Set[str]] = {}
+            for term in postings:
+                for trigram in _trigrams(term):
+                    trigram_terms.setdefault(trigram, set()).add(term)
+
+            self._postings = postings
+            self._trigram_terms = trigram_terms
+            self._ingredient_counts = ingredient_counts
+            self._loaded_at = time.time()
+            self._stale = False
+            logger.info(f"Ingredient index loaded ({len(postings)} terms, {len(ingredient_counts)} recipes)")
+
+    def _matching_terms(self, user_term: str) -> Set[str]:
+        """Index-Terme, die in `user_term` enthalten sind oder es enthalten"""
+        postings = self._postings
+
+        # Term ⊆ User-Zutat: jeder Teilstring ist ein Dict-Lookup
+        length = len(user_term)
+        terms = {
+            user_term[start:end]
+            for start in range(length)
+            for end in range(start + 1, length + 1)
+            if user_term[start:end] in postings
+        }
+
+        # User-Zutat ⊆ Term: nur Terme, die alle Trigramme der User-Zutat enthalten
+        if length >= TRIGRAM:
+            candidates = None
+            for trigram in set(_trigrams(user_term)):
+                trigram_terms = self._trigram_terms.get(trigram)
+                if not trigram_terms:
+                    return terms
+                candidates = set(trigram_terms) if candidates is None else candidates & trigram_terms
+            terms.update(term for term in candidates if user_term in term)
+        elif user_term not in postings:
+            # Zu kurz für Trigramme und keine eigene Posting-Liste → Vokabular scannen
+            terms.update(term for term in postings if user_term in term)
+
+        return terms
+
+    def score_candidates(
+        self,
+        ingredients: List[str],
+        db: Session,
+        min_score: float = 0.5
+    ) -> Dict[int, float]:
+        """
+        Match-Score pro Rezept über die Posting-Listen
+
+        Score = (Anzahl User-Zutaten mit Treffer) / (Anzahl Rezept-Zutaten).
+        Eine User-Zutat trifft eine Rezept-Zutat, wenn einer der beiden
+        Terme im anderen enthalten ist (Zutaten unter 3 Zeichen mit eigener
+        Posting-Liste nur exakt - "ei" trifft nicht "reis").
+
+        Returns:
+            {recipe_id: score} für alle Rezepte mit score >= min_score
+        """
+        self._ensure_loaded(db)
+        postings = self._postings
+
+        hits: Counter = Counter()
+        for ingredient in ingredients:
+            user_term = normalize_ingredient_name(ingredient)
+            if not user_term:
+                continue
+
+            matched_ids: Set[int] = set()
+            for term in self._matching_terms(user_term):
+                matched_ids |= postings[term]
+            hits.update(matched_ids)
+
+        scores = {}
+        for recipe_id, count in hits.items():
+            score = count / self._ingredient_counts[recipe_id]
+            if score >= min_score:
+                scores[recipe_id] = score
+        return scores
+
+
+# Global instance
+ingredient_index = IngredientIndex()
+
+
+# In-Memory Index bei Schreibzugriffen in diesem Prozess verwerfen
+# (die Index-Tabelle selbst pflegen die Listener in app.models.recipe_db)
+@event.listens_for(RecipeDB, "after_insert")
+@event.listens_for(RecipeDB, "after_delete")
+def _invalidate_on_write(mapper, connection, target):
+    ingredient_index.invalidate()
+
+
+@event.listens_for(RecipeDB, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    if attributes.get_history(target, "ingredients").has_changes():
+        ingredient_index.invalidate()
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.ingredient import Ingredient
 from app.utils.units import convert_to_base_unit, get_unit_category
 
@@ -7,15 +8,15 @@ async def reduce_ingredient_quantity(
     ingredient_name: str,
     used_quantity: float,
     used_unit: str,
-    db: Session
+    db: AsyncSession
 ):
     """Reduziert Zutatenmenge nach Rezeptnutzung"""
 
     # Finde Zutat (case-insensitive)
-    ingredient = db.query(Ingredient).filter(
+    ingredient = await db.scalar(select(Ingredient).where(
         Ingredient.user_id == user_id,
         Ingredient.name.ilike(f"%{ingredient_name}%")
-    ).first()
+    ).limit(1))
 
     if not ingredient:
         return {"error": f"Zutat '{ingredient_name}' nicht gefunden", "status": "not_found"}
@@ -36,8 +37,8 @@ async def reduce_ingredient_quantity(
 
     if new_quantity <= 0:
         # Aufgebraucht → Löschen
-        db.delete(ingredient)
-        db.commit()
+        await db.delete(ingredient)
+        await db.commit()
         return {
             "status": "deleted",
             "ingredient": ingredient_name,
@@ -47,7 +48,7 @@ async def reduce_ingredient_quantity(
         # Menge reduzieren
         ingredient.quantity = new_quantity
         ingredient.unit = current_unit
-        db.commit()
+        await db.commit()
         return {
             "status": "reduced",
             "ingredient": ingredient_name,
@@ -0,0 +1,183 @@
+"""
+Nutrition Cache - Zweistufiger Cache für OpenFoodFacts-Lookups
+
+L1: In-Process LRU mit TTL (keine I/O)
+L2: Persistente SQLite-Datei (überlebt Neustarts, geteilt zwischen Workern)
+
+Schlüssel: (normalisierter Name, Sprache). Gespeichert werden die bereits
+extrahierten Nährwerte - oder None als Negativ-Eintrag ("nicht gefunden").
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-sicherer LRU-Cache mit Ablaufzeit pro Eintrag"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Tuple[bool, Any]:
+        """Returns (hit, value)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return False, None
+
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class NutritionCache:
+    """L1 (Memory) + L2 (SQLite) Cache für extrahierte Nährwerte"""
+
+    # Fehler (Timeout, 5xx) nur kurz und nur im Speicher merken
+    ERROR_TTL_SECONDS = 60
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        memory_size: int = 2048,
+        memory_ttl_seconds: float = 3600
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.memory = TTLCache(maxsize=memory_size, ttl=memory_ttl_seconds)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+
+        try:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS nutrition_cache (
+                    name TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    data TEXT,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (name, language)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            # Ohne L2 weiterarbeiten (nur Memory-Cache)
+            logger.warning(f"Nutrition cache disabled ({self.db_path}): {e}")
+            self._conn = None
+
+        return self._conn
+
+    def get(self, name: str, language: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Returns:
+            (hit, data) - data ist None bei Negativ-Eintrag
+        """
+        key = (name, language)
+
+        hit, value = self.memory.get(key)
+        if hit:
+            self.stats["memory_hits"] += 1
+            return True, value
+
+        with self._lock:
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        "SELECT data, expires_at FROM nutrition_cache WHERE name = ? AND language = ?",
+                        key
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Nutrition cache read failed: {e}")
+                    row = None
+
+                if row and row[1] >= time.time():
+                    value = json.loads(row[0]) if row[0] is not None else None
+                    self.memory.set(key, value, ttl=min(self.memory.ttl, row[1] - time.time()))
+                    self.stats["disk_hits"] += 1
+                    return True, value
+
+        self.stats["misses"] += 1
+        return False, None
+
+    def set(self, name: str, language: str, data: Optional[Dict[str, Any]]):
+        """Speichert Ergebnis (data=None → Negativ-Eintrag mit kürzerer TTL)"""
+        key = (name, language)
+        ttl = self.ttl_seconds if data is not None else self.negative_ttl_seconds
+
+        self.memory.set(key, data, ttl=min(self.memory.ttl, ttl))
+
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO nutrition_cache (name, language, data, expires_at) VALUES (?, ?, ?, ?)",
+                    (name, language, json.dumps(data) if data is not None else None, time.time() + ttl)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Nutrition cache write failed: {e}")
+
+    def set_error(self, name: str, language: str):
+        """Transienter Fehler: kurzer Negativ-Eintrag nur im Speicher"""
+        self.memory.set((name, language), None, ttl=self.ERROR_TTL_SECONDS)
+
+    def purge_expired(self) -> int:
+        """Abgelaufene L2-Einträge löschen"""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0
+            cursor = conn.execute("DELETE FROM nutrition_cache WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+            return cursor.rowcount
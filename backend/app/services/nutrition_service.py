@@ -1,8 +1,15 @@
 # Nutrition Service - OpenFoodFacts API Integration
 import httpx
 from typing import Optional, Dict, Any, List
+import logging
 import re
 
+from app.config import settings
+from app.services.nutrition_cache import NutritionCache
+from app.utils.ingredient_lexicon import IngredientLexicon
+
+logger = logging.getLogger(__name__)
+
 
 class NutritionService:
     """
@@ -99,8 +106,47 @@ class NutritionService:
         'default': {'calories': 100, 'protein': 5.0, 'carbs': 15.0, 'fat': 3.0, 'fiber': 2.0},
     }
 
+    # Cache-Sprache für den Sync-Lookup (ohne lc-Parameter)
+    ANY_LANGUAGE = "*"
+
     def __init__(self):
-        pass  # No persistent client needed - async methods create their own
+        # Long-lived clients (Keep-Alive statt neuer Verbindung pro Zutat)
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+        # Zutaten-Tabellen als Longest-Match Automaten (unabhängig von Dict-Reihenfolge)
+        self.fallback_lexicon = IngredientLexicon(self.FALLBACK_NUTRITION, exclude={"default"})
+        self.gi_lexicon = IngredientLexicon(self.GI_VALUES)
+
+        # L1 (Memory) + L2 (SQLite) Cache für OpenFoodFacts-Ergebnisse
+        self.cache = NutritionCache(
+            db_path=settings.NUTRITION_CACHE_DB,
+            ttl_seconds=settings.NUTRITION_CACHE_TTL_DAYS * 86400,
+            negative_ttl_seconds=settings.NUTRITION_CACHE_NEGATIVE_TTL_HOURS * 3600,
+        )
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(timeout=10.0)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=10.0)
+        return self._async_client
+
+    @staticmethod
+    def _normalize_name(ingredient_name: str) -> str:
+        """Zutatenname → Lookup-Key (ohne Mengenangabe und Zubereitungs-Suffix)"""
+        normalized = ingredient_name.lower().strip()
+
+        # Remove common prefixes/suffixes
+        normalized = re.sub(r'^\d+\s*(g|kg|ml|l|stueck|stück)?\s*', '', normalized)
+        normalized = re.sub(r'\s*(frisch|gehackt|gewürfelt|geschnitten)$', '', normalized)
+
+        return normalized
 
     async def search_product(self, query: str, language: str = "de") -> Optional[Dict[str, Any]]:
         """
@@ -113,33 +159,44 @@ class NutritionService:
         Returns:
             Product data dict or None if not found
         """
+        # Gesucht wird mit dem Cache-Schlüssel: gleiche Schreibweisen → gleiches Ergebnis
+        cache_key = self._normalize_name(query)
+        hit, cached = self.cache.get(cache_key, language)
+        if hit:
+            return dict(cached) if cached else None
+
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                params = {
-                    "search_terms": query,
-                    "search_simple": 1,
-                    "action": "process",
-                    "json": 1,
-                    "page_size": 5,
-                    "lc": language
-                }
+            params = {
+                "search_terms": cache_key,
+                "search_simple": 1,
+                "action": "process",
+                "json": 1,
+                "page_size": 5,
+                "lc": language
+            }
 
-                response = await client.get(self.SEARCH_URL, params=params)
+            response = await self.async_client.get(self.SEARCH_URL, params=params)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    products = data.get("products", [])
+            if response.status_code != 200:
+                logger.warning(f"OpenFoodFacts search for '{cache_key}' returned {response.status_code}")
+                self.cache.set_error(cache_key, language)
+                return None
 
-                    if products:
-                        # Return first product with nutrition data
-                        for product in products:
-                            if product.get("nutriments"):
-                                return self._extract_nutrition(product)
+            data = response.json()
 
-                return None
+            # Return first product with nutrition data
+            result = None
+            for product in data.get("products", []):
+                if product.get("nutriments"):
+                    result = self._extract_nutrition(product)
+                    break
+
+            self.cache.set(cache_key, language, result)
+            return result
 
         except Exception as e:
-            print(f"[NutritionService] Error searching product: {e}")
+            logger.error(f"Error searching product '{cache_key}': {e}")
+            self.cache.set_error(cache_key, language)
             return None
 
     def _extract_nutrition(self, product: Dict[str, Any]) -> Dict[str, Any]:
@@ -172,53 +229,162 @@ class NutritionService:
         Returns:
             Nutrition data dict
         """
-        normalized = ingredient_name.lower().strip()
-
-        # Remove common prefixes/suffixes
-        normalized = re.sub(r'^\d+\s*(g|kg|ml|l|stueck|stück)?\s*', '', normalized)
-        normalized = re.sub(r'\s*(frisch|gehackt|gewürfelt|geschnitten)$', '', normalized)
+        normalized = self._normalize_name(ingredient_name)
 
         # Check fallback database first (faster)
-        for key, nutrition in self.FALLBACK_NUTRITION.items():
-            if key in normalized or normalized in key:
-                return {
-                    **nutrition,
-                    "name": ingredient_name,
-                    "per": "100g",
-                    "source": "fallback_database"
-                }
+        nutrition = self.fallback_lexicon.lookup(normalized)
+        if nutrition is not None:
+            return {
+                **nutrition,
+                "name": ingredient_name,
+                "per": "100g",
+                "source": "fallback_database"
+            }
+
+        # Cache (Memory → SQLite), danach OpenFoodFacts API (sync)
+        hit, cached = self.cache.get(normalized, self.ANY_LANGUAGE)
+        if not hit:
+            cached = self._fetch_product_sync(normalized)
+        if cached:
+            return dict(cached)
+
+        # Return default fallback
+        return {
+            **self.FALLBACK_NUTRITION['default'],
+            "name": ingredient_name,
+            "per": "100g",
+            "source": "estimated"
+        }
 
-        # Try OpenFoodFacts API (sync)
+    def _fetch_product_sync(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """OpenFoodFacts-Suche (sync) mit dem normalisierten Namen - Ergebnis inkl. "nicht gefunden" wird gecacht"""
         try:
             params = {
-                "search_terms": ingredient_name,
+                "search_terms": cache_key,
                 "search_simple": 1,
                 "action": "process",
                 "json": 1,
                 "page_size": 1,
             }
 
-            # Create sync client for this call
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(self.SEARCH_URL, params=params)
+            response = self.client.get(self.SEARCH_URL, params=params)
+
+            if response.status_code != 200:
+                logger.warning(f"OpenFoodFacts search for '{cache_key}' returned {response.status_code}")
+                self.cache.set_error(cache_key, self.ANY_LANGUAGE)
+                return None
+
+            data = response.json()
+            products = data.get("products", [])
 
-            if response.status_code == 200:
-                data = response.json()
-                products = data.get("products", [])
+            result = None
+            if products and products[0].get("nutriments"):
+                result = self._extract_nutrition(products[0])
 
-                if products and products[0].get("nutriments"):
-                    return self._extract_nutrition(products[0])
+            self.cache.set(cache_key, self.ANY_LANGUAGE, result)
+            return result
 
         except Exception as e:
-            print(f"[NutritionService] API error for '{ingredient_name}': {e}")
+            logger.warning(f"OpenFoodFacts API error for '{cache_key}': {e}")
+            self.cache.set_error(cache_key, self.ANY_LANGUAGE)
+            return None
 
-        # Return default fallback
-        return {
-            **self.FALLBACK_NUTRITION['default'],
-            "name": ingredient_name,
-            "per": "100g",
-            "source": "estimated"
-        }
+    # GI-Werte für häufige Zutaten
+    GI_VALUES = {
+        # Niedrig (GI < 55)
+        'gemüse': 15, 'vegetable': 15, 'salat': 10, 'lettuce': 10,
+        'tofu': 15, 'linsen': 30, 'lentils': 30, 'bohnen': 35, 'beans': 35,
+        'quinoa': 53, 'tomate': 15, 'tomato': 15, 'paprika': 15, 'pepper': 15,
+        'zwiebel': 15, 'onion': 15, 'knoblauch': 15, 'garlic': 15,
+        'brokkoli': 10, 'broccoli': 10, 'spinat': 10, 'spinach': 10,
+        'gurke': 15, 'cucumber': 15, 'zucchini': 15, 'pilze': 10, 'mushroom': 10,
+
+        # Proteine (GI ≈ 0)
+        'hähnchen': 0, 'chicken': 0, 'rind': 0, 'beef': 0,
+        'schwein': 0, 'pork': 0, 'lachs': 0, 'salmon': 0,
+        'ei': 0, 'egg': 0, 'fisch': 0, 'fish': 0,
+
+        # Milchprodukte (niedrig)
+        'milch': 31, 'milk': 31, 'käse': 0, 'cheese': 0,
+        'joghurt': 36, 'yogurt': 36, 'quark': 30,
+
+        # Mittel (GI 55-69)
+        'reis': 64, 'rice': 64, 'vollkornbrot': 69, 'wholegrain bread': 69,
+        'banane': 62, 'banana': 62, 'honig': 58, 'honey': 58,
+
+        # Hoch (GI > 70)
+        'kartoffel': 85, 'potato': 85, 'weißbrot': 75, 'white bread': 75,
+        'zucker': 100, 'sugar': 100, 'glukose': 100, 'glucose': 100,
+    }
+
+    # Default-GI wenn keine Zutat bekannt ist (mittel)
+    DEFAULT_GI = 50
+
+    @staticmethod
+    def _parse_amount_g(name: str, amount_str: str) -> float:
+        """Mengenangabe → Gramm (1ml ≈ 1g, EL/TL/Stück geschätzt)"""
+        amount_lower = amount_str.lower()
+
+        # Parse amount (extract number)
+        amount_match = re.search(r'(\d+(?:\.\d+)?)', amount_str)
+        number = float(amount_match.group(1)) if amount_match else None
+        amount_g = number if number is not None else 100
+
+        # Adjust for common units
+        if 'kg' in amount_lower:
+            amount_g *= 1000
+        elif 'ml' in amount_lower or 'l' in amount_lower:
+            # Assume 1ml ≈ 1g for liquids
+            if 'l' in amount_lower and 'ml' not in amount_lower:
+                amount_g *= 1000
+        elif 'el' in amount_lower or 'tbsp' in amount_lower:
+            amount_g = number * 15 if number is not None else 15
+        elif 'tl' in amount_lower or 'tsp' in amount_lower:
+            amount_g = number * 5 if number is not None else 5
+        elif 'stueck' in amount_lower or 'stück' in amount_lower:
+            # Estimate piece weights
+            if 'ei' in name.lower():
+                amount_g = number * 60 if number is not None else 60
+            else:
+                amount_g = number * 100 if number is not None else 100
+
+        return amount_g
+
+    def _lookup_gi(self, name: str) -> int:
+        """GI-Wert einer Zutat (längster passender Eintrag, sonst DEFAULT_GI)"""
+        return self.gi_lexicon.lookup(name, default=self.DEFAULT_GI)
+
+    def resolve_ingredients(self, ingredients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Resolve a recipe's ingredients in a single pass.
+
+        Amounts are parsed once and every distinct ingredient is looked up
+        once (get_nutrition_sync + GI), even if it appears several times.
+
+        Returns:
+            One row per ingredient: name, amount_g, nutrition (per 100g), gi
+        """
+        resolved: Dict[str, Dict[str, Any]] = {}
+        rows = []
+
+        for ingredient in ingredients:
+            name = ingredient.get("name", "")
+            amount_str = ingredient.get("amount", "100g")
+
+            key = name.lower().strip()
+            if key not in resolved:
+                resolved[key] = {
+                    "nutrition": self.get_nutrition_sync(name),
+                    "gi": self._lookup_gi(name),
+                }
+
+            rows.append({
+                "name": name,
+                "amount_g": self._parse_amount_g(name, amount_str),
+                **resolved[key],
+            })
+
+        return rows
 
     def calculate_recipe_nutrition(
         self,
@@ -228,6 +394,9 @@ class NutritionService:
         """
         Calculate total nutrition for a recipe based on ingredients.
 
+        Totals, KE/BE, GI and GL all come from one resolved ingredient table
+        (see resolve_ingredients) - no ingredient is looked up twice.
+
         Args:
             ingredients: List of dicts with 'name' and 'amount'
             servings: Number of servings
@@ -242,128 +411,44 @@ class NutritionService:
             "fat": 0.0,
             "fiber": 0.0
         }
+        weighted_gi = 0.0
 
-        for ingredient in ingredients:
-            name = ingredient.get("name", "")
-            amount_str = ingredient.get("amount", "100g")
-
-            # Parse amount (extract number)
-            amount_match = re.search(r'(\d+(?:\.\d+)?)', amount_str)
-            amount_g = float(amount_match.group(1)) if amount_match else 100
+        for row in self.resolve_ingredients(ingredients):
+            nutrition = row["nutrition"]
 
-            # Adjust for common units
-            if 'kg' in amount_str.lower():
-                amount_g *= 1000
-            elif 'ml' in amount_str.lower() or 'l' in amount_str.lower():
-                # Assume 1ml ≈ 1g for liquids
-                if 'l' in amount_str.lower() and 'ml' not in amount_str.lower():
-                    amount_g *= 1000
-            elif 'el' in amount_str.lower() or 'tbsp' in amount_str.lower():
-                amount_g = float(amount_match.group(1)) * 15 if amount_match else 15
-            elif 'tl' in amount_str.lower() or 'tsp' in amount_str.lower():
-                amount_g = float(amount_match.group(1)) * 5 if amount_match else 5
-            elif 'stueck' in amount_str.lower() or 'stück' in amount_str.lower():
-                # Estimate piece weights
-                if 'ei' in name.lower():
-                    amount_g = float(amount_match.group(1)) * 60 if amount_match else 60
-                else:
-                    amount_g = float(amount_match.group(1)) * 100 if amount_match else 100
-
-            # Get nutrition per 100g
-            nutrition = self.get_nutrition_sync(name)
-
-            # Scale to actual amount
-            factor = amount_g / 100
+            # Scale to actual amount (nutrition is per 100g)
+            factor = row["amount_g"] / 100
+            carbs = nutrition.get("carbs", 0) * factor
 
             total["calories"] += int(nutrition.get("calories", 0) * factor)
             total["protein"] += nutrition.get("protein", 0) * factor
-            total["carbs"] += nutrition.get("carbs", 0) * factor
+            total["carbs"] += carbs
             total["fat"] += nutrition.get("fat", 0) * factor
             total["fiber"] += nutrition.get("fiber", 0) * factor
 
+            # GI nach Kohlenhydrat-Anteil gewichten
+            weighted_gi += row["gi"] * carbs
+
+        # Estimate GI/GL (BASIC Tier+)
+        gi = round(weighted_gi / total["carbs"]) if total["carbs"] else 0
+        carbs_per_serving = total["carbs"] / servings
+
         # Calculate per serving
         per_serving = {
             "calories": int(total["calories"] / servings),
             "protein": round(total["protein"] / servings, 1),
-            "carbs": round(total["carbs"] / servings, 1),
+            "carbs": round(carbs_per_serving, 1),
             "fat": round(total["fat"] / servings, 1),
             "fiber": round(total["fiber"] / servings, 1),
             # Calculate KE/BE (1 KE = 10g carbs, 1 BE = 12g carbs)
-            "ke": round((total["carbs"] / servings) / 10, 1),
-            "be": round((total["carbs"] / servings) / 12, 1),
-            # Estimate GI/GL (BASIC Tier+)
-            "gi": self._estimate_gi(ingredients),
-            "gl": round((self._estimate_gi(ingredients) * (total["carbs"] / servings)) / 100, 1),
+            "ke": round(carbs_per_serving / 10, 1),
+            "be": round(carbs_per_serving / 12, 1),
+            "gi": gi,
+            "gl": round((gi * carbs_per_serving) / 100, 1),
         }
 
         return per_serving
 
-    def _estimate_gi(self, ingredients: List[Dict[str, Any]]) -> int:
-        """
-        Schätzt Glykämischen Index (GI) für Rezept
-
-        Returns:
-            GI (0-100): <55 niedrig, 55-69 mittel, >70 hoch
-        """
-        # GI-Werte für häufige Zutaten
-        gi_db = {
-            # Niedrig (GI < 55)
-            'gemüse': 15, 'vegetable': 15, 'salat': 10, 'lettuce': 10,
-            'tofu': 15, 'linsen': 30, 'lentils': 30, 'bohnen': 35, 'beans': 35,
-            'quinoa': 53, 'tomate': 15, 'tomato': 15, 'paprika': 15, 'pepper': 15,
-            'zwiebel': 15, 'onion': 15, 'knoblauch': 15, 'garlic': 15,
-            'brokkoli': 10, 'broccoli': 10, 'spinat': 10, 'spinach': 10,
-            'gurke': 15, 'cucumber': 15, 'zucchini': 15, 'pilze': 10, 'mushroom': 10,
-
-            # Proteine (GI ≈ 0)
-            'hähnchen': 0, 'chicken': 0, 'rind': 0, 'beef': 0,
-            'schwein': 0, 'pork': 0, 'lachs': 0, 'salmon': 0,
-            'ei': 0, 'egg': 0, 'fisch': 0, 'fish': 0,
-
-            # Milchprodukte (niedrig)
-            'milch': 31, 'milk': 31, 'käse': 0, 'cheese': 0,
-            'joghurt': 36, 'yogurt': 36, 'quark': 30,
-
-            # Mittel (GI 55-69)
-            'reis': 64, 'rice': 64, 'vollkornbrot': 69, 'wholegrain bread': 69,
-            'banane': 62, 'banana': 62, 'honig': 58, 'honey': 58,
-
-            # Hoch (GI > 70)
-            'kartoffel': 85, 'potato': 85, 'weißbrot': 75, 'white bread': 75,
-            'zucker': 100, 'sugar': 100, 'glukose': 100, 'glucose': 100,
-        }
-
-        total_carbs = 0.0
-        weighted_gi = 0.0
-
-        for ingredient in ingredients:
-            name = ingredient.get("name", "").lower()
-            amount_str = ingredient.get("amount", "100g")
-
-            # Parse Menge
-            amount_match = re.search(r'(\d+(?:\.\d+)?)', amount_str)
-            amount = float(amount_match.group(1)) if amount_match else 100
-
-            # Finde GI-Wert
-            gi_value = 50  # Default: mittel
-            for key, gi in gi_db.items():
-                if key in name:
-                    gi_value = gi
-                    break
-
-            # Hole Nährwerte
-            nutrition = self.get_nutrition_sync(name)
-            carb_amount = nutrition.get("carbs", 0) * (amount / 100)
-
-            # Gewichte GI nach Kohlenhydrat-Anteil
-            weighted_gi += gi_value * carb_amount
-            total_carbs += carb_amount
-
-        if total_carbs == 0:
-            return 0
-
-        return round(weighted_gi / total_carbs)
-
 
 # Global instance
 nutrition_service = NutritionService()
@@ -0,0 +1,177 @@
+"""
+Ollama Model Residency - Modell im RAM halten, bevor ein User darauf wartet
+
+Ollama entlädt ein Modell nach keep_alive (Default 5 min) ohne Anfrage.
+Auf dem Pi kostet das Neuladen mehrere Sekunden - die zahlt sonst der
+erste User nach einer Pause. Der Manager:
+
+- setzt keep_alive pro Anfrage (aktive Stunden / viel Traffic → lang, sonst kurz)
+- schickt während der aktiven Stunden billige Keep-Warm Pings
+  (leerer Prompt = nur laden, nichts generieren)
+- erkennt Lade- und Eviction-Events (load_duration, /api/ps)
+"""
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def parse_active_hours(value: str) -> Optional[Tuple[int, int]]:
+    """ "7-23" → (7, 23); "22-2" läuft über Mitternacht; leer → keine aktiven Stunden"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    start, end = (int(part) for part in value.split("-"))
+    if not (0 <= start <= 24 and 0 <= end <= 24):
+        raise ValueError(f"Invalid active hours: {value!r}")
+    return start, end
+
+
+class OllamaResidencyManager:
+    """keep_alive-Politik + Keep-Warm Loop + Load/Eviction-Events für ein Ollama-Modell"""
+
+    # load_duration darüber = Modell musste (neu) geladen werden
+    COLD_LOAD_SECONDS = 0.5
+
+    def __init__(
+        self,
+        provider,
+        active_hours: str = "7-23",
+        ping_interval_seconds: float = 240.0,
+        keep_alive_active: str = "30m",
+        keep_alive_idle: str = "5m",
+        busy_requests: int = 3,
+        traffic_window_seconds: float = 1800.0
+    ):
+        self.provider = provider
+        self.active_hours = parse_active_hours(active_hours)
+        self.ping_interval_seconds = ping_interval_seconds
+        self.keep_alive_active = keep_alive_active
+        self.keep_alive_idle = keep_alive_idle
+        self.busy_requests = busy_requests
+        self.traffic_window_seconds = traffic_window_seconds
+
+        self._requests: Deque[float] = deque()
+        self._loaded: Optional[bool] = None  # None = unbekannt (noch nicht geprüft)
+        self._task: Optional[asyncio.Task] = None
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=50)
+        self.stats = {
+            "pings": 0,
+            "ping_failures": 0,
+            "cold_loads_request": 0,
+            "cold_loads_ping": 0,
+            "evictions": 0,
+        }
+
+    # --- keep_alive Politik ---
+
+    def is_active_hour(self, now: Optional[datetime] = None) -> bool:
+        if self.active_hours is None:
+            return False
+        start, end = self.active_hours
+        hour = (now or datetime.now()).hour
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    def recent_requests(self) -> int:
+        cutoff = time.monotonic() - self.traffic_window_seconds
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        return len(self._requests)
+
+    def keep_alive_for_request(self) -> str:
+        """Pro Anfrage: lang halten, wenn aktiv/viel los, sonst Ollama-Default"""
+        self._requests.append(time.monotonic())
+        # Erst aufräumen, dann entscheiden - in aktiven Stunden würde das `or`
+        # recent_requests() sonst überspringen und die Deque nie kürzen
+        busy = self.recent_requests() >= self.busy_requests
+        if self.is_active_hour() or busy:
+            return self.keep_alive_active
+        return self.keep_alive_idle
+
+    # --- Events ---
+
+    def observe(self, response: Dict[str, Any], source: str = "request"):
+        """Finale Ollama-Antwort auswerten (load_duration in ns)"""
+        load_seconds = (response.get("load_duration") or 0) / 1e9
+        if load_seconds >= self.COLD_LOAD_SECONDS:
+            self.stats[f"cold_loads_{source}"] += 1
+            self._event("load", source=source, load_seconds=round(load_seconds, 2))
+            if source == "request":
+                logger.warning(f"Ollama cold load during user request ({load_seconds:.1f}s)")
+        self._loaded = True
+
+    def _event(self, kind: str, **details):
+        self.events.append({"event": kind, "at": datetime.utcnow().isoformat() + "Z", **details})
+
+    # --- Keep-Warm Loop ---
+
+    async def check_loaded(self) -> bool:
+        """/api/ps: ist das Modell gerade geladen? (Eviction erkennen)"""
+        loaded = await self.provider.loaded()
+        if self._loaded and not loaded:
+            self.stats["evictions"] += 1
+            self._event("evicted")
+            logger.info(f"Ollama model {self.provider.model} was evicted")
+        self._loaded = loaded
+        return loaded
+
+    async def ping(self) -> bool:
+        """Modell laden/halten, ohne zu generieren"""
+        self.stats["pings"] += 1
+        try:
+            response = await self.provider.warm(self.keep_alive_active)
+        except Exception as e:
+            self.stats["ping_failures"] += 1
+            logger.warning(f"Ollama keep-warm ping failed: {e}")
+            return False
+        self.observe(response, source="ping")
+        return True
+
+    async def tick(self):
+        """Ein Durchlauf: Eviction prüfen, in aktiven Stunden warm halten"""
+        if not self.provider.breaker.allow_request():
+            return
+        try:
+            await self.check_loaded()
+        except Exception as e:
+            logger.warning(f"Ollama residency check failed: {e}")
+            return
+        if self.is_active_hour():
+            await self.ping()
+
+    async def _loop(self):
+        while True:
+            await self.tick()
+            await asyncio.sleep(self.ping_interval_seconds)
+
+    def start(self):
+        """Loop starten (ohne aktive Stunden: nur Eviction-Erkennung, keine Pings)"""
+        if self.active_hours is None:
+            logger.info("Ollama keep-warm pings disabled (no active hours configured)")
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "model": self.provider.model,
+            "loaded": self._loaded,
+            "active_hours": "-".join(str(hour) for hour in self.active_hours) if self.active_hours else None,
+            "active_now": self.is_active_hour(),
+            "recent_requests": self.recent_requests(),
+            "keep_alive": {"active": self.keep_alive_active, "idle": self.keep_alive_idle},
+            "running": self._task is not None and not self._task.done(),
+            **self.stats,
+            "events": list(self.events)[-10:],
+        }
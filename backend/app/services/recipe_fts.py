@@ -0,0 +1,174 @@
+"""
+Recipe Full-Text Search - SQLite FTS5 Backend für /recipe-db/search
+
+- Virtuelle Tabelle recipe_db_fts (name_de, name_en, description, Zutaten-Namen)
+- Synchronisiert per Trigger bei INSERT/UPDATE/DELETE auf recipe_db
+- Ranking: BM25 kombiniert mit quality_score
+"""
+from typing import List, Optional, Tuple
+import logging
+import re
+
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.recipe_db import RecipeDB
+
+logger = logging.getLogger(__name__)
+
+
+# Zutaten-Namen aus der JSON-Spalte als ein Text-Feld
+_INGREDIENT_NAMES_SQL = (
+    "(SELECT group_concat(json_extract(value, '$.name'), ' ') FROM json_each({row}.ingredients))"
+)
+
+_FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS recipe_db_fts USING fts5(
+        name_de, name_en, description, ingredients,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_db_fts_ai AFTER INSERT ON recipe_db BEGIN
+        INSERT INTO recipe_db_fts(rowid, name_de, name_en, description, ingredients)
+        VALUES (new.id, new.name_de, new.name_en, new.description, {_INGREDIENT_NAMES_SQL.format(row="new")});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipe_db_fts_ad AFTER DELETE ON recipe_db BEGIN
+        DELETE FROM recipe_db_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipe_db_fts_au
+    AFTER UPDATE OF name_de, name_en, description, ingredients ON recipe_db BEGIN
+        DELETE FROM recipe_db_fts WHERE rowid = old.id;
+        INSERT INTO recipe_db_fts(rowid, name_de, name_en, description, ingredients)
+        VALUES (new.id, new.name_de, new.name_en, new.description, {_INGREDIENT_NAMES_SQL.format(row="new")});
+    END
+    """,
+]
+
+_FTS_BACKFILL = f"""
+    INSERT INTO recipe_db_fts(rowid, name_de, name_en, description, ingredients)
+    SELECT r.id, r.name_de, r.name_en, r.description, {_INGREDIENT_NAMES_SQL.format(row="r")}
+    FROM recipe_db r
+    WHERE r.id NOT IN (SELECT rowid FROM recipe_db_fts)
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class RecipeFullTextSearch:
+    """FTS5-Suche über die kuratierte Recipe-DB"""
+
+    # BM25-Gewichte pro Spalte: name_de, name_en, description, ingredients
+    COLUMN_WEIGHTS = (10.0, 10.0, 2.0, 5.0)
+
+    # quality_score (0-100) als Bonus auf den (negativen) BM25-Score
+    QUALITY_WEIGHT = 0.05
+
+    def __init__(self):
+        self.enabled = False
+
+    def ensure_schema(self, engine: Engine) -> bool:
+        """
+        Legt FTS-Tabelle + Trigger an und indexiert fehlende Rezepte
+
+        Returns:
+            True wenn FTS5 verfügbar ist (sonst ILIKE-Fallback)
+        """
+        if engine.dialect.name != "sqlite":
+            self.enabled = False
+            return False
+
+        try:
+            with engine.begin() as conn:
+                for statement in _FTS_SCHEMA:
+                    conn.execute(text(statement))
+                conn.execute(text(_FTS_BACKFILL))
+            self.enabled = True
+        except OperationalError as e:
+            logger.warning(f"FTS5 not available, falling back to ILIKE search: {e}")
+            self.enabled = False
+
+        return self.enabled
+
+    @staticmethod
+    def build_match_query(query: str) -> Optional[str]:
+        """
+        User-Eingabe → FTS5 MATCH-Ausdruck
+
+        Jedes Wort wird als Präfix-Term gequotet ("tomat"*), damit
+        FTS5-Syntax (AND, NEAR, ", *, ...) aus der Eingabe nicht interpretiert wird.
+        """
+        tokens = _TOKEN.findall(query or "")
+        if not tokens:
+            return None
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(
+        self,
+        db: Session,
+        match_query: str,
+        filters: List,
+        limit: int,
+        offset: int
+    ) -> Tuple[int, List[RecipeDB]]:
+        """
+        FTS-Suche mit Gesamtanzahl und Seite in einer Abfrage
+
+        Returns:
+            (total, recipes)
+        """
+        # bm25() nur direkt in der FTS-Abfrage erlaubt → Subquery mit Score
+        fts_table = literal_column("recipe_db_fts")
+        weights = [literal_column(repr(weight)) for weight in self.COLUMN_WEIGHTS]
+        fts_hits = (
+            select(
+                literal_column("rowid").label("recipe_id"),
+                func.bm25(fts_table, *weights).label("bm25"),
+            )
+            .select_from(text("recipe_db_fts"))
+            .where(fts_table.op("MATCH")(match_query))
+            .subquery()
+        )
+
+        # BM25 ist negativ (kleiner = besser), Quality Score verbessert den Rang
+        rank = fts_hits.c.bm25 - func.coalesce(RecipeDB.quality_score, 0.0) * self.QUALITY_WEIGHT
+
+        query = (
+            db.query(RecipeDB)
+            .join(fts_hits, fts_hits.c.recipe_id == RecipeDB.id)
+            .filter(*filters)
+        )
+
+        return paginate_with_total(query, rank, limit, offset)
+
+
+def paginate_with_total(query, order_by, limit: int, offset: int) -> Tuple[int, List]:
+    """
+    Seite + Gesamtanzahl in einem Round Trip (COUNT(*) OVER ())
+
+    Nur wenn die Seite leer ist (offset hinter dem Ende) wird separat gezählt.
+    """
+    rows = (
+        query.add_columns(func.count().over().label("total"))
+        .order_by(order_by)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    if rows:
+        return rows[0].total, [row[0] for row in rows]
+
+    total = query.order_by(None).count() if offset > 0 else 0
+    return total, []
+
+
+# Global instance
+recipe_fts = RecipeFullTextSearch()
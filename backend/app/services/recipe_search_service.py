@@ -9,6 +9,7 @@ from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from app.models.recipe_db import RecipeDB
 from app.models.user import User, SubscriptionTier
+from app.services.ingredient_index import ingredient_index
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,9 @@ logger = logging.getLogger(__name__)
 class RecipeSearchService:
     """Hybrid Recipe Search: DB first, AI fallback"""
 
+    # SQLite erlaubt nur begrenzt viele Parameter pro IN (...)
+    CANDIDATE_CHUNK_SIZE = 500
+
     @staticmethod
     async def search_recipe(
         ingredients: List[str],
@@ -82,74 +86,96 @@ class RecipeSearchService:
         Sucht passendes Rezept in DB
 
         Matching-Logik:
-        1. Mind. 50% der Zutaten müssen matchen
+        1. Mind. 50% der Zutaten müssen matchen (über den Zutaten-Index)
         2. Präferenzen müssen matchen (vegetarisch, low-carb, etc.)
         3. Sortierung nach Quality Score
         """
 
-        # Base query
-        query = db.query(RecipeDB)
-
-        # Filter nach Präferenzen
-        if preferences.get("vegetarian"):
-            query = query.filter(RecipeDB.is_vegetarian == True)
+        # Kandidaten über die Posting-Listen (kein Laden aller Rezepte)
+        scores = ingredient_index.score_candidates(ingredients, db, min_score=0.5)
 
-        if preferences.get("vegan"):
-            query = query.filter(RecipeDB.is_vegan == True)
+        if not scores:
+            return None
 
-        if preferences.get("gluten_free"):
-            query = query.filter(RecipeDB.is_gluten_free == True)
+        filters = RecipeSearchService._preference_filters(preferences)
 
-        if preferences.get("low_carb"):
-            query = query.filter(RecipeDB.is_low_carb == True)
+        if limit < ingredient_index.recipe_count:
+            # Tier-Limit: nur die Top-N Rezepte (nach Quality Score) sind durchsuchbar
+            top_recipes = (
+                db.query(RecipeDB.id)
+                .filter(*filters)
+                .order_by(RecipeDB.quality_score.desc())
+                .limit(limit)
+                .all()
+            )
 
-        if preferences.get("low_gi"):
-            query = query.filter(RecipeDB.is_low_gi == True)
+            # Bestes Match: höchster Score, bei Gleichstand höherer Quality Score
+            best_id = None
+            best_match_score = 0
+            for (recipe_id,) in top_recipes:
+                if scores.get(recipe_id, 0) > best_match_score:
+                    best_id = recipe_id
+                    best_match_score = scores[recipe_id]
+
+            if best_id is None:
+                return None
+            return db.query(RecipeDB).filter(RecipeDB.id == best_id).first()
+
+        # Kandidaten absteigend nach Score prüfen - die erste Score-Stufe mit
+        # einem Rezept, das die Präferenzen erfüllt, liefert das beste Match
+        ids_by_score: Dict[float, List[int]] = {}
+        for recipe_id, score in scores.items():
+            ids_by_score.setdefault(score, []).append(recipe_id)
+
+        for score in sorted(ids_by_score, reverse=True):
+            candidate_ids = ids_by_score[score]
+            best_match = None
+
+            # In Chunks wegen SQLite-Parameterlimit
+            for i in range(0, len(candidate_ids), RecipeSearchService.CANDIDATE_CHUNK_SIZE):
+                chunk = candidate_ids[i:i + RecipeSearchService.CANDIDATE_CHUNK_SIZE]
+                recipe = (
+                    db.query(RecipeDB)
+                    .filter(RecipeDB.id.in_(chunk), *filters)
+                    .order_by(RecipeDB.quality_score.desc())
+                    .first()
+                )
+                if recipe and (best_match is None or (recipe.quality_score or 0) > (best_match.quality_score or 0)):
+                    best_match = recipe
+
+            if best_match:
+                return best_match
+
+        return None
 
-        if preferences.get("diabetic_friendly"):
-            query = query.filter(RecipeDB.is_diabetic_friendly == True)
+    @staticmethod
+    def _preference_filters(preferences: Dict) -> List:
+        """SQL-Filter für User-Präferenzen (vegetarisch, low-carb, etc.)"""
+        flag_columns = {
+            "vegetarian": RecipeDB.is_vegetarian,
+            "vegan": RecipeDB.is_vegan,
+            "gluten_free": RecipeDB.is_gluten_free,
+            "low_carb": RecipeDB.is_low_carb,
+            "low_gi": RecipeDB.is_low_gi,
+            "diabetic_friendly": RecipeDB.is_diabetic_friendly,
+            "quick": RecipeDB.is_quick,
+        }
 
-        if preferences.get("quick"):
-            query = query.filter(RecipeDB.is_quick == True)
+        filters = [
+            column == True
+            for key, column in flag_columns.items()
+            if preferences.get(key)
+        ]
 
         # Max carbs filter
         if preferences.get("max_carbs"):
-            query = query.filter(RecipeDB.carbs <= preferences["max_carbs"])
+            filters.append(RecipeDB.carbs <= preferences["max_carbs"])
 
         # Max GI filter
         if preferences.get("max_gi"):
-            query = query.filter(RecipeDB.gi <= preferences["max_gi"])
-
-        # Sortiere nach Quality Score
-        query = query.order_by(RecipeDB.quality_score.desc())
-
-        # Limit basierend auf Tier
-        query = query.limit(limit)
-
-        # Hole alle Kandidaten
-        candidates = query.all()
-
-        if not candidates:
-            return None
-
-        # Finde bestes Match basierend auf Zutaten-Übereinstimmung
-        best_match = None
-        best_match_score = 0
-
-        for recipe in candidates:
-            recipe_ingredients = [ing["name"].lower() for ing in recipe.ingredients]
-            user_ingredients = [ing.lower() for ing in ingredients]
-
-            # Berechne Match-Score (wie viele Zutaten matchen)
-            matches = sum(1 for ui in user_ingredients if any(ui in ri or ri in ui for ri in recipe_ingredients))
-            match_score = matches / len(recipe_ingredients) if recipe_ingredients else 0
-
-            # Mind. 50% Match erforderlich
-            if match_score >= 0.5 and match_score > best_match_score:
-                best_match = recipe
-                best_match_score = match_score
+            filters.append(RecipeDB.gi <= preferences["max_gi"])
 
-        return best_match
+        return filters
 
     @staticmethod
     def _get_db_size_limit(tier: SubscriptionTier) -> int:
@@ -0,0 +1,91 @@
+"""
+Recipe Stream Parser - Rezepte aus dem Token-Stream schneiden
+
+Das Modell streamt ein JSON-Array von Rezept-Objekten. Statt auf das Ende
+des Arrays zu warten, erkennt der Parser jedes Objekt, sobald seine
+schließende Klammer ankommt:
+
+    parser = IncrementalRecipeParser()
+    for token in stream:
+        for recipe in parser.feed(token):
+            ...  # vollständiges Rezept-Dict
+
+Text vor dem Array (```json, Erklärungen) wird ignoriert; Klammern in
+Strings werden korrekt übersprungen.
+"""
+from typing import Any, Dict, List, Optional
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalRecipeParser:
+    """Zustandsautomat über den Token-Stream (Tiefe, String, Escape)"""
+
+    def __init__(self):
+        self.text = ""  # Gesamter Stream (für Fallback/Debugging)
+        self._pos = 0  # Nächstes ungelesenes Zeichen in self.text
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_depth: Optional[int] = None  # Tiefe, auf der Rezept-Objekte beginnen
+        self._object_start: Optional[int] = None
+        self.recipes_found = 0
+        self.errors = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Neuen Text anhängen, fertig gewordene Rezept-Objekte zurückgeben"""
+        self.text += chunk
+        completed = []
+
+        text = self.text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                # Strings nur innerhalb des JSON zählen (Prosa davor ignorieren)
+                if self._depth > 0:
+                    self._in_string = True
+            elif char in "[{":
+                if self._object_depth is None:
+                    # Erstes '[' → Objekte darin; erstes '{' ohne Array → Objekte auf Ebene 0
+                    self._object_depth = 1 if char == "[" else 0
+                if char == "{" and self._depth == self._object_depth and self._object_start is None:
+                    self._object_start = index
+                self._depth += 1
+            elif char in "]}":
+                if self._depth == 0:
+                    continue
+                self._depth -= 1
+                if char == "}" and self._depth == self._object_depth and self._object_start is not None:
+                    recipe = self._decode(text[self._object_start:index + 1])
+                    if recipe is not None:
+                        completed.append(recipe)
+                    self._object_start = None
+
+        self._pos = len(text)
+        return completed
+
+    def _decode(self, raw: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.errors += 1
+            logger.warning(f"Skipping malformed recipe object in stream: {e}")
+            return None
+
+        if not isinstance(value, dict):
+            return None
+
+        self.recipes_found += 1
+        return value
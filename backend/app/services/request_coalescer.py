@@ -0,0 +1,142 @@
+"""
+Request Coalescer - Single-Flight für identische AI-Generierungen
+
+Laufen mehrere identische Anfragen gleichzeitig (z.B. dieselbe FAQ-Kategorie),
+startet nur die erste einen LLM-Lauf. Alle weiteren hängen sich an:
+- run():    warten auf dasselbe Ergebnis
+- stream(): bekommen denselben Token-Stream (inkl. bereits erzeugter Tokens)
+
+Der Lauf selbst ist ein eigener asyncio.Task - bricht ein einzelner Client ab,
+läuft er für die anderen weiter. Erst wenn keiner mehr wartet, wird er abgebrochen.
+
+Nur der Lauf belegt einen AI-Slot (der Generator nimmt ihn um den
+Provider-Aufruf, mit dem Admission-Ticket der ersten Anfrage). Angehängte
+Anfragen warten nicht in der Queue und bekommen kein eigenes 429 - bei
+2 Ollama-Slots kosten N identische Anfragen einen Slot, nicht N.
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """Laufende Generierung + Anzahl wartender Anfragen"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _Broadcast:
+    """Laufender Token-Stream, den mehrere Subscriber lesen"""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class RequestCoalescer:
+    """Single-Flight Layer vor ai_generator"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self.stats = {"runs": 0, "coalesced": 0, "streams": 0, "stream_subscribers": 0}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        factory() nur ausführen, wenn für key nichts läuft - sonst mitwarten
+
+        Alle Wartenden bekommen dasselbe Ergebnisobjekt (bzw. dieselbe Exception).
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(self._flights, key, flight))
+            self.stats["runs"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.info(f"Coalesced generation request ({key[:12]}, {flight.waiters} waiting)")
+
+        flight.waiters += 1
+        try:
+            # shield: Abbruch eines Wartenden bricht nicht den gemeinsamen Lauf ab
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Token-Stream für key - ein Lauf, Fan-out an alle Subscriber
+
+        Späte Subscriber bekommen zuerst die bereits erzeugten Tokens.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._pump(key, broadcast, factory()))
+            self.stats["streams"] += 1
+        else:
+            logger.info(f"Attached to running stream ({key[:12]}, {broadcast.subscribers} subscribers)")
+
+        self.stats["stream_subscribers"] += 1
+        broadcast.subscribers += 1
+        index = 0
+        try:
+            while True:
+                async with broadcast.changed:
+                    await broadcast.changed.wait_for(
+                        lambda: index < len(broadcast.tokens) or broadcast.done
+                    )
+                    batch = broadcast.tokens[index:]
+
+                if not batch:
+                    # Fertig und alles gelesen
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+
+                index += len(batch)
+                for token in batch:
+                    yield token
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                broadcast.task.cancel()
+
+    async def _pump(self, key: str, broadcast: _Broadcast, source: AsyncIterator[str]):
+        """Liest den Quell-Stream einmal und verteilt die Tokens"""
+        try:
+            async for token in source:
+                async with broadcast.changed:
+                    broadcast.tokens.append(token)
+                    broadcast.changed.notify_all()
+        except asyncio.CancelledError:
+            broadcast.error = RuntimeError("Generation cancelled")
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            # Neue Anfragen starten ab jetzt einen eigenen Lauf
+            self._forget(self._streams, key, broadcast)
+            async with broadcast.changed:
+                broadcast.done = True
+                broadcast.changed.notify_all()
+
+    @staticmethod
+    def _forget(registry: Dict[str, Any], key: str, entry: Any):
+        if registry.get(key) is entry:
+            del registry[key]
+
+
+# Global instance
+request_coalescer = RequestCoalescer()
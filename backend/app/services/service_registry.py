@@ -0,0 +1,125 @@
+"""
+Service Registry - schwere Services erst bei Bedarf bauen
+
+reportlab (PDF), resend (E-Mail) und stripe kosten beim Import spürbar
+Zeit - auf dem Pi (cpus: 0.5) verzögert das jeden Kaltstart. Routen holen
+sich stattdessen einen Platzhalter, der den Service beim ersten Zugriff baut:
+
+    pdf_generator = services.lazy("pdf_generator")
+    pdf_generator.generate(recipe)  # importiert reportlab beim ersten Aufruf
+
+Nach dem Start wärmt warm() die Services im Hintergrund-Thread vor,
+während die App bereits Anfragen annimmt.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional
+import asyncio
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LazyService:
+    """Platzhalter: Attributzugriffe bauen den Service (einmalig) und leiten weiter"""
+
+    def __init__(self, registry: "ServiceRegistry", name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        state = "ready" if self._registry.is_ready(self._name) else "lazy"
+        return f"<LazyService(name='{self._name}', {state})>"
+
+
+class ServiceRegistry:
+    """Name → Factory; Instanz wird beim ersten get() gebaut und behalten"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._build_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._factories[name] = factory
+
+    def register_import(self, name: str, target: str, call: bool = False):
+        """
+        Service aus "modul:attribut" (Import erst beim Bauen).
+        call=True → das Attribut ist eine Klasse/Factory und wird aufgerufen.
+        """
+        module_name, attr = target.split(":")
+
+        def factory():
+            obj = getattr(importlib.import_module(module_name), attr)
+            return obj() if call else obj
+
+        self.register(name, factory)
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._instances:
+                started = time.perf_counter()
+                try:
+                    self._instances[name] = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._errors.pop(name, None)
+                self._build_seconds[name] = time.perf_counter() - started
+                logger.info(f"Service '{name}' ready ({self._build_seconds[name] * 1000:.0f} ms)")
+            return self._instances[name]
+
+    def lazy(self, name: str) -> LazyService:
+        return LazyService(self, name)
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._instances
+
+    async def warm(self, names: Optional[Iterable[str]] = None, delay_seconds: float = 0.0):
+        """Services nacheinander im Thread bauen (Event Loop bleibt frei), Fehler nur loggen"""
+        if delay_seconds:
+            await asyncio.sleep(delay_seconds)
+
+        for name in list(names or self._factories):
+            if self.is_ready(name):
+                continue
+            try:
+                await asyncio.to_thread(self.get, name)
+            except Exception as e:
+                logger.warning(f"Service warmup failed for '{name}': {e}")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "ready": self.is_ready(name),
+                "build_ms": round(self._build_seconds[name] * 1000, 1) if name in self._build_seconds else None,
+                "error": self._errors.get(name),
+            }
+            for name in self._factories
+        }
+
+
+def _stripe_client():
+    import stripe
+    from app.config import settings
+
+    stripe.api_key = getattr(settings, "STRIPE_SECRET_KEY", "")
+    return stripe
+
+
+# Global instance
+services = ServiceRegistry()
+services.register_import("pdf_generator", "app.services.pdf_generator:pdf_generator")
+services.register_import("email_service", "app.services.email_service:EmailService", call=True)
+services.register("stripe", _stripe_client)
@@ -0,0 +1,108 @@
+"""
+Token Budget Estimator - num_predict / maxOutputTokens pro Anfrage
+
+Statt pauschal 2048 Tokens: Obergrenze aus den beobachteten
+Antwortlängen je Bucket (Anzahl Rezepte, Sprache, Diät ja/nein),
+p95 + Sicherheitsmarge. Auf dem Pi (nur CPU) begrenzt das die
+Worst-Case-Dauer einer Generierung, die sich "verläuft".
+
+Zu knapp geschätzt? Der Generator erkennt die abgeschnittene Antwort
+(done_reason / finishReason) und holt den Rest mit einem
+Continuation-Prompt (doppeltes Budget) - die Beobachtung hebt das
+Budget danach an.
+"""
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+
+BucketKey = Tuple[int, str, str]
+
+
+def _p95(values: List[int]) -> int:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class TokenBudgetEstimator:
+    """Sliding Window der Output-Tokens pro Bucket → Budget = p95 × margin"""
+
+    def __init__(
+        self,
+        default_budget: int = 2048,
+        min_budget: int = 256,
+        max_budget: int = 4096,
+        margin: float = 1.25,
+        min_samples: int = 5,
+        window_size: int = 50
+    ):
+        self.default_budget = default_budget
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.margin = margin
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self._samples: Dict[BucketKey, Deque[int]] = {}
+        self._per_recipe: Deque[float] = deque(maxlen=window_size)  # Bucket-übergreifend
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "truncated": 0, "continuations": 0}
+
+    @staticmethod
+    def bucket(count: int, language: str, diet_profiles: Optional[List[str]]) -> BucketKey:
+        return (count, language or "en", "diet" if diet_profiles else "none")
+
+    def _clamp(self, tokens: float) -> int:
+        return int(min(self.max_budget, max(self.min_budget, math.ceil(tokens))))
+
+    def budget(self, key: BucketKey) -> int:
+        """Token-Obergrenze für eine Anfrage in diesem Bucket"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is not None and len(samples) >= self.min_samples:
+                return self._clamp(_p95(list(samples)) * self.margin)
+
+            # Neuer Bucket: aus Tokens pro Rezept über alle Buckets hochrechnen
+            if len(self._per_recipe) >= self.min_samples:
+                per_recipe = _p95(list(self._per_recipe))
+                return self._clamp(per_recipe * key[0] * self.margin)
+
+        return self.default_budget
+
+    def continuation_budget(self, previous: int) -> int:
+        """Budget für die nächste Continuation: verdoppeln (Schätzung lag daneben)"""
+        return self._clamp(previous * 2)
+
+    def record(self, key: BucketKey, output_tokens: int, truncated: bool = False):
+        """Tatsächliche Antwortlänge (inkl. Continuations) merken"""
+        if output_tokens <= 0:
+            return
+        with self._lock:
+            self.stats["requests"] += 1
+            if truncated:
+                self.stats["truncated"] += 1
+            self._samples.setdefault(key, deque(maxlen=self.window_size)).append(output_tokens)
+            self._per_recipe.append(output_tokens / max(key[0], 1))
+
+    def record_continuation(self):
+        with self._lock:
+            self.stats["continuations"] += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+            stats = dict(self.stats)
+
+        return {
+            **stats,
+            "buckets": {
+                "/".join(str(part) for part in key): {
+                    "samples": len(samples),
+                    "p95_tokens": _p95(samples),
+                    "budget": self.budget(key),
+                }
+                for key, samples in snapshot.items()
+            },
+        }
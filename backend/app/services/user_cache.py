@@ -0,0 +1,130 @@
+"""
+User Cache - Kurzlebiger Cache für angemeldete User (Principal)
+
+Pro Request wird der User einmal aufgelöst (JWT → Principal) und in
+request.state geteilt: Rate Limiter, Email-Verification-Middleware und
+get_current_user / get_current_user_async brauchen dafür keinen eigenen
+SELECT. Über Requests hinweg hält ein In-Process LRU mit kurzer TTL die
+Spaltenwerte des User-Rows; die Dependencies hängen daraus einen User an
+die Session des Requests (merge ohne Laden).
+
+Invalidierung: Jeder ORM-Write auf einen User (Tier per Stripe-Webhook,
+Admin-Flag, E-Mail verifiziert, Tageszähler, ...) entfernt den Eintrag -
+beim Flush und nach dem Commit nochmal, damit ein paralleler Request keinen
+alten Stand zurückschreibt. Writes aus anderen Workern/Nodes sieht dieser
+Prozess erst nach Ablauf der TTL.
+
+Der Snapshot ist nur zum Lesen da (Auth, Tier, E-Mail verifiziert). Routen,
+die den User ändern, laden ihn frisch (get_current_user_for_update); der
+Tageszähler wird per atomarem UPDATE hochgezählt (Core-UPDATE → Eintrag
+wird dort explizit invalidiert).
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.config import settings
+from app.models.user import User
+from app.services.nutrition_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Spaltenwerte eines Users zum Zeitpunkt des Ladens"""
+
+    id: int
+    values: Dict[str, Any]
+
+    @property
+    def email(self) -> str:
+        return self.values["email"]
+
+    @property
+    def subscription_tier(self):
+        return self.values["subscription_tier"]
+
+    @property
+    def is_admin(self) -> bool:
+        return bool(self.values["is_admin"])
+
+    @property
+    def email_verified(self) -> bool:
+        return bool(self.values["email_verified"])
+
+
+class UserCache:
+    """In-Memory LRU mit TTL: user_id → Principal"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def principal_for(user: User) -> Principal:
+        values = {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+        return Principal(id=user.id, values=values)
+
+    @staticmethod
+    def to_user(principal: Principal) -> User:
+        """Detached User ohne SELECT → per session.merge(user, load=False) anhängen"""
+        user = User(**principal.values)
+        make_transient_to_detached(user)
+        return user
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        hit, principal = self.cache.get(user_id)
+        self.stats["hits" if hit else "misses"] += 1
+        return principal
+
+    def put(self, user: User) -> Principal:
+        principal = self.principal_for(user)
+        if self.enabled:
+            self.cache.set(user.id, principal)
+        return principal
+
+    def invalidate(self, user_id: int):
+        self.cache.delete(user_id)
+        self.stats["invalidations"] += 1
+
+    def clear(self):
+        self.cache.clear()
+
+
+# Global instance
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+# Invalidierung bei jedem ORM-Write auf einen User (sync + AsyncSession)
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_written_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("written_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("written_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session):
+    session.info.pop("written_user_ids", None)
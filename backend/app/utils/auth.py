@@ -1,21 +1,19 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.utils.database import get_db
+from app.utils.database import SessionLocal, get_async_db, get_db
 from app.utils.jwt import verify_token
 from app.models.user import User
+from app.services.user_cache import Principal, user_cache
 
 # Bearer Token Security (fallback for backwards compatibility)
 security = HTTPBearer(auto_error=False)
 
-def get_current_user(
-    request: Request,
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def _user_id_from_token(request: Request, credentials: Optional[HTTPAuthorizationCredentials]) -> int:
     """
-    Dependency: Aktuellen User aus JWT Token holen
+    User ID aus dem JWT Token holen
     Unterstützt httpOnly Cookie (preferred) oder Authorization Header (fallback)
     """
     token = None
@@ -51,12 +49,128 @@ def get_current_user(
             detail="Invalid token payload"
         )
 
-    # User aus DB laden
-    user = db.query(User).filter(User.id == user_id).first()
+    return user_id
+
+
+def token_from_request(request: Request) -> Optional[str]:
+    """JWT aus httpOnly Cookie (preferred) oder Authorization Header (fallback)"""
+    token = request.cookies.get("access_token")
+    auth_header = request.headers.get("Authorization")
+    if not token and auth_header and auth_header.startswith("Bearer "):
+        token = auth_header[len("Bearer "):]
+    return token
+
+
+def _known_principal(request: Request, user_id: int) -> Optional[Principal]:
+    """Im selben Request schon aufgelöst (Middleware/Dependency) oder im User Cache"""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None and principal.id == user_id:
+        return principal
+    return user_cache.get(user_id)
+
+
+def resolve_principal(request: Request) -> Optional[Principal]:
+    """
+    Angemeldeten User für Middlewares auflösen (sync → im Threadpool aufrufen)
+    Einmal pro Request, danach in request.state für die Dependencies
+    None = kein/ungültiger Token oder User existiert nicht
+    """
+    token = token_from_request(request)
+    payload = verify_token(token) if token else None
+    user_id = payload.get("user_id") if payload else None
+    if not user_id:
+        return None
+
+    principal = _known_principal(request, user_id)
+    if principal is None:
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if user is None:
+                return None
+            principal = user_cache.put(user)
+        finally:
+            db.close()
+
+    request.state.principal = principal
+    return principal
+
+
+def _user_or_401(user: Optional[User]) -> User:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    return user
+
+
+def get_current_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency: Aktuellen User aus JWT Token holen (sync Session)
+    Stand aus dem User Cache (bis zu USER_CACHE_TTL_SECONDS alt) - für Auth,
+    Tier und Verifizierung. Routen, die den User ändern →
+    get_current_user_for_update
+    """
+    user_id = _user_id_from_token(request, credentials)
+
+    principal = _known_principal(request, user_id)
+    if principal is not None:
+        # Kein SELECT: User aus dem Cache an die Session des Requests hängen
+        return db.merge(user_cache.to_user(principal), load=False)
+
+    # User aus DB laden
+    user = _user_or_401(db.query(User).filter(User.id == user_id).first())
+    request.state.principal = user_cache.put(user)
+    return user
+
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Dependency: nur Admins (interne Status-Endpoints)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+def get_current_user_for_update(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency: Aktuellen User frisch aus der DB (sync Session, ohne User Cache)
+    Für Routen, die den User ändern: kein Read-Modify-Write auf einem alten
+    Snapshot, der Writes anderer Worker/Requests überschreiben würde
+    """
+    user_id = _user_id_from_token(request, credentials)
+
+    user = _user_or_401(db.query(User).filter(User.id == user_id).first())
+    request.state.principal = user_cache.put(user)
+    return user
+
+
+async def get_current_user_async(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Dependency: Aktuellen User aus JWT Token holen (AsyncSession)
+    Für async Routen - der Lookup blockiert den Event Loop nicht
+    """
+    user_id = _user_id_from_token(request, credentials)
+
+    principal = _known_principal(request, user_id)
+    if principal is not None:
+        return await db.merge(user_cache.to_user(principal), load=False)
 
-    return user
\ No newline at end of file
+    user = _user_or_401(await db.get(User, user_id))
+    request.state.principal = user_cache.put(user)
+    return user
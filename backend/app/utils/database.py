@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
@@ -21,14 +23,101 @@ def ensure_database_directory():
 # Ordner erstellen VOR Engine-Erstellung
 ensure_database_directory()
 
+# SQLITE PROFILE
+def sqlite_pragmas(profile: str) -> Dict[str, Any]:
+    """
+    PRAGMAs, die auf jeder neuen SQLite-Verbindung gesetzt werden
+
+    - default: SQLite-Defaults (Rollback-Journal, synchronous=FULL)
+    - tuned: WAL (Leser blockieren Schreiber nicht mehr), synchronous=NORMAL
+      (fsync nur beim Checkpoint - in WAL trotzdem crash-sicher), mmap + größerer
+      Page-Cache, Temp-Tabellen im RAM, busy_timeout statt "database is locked"
+    """
+    if profile == "default":
+        return {}
+    if profile == "tuned":
+        return {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # negativ = KiB statt Pages
+            "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+            "temp_store": "MEMORY",
+            "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        }
+    raise ValueError(f"Unknown SQLITE_PROFILE: {profile!r}")
+
+
+def _apply_sqlite_profile(engine, profile: Optional[str]):
+    """Connect-Hook: PRAGMAs auf jede neue (sync oder aiosqlite) Verbindung"""
+    pragmas = sqlite_pragmas(profile or settings.SQLITE_PROFILE)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def pool_options() -> Dict[str, Any]:
+    """Connection Pool für Server-Datenbanken (PostgreSQL)"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,  # Tote Verbindungen (Failover, Neustart) vor Benutzung erkennen
+    }
+
+
+def create_db_engine(url: Optional[str] = None, profile: Optional[str] = None):
+    """SQLAlchemy Engine; SQLite bekommt das Profil per Connect-Hook, PostgreSQL einen Pool"""
+    url = url or settings.DATABASE_URL
+    if not url.startswith("sqlite"):
+        return create_engine(url, **pool_options())
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    _apply_sqlite_profile(engine, profile)
+    return engine
+
+
+# ASYNC ENGINE (gleiche Datenbank, async Treiber)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """sqlite:///./x.db → sqlite+aiosqlite:///./x.db (Treiber im URL ersetzen)"""
+    scheme, rest = url.split("://", 1)
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    if driver is None:
+        raise ValueError(f"No async driver for database URL scheme: {scheme!r}")
+    return f"{driver}://{rest}"
+
+
+def create_async_db_engine(url: Optional[str] = None, profile: Optional[str] = None):
+    """Async Engine für AsyncSession; SQLite mit demselben PRAGMA-Profil"""
+    url = url or settings.DATABASE_URL
+    if not url.startswith("sqlite"):
+        return create_async_engine(async_database_url(url), **pool_options())
+
+    engine = create_async_engine(async_database_url(url))
+    _apply_sqlite_profile(engine.sync_engine, profile)
+    return engine
+
+
 # SQLAlchemy Engine erstellen
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
+async_engine = create_async_db_engine()
 
 # Rest bleibt gleich...
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: nach dem Commit keine Lazy-Loads (in async nicht erlaubt)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -38,8 +127,25 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency für async Routen: Queries blockieren den Event Loop nicht"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Beliebige feste Zahl: Advisory Lock für das Anlegen des Schemas (PostgreSQL)
+SCHEMA_LOCK_KEY = 4242001
+
 def init_db():
     """Datenbank-Tabellen erstellen"""
-    from app.models import user, ingredient, recipe, favorite, diet_profile
-    Base.metadata.create_all(bind=engine)
-    print("[OK] Database tables created!")
\ No newline at end of file
+    from app.models import user, ingredient, recipe, favorite, diet_profile, meal_log, recipe_db
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Mehrere Nodes starten gleichzeitig → Schema nur einer nach dem anderen anlegen
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        Base.metadata.create_all(bind=conn)
+    print("[OK] Database tables created!")
+
+    # Full-Text Search (FTS5) für die Recipe-DB
+    from app.services.recipe_fts import recipe_fts
+    if recipe_fts.ensure_schema(engine):
+        print("[OK] Recipe full-text index ready!")
\ No newline at end of file
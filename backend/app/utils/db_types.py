@@ -0,0 +1,57 @@
+"""
+Spaltentypen für SQLite und PostgreSQL
+
+- JSONDocument: JSON-Spalte (SQLite JSON-Text, PostgreSQL JSONB)
+- JSONText: die App liest/schreibt list/dict. SQLite speichert JSON-Text
+  (Spaltentyp TEXT wie bisher, ungültiger Altbestand → None statt Fehler),
+  PostgreSQL speichert JSONB und psycopg liefert es nativ - kein zusätzliches
+  dumps/loads pro Zeile; GIN-indexierbar und per @> abfragbar
+- jsonb_gin_index: GIN-Index (jsonb_path_ops), wird nur in PostgreSQL angelegt
+"""
+import json
+import logging
+
+from sqlalchemy import JSON, Index, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
+
+logger = logging.getLogger(__name__)
+
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class JSONText(TypeDecorator):
+    """list/dict in der App, JSON-Text in SQLite, JSONB in PostgreSQL"""
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "postgresql" or value is None:
+            return value
+        return json.dumps(value, ensure_ascii=False)
+
+    def process_result_value(self, value, dialect):
+        if dialect.name == "postgresql" or value is None:
+            return value
+        try:
+            return json.loads(value)
+        except ValueError:
+            # Altbestand ohne gültiges JSON: wie ein leeres Feld behandeln
+            logger.warning("Ignoring invalid JSON text in a JSONText column")
+            return None
+
+
+def jsonb_gin_index(name: str, column: str) -> Index:
+    """GIN-Index für @>-Abfragen auf eine JSONB-Spalte (SQLite: kein Index)"""
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "jsonb_path_ops"},
+    ).ddl_if(dialect="postgresql")
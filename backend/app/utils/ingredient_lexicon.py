@@ -0,0 +1,94 @@
+# Ingredient Lexicon - Longest-Match Lookup in Zutaten-Tabellen (Aho-Corasick)
+#
+# Genutzt von NutritionService (FALLBACK_NUTRITION, GI_VALUES) und der
+# Einkaufsliste (INGREDIENT_CATEGORIES). Statt jede Tabelle in Dict-Reihenfolge
+# mit "key in name" abzulaufen, wird sie einmal zu einem Automaten kompiliert:
+# - Laufzeit proportional zur Länge des Zutatennamens (nicht zur Tabellengröße)
+# - Ergebnis unabhängig von der Dict-Reihenfolge: der längste Treffer gewinnt
+#   ("Reis" → 'reis', nicht 'ei'), bei gleicher Länge der erste im Namen
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.utils.ingredient_names import normalize_ingredient_name
+
+
+class IngredientLexicon:
+    """Kompilierte Zutaten-Tabelle (Aho-Corasick Automat, Longest-Match)"""
+
+    def __init__(self, table: Dict[str, Any], exclude: Iterable[str] = ()):
+        excluded = set(exclude)
+
+        # Keys normalisieren (lowercase, Umlaute gefaltet) wie die Suchnamen
+        self.table: Dict[str, Any] = {}
+        for key, value in table.items():
+            if key in excluded:
+                continue
+            normalized = normalize_ingredient_name(key)
+            if normalized:
+                self.table[normalized] = value
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._longest: List[Optional[str]] = [None]  # Längster Key, der in diesem Zustand endet
+
+        for key in self.table:
+            self._insert(key)
+        self._build_failure_links()
+
+    def _insert(self, key: str):
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._longest.append(None)
+            state = next_state
+        self._longest[state] = key
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+
+                # Eigener Key ist immer der längste; sonst den des Fallback-Zustands erben
+                if self._longest[next_state] is None:
+                    self._longest[next_state] = self._longest[self._fail[next_state]]
+
+    def match(self, name: str) -> Optional[str]:
+        """Längster Tabellen-Key, der im Namen vorkommt (None wenn keiner)"""
+        text = normalize_ingredient_name(name)
+        goto = self._goto
+        fail = self._fail
+
+        best: Optional[str] = None
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            key = self._longest[state]
+            if key is not None and (best is None or len(key) > len(best)):
+                best = key
+
+        return best
+
+    def lookup(self, name: str, default: Any = None) -> Any:
+        """Wert zum längsten Treffer (oder default)"""
+        key = self.match(name)
+        return self.table[key] if key is not None else default
+
+    def __len__(self):
+        return len(self.table)
@@ -0,0 +1,21 @@
+# Normalisierung von Zutatennamen (gemeinsam genutzt von Index und Suche)
+
+import re
+
+# Umlaute/ß falten, damit "Hähnchen" und "Haehnchen" denselben Term ergeben
+_UMLAUT_MAP = str.maketrans({
+    "ä": "ae",
+    "ö": "oe",
+    "ü": "ue",
+    "ß": "ss",
+})
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_ingredient_name(name: str) -> str:
+    """Zutatenname → Suchterm (lowercase, Umlaute gefaltet, Whitespace normalisiert)"""
+    if not name:
+        return ""
+    normalized = name.lower().translate(_UMLAUT_MAP)
+    return _WHITESPACE.sub(" ", normalized).strip()
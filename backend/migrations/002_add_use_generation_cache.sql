@@ -0,0 +1,5 @@
+-- Migration: Add use_generation_cache column to users table
+-- Date: 2026-10-18
+-- Description: Per-user opt-out for the AI generation result cache (1 = use cached recipes)
+
+ALTER TABLE users ADD COLUMN use_generation_cache INTEGER NOT NULL DEFAULT 1;
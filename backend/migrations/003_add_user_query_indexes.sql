@@ -0,0 +1,32 @@
+-- Migration: Add composite indexes for the per-user queries
+-- Date: 2026-10-18
+-- Description: Every authenticated route filters by user_id and sorts by a timestamp;
+--              Stripe webhooks look users up by stripe_customer_id. Without these
+--              indexes each request scans the whole table (SQLite + PostgreSQL).
+
+-- GET /api/recipes/history: WHERE user_id = ? ORDER BY generated_at DESC
+CREATE INDEX IF NOT EXISTS ix_recipes_user_id_generated_at ON recipes (user_id, generated_at DESC);
+
+-- GET /api/ingredients: WHERE user_id = ? ORDER BY added_at DESC
+CREATE INDEX IF NOT EXISTS ix_ingredients_user_id_added_at ON ingredients (user_id, added_at DESC);
+
+-- GET /api/favorites: WHERE user_id = ? ORDER BY added_at DESC
+CREATE INDEX IF NOT EXISTS ix_favorites_user_id_added_at ON favorites (user_id, added_at DESC);
+
+-- DELETE /api/users/me: cascade per recipe (WHERE recipe_id = ?)
+CREATE INDEX IF NOT EXISTS ix_favorites_recipe_id ON favorites (recipe_id);
+
+-- Active diabetic profile: WHERE user_id = ? AND profile_type = ? AND is_active = 1
+CREATE INDEX IF NOT EXISTS ix_diet_profiles_user_id_type_active ON diet_profiles (user_id, profile_type, is_active);
+
+-- GET /api/meals/today + /history: WHERE user_id = ? AND consumed_at BETWEEN ? AND ?
+CREATE INDEX IF NOT EXISTS ix_meal_logs_user_id_consumed_at ON meal_logs (user_id, consumed_at);
+
+-- DELETE /api/users/me: meal logs of deleted recipes are detached (WHERE recipe_id = ?)
+CREATE INDEX IF NOT EXISTS ix_meal_logs_recipe_id ON meal_logs (recipe_id);
+
+-- Stripe webhooks: WHERE stripe_customer_id = ?
+CREATE INDEX IF NOT EXISTS ix_users_stripe_customer_id ON users (stripe_customer_id);
+
+-- Planner-Statistiken aktualisieren
+ANALYZE;
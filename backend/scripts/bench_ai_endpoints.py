@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+AI Endpoint Benchmark - echte /api/recipes/generate(/stream) gegen den Fake AI Server
+
+Startet den Fake Gemini/Ollama Server (Tokens/s, First-Token-Latenz und
+Fehlerquote einstellbar, geseedet → vergleichbare Läufe) und die echte App
+per uvicorn in Hintergrund-Threads, legt Bench-User mit Zutaten in einer
+eigenen SQLite-DB an und schickt pro Concurrency-Stufe N Anfragen
+(geschlossene Schleife: jeder Worker schickt die nächste, sobald seine fertig ist).
+
+Pro Endpoint und Stufe:
+- Latenz p50/p95/p99 (Stream: zusätzlich bis zum ersten Token / ersten Rezept)
+- Durchsatz (Anfragen/s, Rezepte/s)
+- Queue-Wartezeit aus dem x-queue-wait Header (Stream: aus `event: queued`)
+- Fehler nach Status (429 = Queue voll, 503 = Provider down, ...)
+
+Kapazität der echten Hardware (z.B. Ollama auf dem Pi): --ollama-url schickt
+die Ollama-Aufrufe der App an ein echtes Ollama statt an den Fake Server.
+
+Usage:
+    python scripts/bench_ai_endpoints.py --concurrency 1 4 8 --requests 16
+    python scripts/bench_ai_endpoints.py --tier pro --tokens-per-second 200 --json after.json --label after
+    python scripts/bench_ai_endpoints.py --ollama-fail-rate 0.1 --compare before.json
+    python scripts/bench_ai_endpoints.py --ollama-url http://localhost:11434 --concurrency 1 3 5 --timeout 300
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import json
+import math
+import secrets
+import subprocess
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BENCH_DB = "./database/bench_ai.db"
+ENDPOINTS = {
+    "generate": "/api/recipes/generate",
+    "stream": "/api/recipes/generate/stream",
+}
+INGREDIENTS = ["Tomate", "Zwiebel", "Knoblauch", "Nudeln", "Paprika"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark AI generation endpoints against the fake AI server")
+    parser.add_argument("--endpoints", nargs="+", choices=[*ENDPOINTS, "both"], default=["both"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrency-Stufen")
+    parser.add_argument("--requests", type=int, default=0, help="Anfragen pro Stufe (Default: 4 × Concurrency)")
+    parser.add_argument("--tier", default="free", help="Tier der Bench-User (free → Ollama, pro → Gemini)")
+    parser.add_argument("--cache", action="store_true", help="Generation-Cache/Coalescing der User aktiv lassen")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout pro Anfrage in Sekunden")
+    # Fake AI Server
+    parser.add_argument("--tokens-per-second", type=float, default=250.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--gemini-fail-rate", type=float, default=0.0)
+    parser.add_argument("--ollama-fail-rate", type=float, default=0.0)
+    parser.add_argument("--ollama-parallel", type=int, default=1, help="Gleichzeitige Decodes des Fake-Ollama")
+    parser.add_argument("--ollama-load-time", type=float, default=0.0, help="Kaltstart des Fake-Modells")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ollama-url", help="Echtes Ollama statt Fake (Fake-Optionen gelten dann nur für Gemini)")
+    # Ausgabe
+    parser.add_argument("--label", default="", help="Name des Laufs (z.B. Branch/Build)")
+    parser.add_argument("--json", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--compare", help="Frühere JSON-Ergebnisse zum Vergleich")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    """Nearest-Rank Perzentil (None bei leeren Daten)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize_ms(values):
+    return {
+        f"p{pct}_ms": round(percentile(values, pct) * 1000, 1) if values else None
+        for pct in (50, 95, 99)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def start_servers(args):
+    """Fake AI Server + echte App starten → App-Base-URL (Env vor dem App-Import setzen)"""
+    from scripts.fake_ai_server import configure, start_in_thread
+
+    configure(
+        first_token_delay=args.first_token_delay,
+        tokens_per_second=args.tokens_per_second,
+        gemini_fail_rate=args.gemini_fail_rate,
+        ollama_fail_rate=args.ollama_fail_rate,
+        ollama_parallel=args.ollama_parallel,
+        ollama_load_time=args.ollama_load_time,
+        ollama_loaded=args.ollama_load_time == 0,
+        seed=args.seed,
+    )
+    fake_url, _ = start_in_thread()
+    ollama_url = args.ollama_url or fake_url
+
+    os.chdir(BACKEND_DIR)  # DATABASE_URL ist relativ zum Backend
+    db_file = os.path.join(BACKEND_DIR, BENCH_DB)
+    if os.path.exists(db_file):
+        os.remove(db_file)
+
+    # Wie in Produktion: kein Request-Logger, E-Mail-Verifizierung aktiv
+    os.environ.update({
+        "DEBUG": "False",
+        "JWT_SECRET_KEY": secrets.token_urlsafe(32),
+        "DATABASE_URL": f"sqlite:///{BENCH_DB}",
+        "AI_SLOT_BACKEND": "local",
+        "SERVICE_WARMUP": "False",
+        "OLLAMA_ACTIVE_HOURS": "",  # keine Keep-Warm Pings in den Messwerten
+        "GOOGLE_AI_API_KEY": "fake-key",
+        "GEMINI_BASE_URL": f"{fake_url}/v1beta",
+        "OLLAMA_BASE_URL": ollama_url,
+    })
+    if not args.ollama_url:
+        os.environ["OLLAMA_NUM_PARALLEL"] = str(max(1, args.ollama_parallel))
+
+    from app.main import app
+    app_url, _ = start_in_thread(app=app)
+    return ollama_url, app_url
+
+
+def seed_users(count, tier, use_cache):
+    """Bench-User (verifiziert, Tier gesetzt) mit Zutaten → [(token, ingredient_ids)]"""
+    from app.models import user, ingredient, recipe, favorite, diet_profile, meal_log, recipe_db  # noqa: F401
+    from app.models.ingredient import Ingredient
+    from app.models.user import SubscriptionTier, User
+    from app.utils.database import SessionLocal
+    from app.utils.jwt import create_access_token
+
+    db = SessionLocal()
+    try:
+        users = []
+        for index in range(count):
+            bench_user = User(
+                email=f"bench{index}@example.com",
+                username=f"bench{index}",
+                hashed_password="-",
+                subscription_tier=SubscriptionTier(tier),
+                email_verified=True,
+                use_generation_cache=use_cache,
+            )
+            db.add(bench_user)
+            db.flush()
+            ingredients = [Ingredient(user_id=bench_user.id, name=name) for name in INGREDIENTS]
+            db.add_all(ingredients)
+            db.flush()
+            token = create_access_token({"user_id": bench_user.id, "email": bench_user.email})
+            users.append((token, [ing.id for ing in ingredients]))
+        db.commit()
+        return users
+    finally:
+        db.close()
+
+
+async def call_generate(client, url, token, body):
+    result = {"status": None, "recipes": 0}
+    response = await client.post(url, json=body, headers={"Authorization": f"Bearer {token}"})
+    result["status"] = response.status_code
+    result["queue_wait"] = float(response.headers.get("x-queue-wait", 0))
+    if response.status_code == 200:
+        result["recipes"] = response.json().get("count", 0)
+    return result
+
+
+async def call_stream(client, url, token, body, started):
+    result = {"status": None, "recipes": 0, "first_token": None, "first_recipe": None}
+    headers = {"Authorization": f"Bearer {token}"}
+    async with client.stream("POST", url, json=body, headers=headers) as response:
+        result["status"] = response.status_code
+        result["queue_wait"] = float(response.headers.get("x-queue-wait", 0))
+        if response.status_code != 200:
+            await response.aread()
+            return result
+
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+                continue
+            if not line.startswith("data:"):
+                continue
+            if event == "recipe":
+                result["recipes"] += 1
+                if result["first_recipe"] is None:
+                    result["first_recipe"] = time.perf_counter() - started
+            elif event == "queued":
+                result["queue_wait"] = json.loads(line[len("data:"):])["waited_seconds"]
+            elif event == "rate_limit_exceeded":
+                result["status"] = 429
+            elif event is None:
+                data = json.loads(line[len("data:"):])
+                if "token" in data and result["first_token"] is None:
+                    result["first_token"] = time.perf_counter() - started
+                if "error" in data:
+                    result["status"] = "stream_error"
+            event = None
+    return result
+
+
+async def run_level(app_url, endpoint, concurrency, total, users, args):
+    """`concurrency` Worker schicken zusammen `total` Anfragen"""
+    import httpx
+
+    url = app_url + ENDPOINTS[endpoint]
+    pending = iter(range(total))
+    samples = []
+
+    async def worker(client, worker_index):
+        token, ingredient_ids = users[worker_index % len(users)]
+        for request_index in pending:
+            body = {
+                "ingredient_ids": ingredient_ids[: 2 + request_index % 3],
+                "ai_provider": "ai",
+                "servings": 2,
+                "language": "de",
+            }
+            started = time.perf_counter()
+            try:
+                if endpoint == "stream":
+                    result = await call_stream(client, url, token, body, started)
+                else:
+                    result = await call_generate(client, url, token, body)
+            except httpx.HTTPError as e:
+                result = {"status": type(e).__name__, "recipes": 0, "queue_wait": 0.0}
+            result["latency"] = time.perf_counter() - started
+            samples.append(result)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, index) for index in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    ok = [sample for sample in samples if sample["status"] == 200]
+    errors = {}
+    for sample in samples:
+        if sample["status"] != 200:
+            errors[str(sample["status"])] = errors.get(str(sample["status"]), 0) + 1
+
+    result = {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(ok),
+        "errors": errors,
+        "wall_seconds": round(wall, 2),
+        "throughput_rps": round(len(ok) / wall, 2),
+        "recipes_per_second": round(sum(sample["recipes"] for sample in ok) / wall, 2),
+        "latency": summarize_ms([sample["latency"] for sample in ok]),
+        "queue_wait": summarize_ms([sample["queue_wait"] for sample in samples if sample.get("queue_wait") is not None]),
+    }
+    if endpoint == "stream":
+        result["first_token"] = summarize_ms([s["first_token"] for s in ok if s["first_token"] is not None])
+        result["first_recipe"] = summarize_ms([s["first_recipe"] for s in ok if s["first_recipe"] is not None])
+    return result
+
+
+def fmt(value):
+    return f"{value:>8.0f}" if value is not None else f"{'-':>8}"
+
+
+def print_level(endpoint, level):
+    latency, wait = level["latency"], level["queue_wait"]
+    errors = ", ".join(f"{status}×{count}" for status, count in level["errors"].items()) or "-"
+    print(
+        f"{endpoint:<9} {level['concurrency']:>4} {level['ok']:>3}/{level['requests']:<3}"
+        f"{fmt(latency['p50_ms'])}{fmt(latency['p95_ms'])}{fmt(latency['p99_ms'])}"
+        f"{fmt(wait['p95_ms'])}{level['throughput_rps']:>8.2f}{level['recipes_per_second']:>8.2f}  {errors}"
+    )
+    if endpoint == "stream":
+        print(
+            f"{'':<9} {'':>4} {'':>7} first token p50 {fmt(level['first_token']['p50_ms'])} ms, "
+            f"first recipe p50 {fmt(level['first_recipe']['p50_ms'])} ms"
+        )
+
+
+def compare(results, previous):
+    """p95-Latenz und Durchsatz gegen einen früheren Lauf"""
+    print(f"\nCompared to {previous.get('label') or previous.get('commit') or 'previous run'}:")
+    for endpoint, levels in results["endpoints"].items():
+        old_levels = {level["concurrency"]: level for level in previous.get("endpoints", {}).get(endpoint, [])}
+        for level in levels:
+            old = old_levels.get(level["concurrency"])
+            if old is None:
+                continue
+            new_p95, old_p95 = level["latency"]["p95_ms"], old["latency"]["p95_ms"]
+            latency = (
+                f"p95 {old_p95:.0f} → {new_p95:.0f} ms ({(new_p95 - old_p95) / old_p95 * 100:+.0f}%)"
+                if new_p95 and old_p95 else "p95 -"
+            )
+            rps = f"{old['throughput_rps']:.2f} → {level['throughput_rps']:.2f} req/s"
+            print(f"  {endpoint:<9} c={level['concurrency']:<3} {latency}, {rps}")
+
+
+def main():
+    args = parse_args()
+    endpoints = list(ENDPOINTS) if "both" in args.endpoints else args.endpoints
+
+    ollama_url, app_url = start_servers(args)
+    users = seed_users(max(args.concurrency), args.tier, args.cache)
+
+    results = {
+        "label": args.label,
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "config": {key: value for key, value in vars(args).items() if key not in ("json", "compare", "label")},
+        "endpoints": {},
+    }
+
+    print(f"\n🏁 AI Endpoint Benchmark (app: {app_url}, ollama: {ollama_url}, tier: {args.tier})")
+    print("=" * 92)
+    print(f"{'Endpoint':<9} {'Conc':>4} {'OK':>7}{'p50':>8}{'p95':>8}{'p99':>8}{'wait95':>8}{'req/s':>8}{'rec/s':>8}  Errors")
+    print("-" * 92)
+
+    for endpoint in endpoints:
+        results["endpoints"][endpoint] = []
+        for concurrency in args.concurrency:
+            total = args.requests or 4 * concurrency
+            level = asyncio.run(run_level(app_url, endpoint, concurrency, total, users, args))
+            results["endpoints"][endpoint].append(level)
+            print_level(endpoint, level)
+
+    # Zustand der AI-Schicht nach dem Lauf (Breaker, Fan-out, Token-Budget, ...)
+    import httpx
+    results["ai_health"] = httpx.get(f"{app_url}/health/ai", timeout=10).json()
+    print("=" * 92)
+    print("Latencies in ms (successful requests), wait95 = p95 of the queue wait (x-queue-wait / event: queued)")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
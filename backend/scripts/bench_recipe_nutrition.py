@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark: calculate_recipe_nutrition
+
+Zählt die get_nutrition_sync()-Aufrufe pro Rezept und misst die Laufzeit -
+für die aktuelle Implementierung und für den Stand vor dem Single-Pass Umbau.
+Der alte Stand wird aus git geladen (`--legacy-ref`, nutrition_service.py) und
+läuft gegen dieselben (gezählten) Lookups wie der aktuelle.
+
+Usage:
+    python scripts/bench_recipe_nutrition.py              # offline (kein OpenFoodFacts)
+    python scripts/bench_recipe_nutrition.py --online     # inkl. echter API-Lookups
+    python scripts/bench_recipe_nutrition.py --rounds 500
+    python scripts/bench_recipe_nutrition.py --legacy-ref <commit>
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import subprocess
+import time
+import types
+
+from app.services.nutrition_service import nutrition_service
+from app.services.mock_recipe_generator import MockRecipeGenerator
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# Letzter Commit vor dem Single-Pass Umbau von calculate_recipe_nutrition
+LEGACY_REF = "7b3b9ac^"
+SERVICE_PATH = "backend/app/services/nutrition_service.py"
+
+
+def load_legacy_service(ref: str):
+    """NutritionService im Stand von `ref` (aus git) instanziieren"""
+    try:
+        source = subprocess.run(
+            ["git", "show", f"{ref}:{SERVICE_PATH}"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        sys.exit(f"❌ Legacy-Stand {ref} nicht ladbar (git checkout nötig): {e}")
+
+    module = types.ModuleType("legacy_nutrition_service")
+    exec(compile(source, f"{ref}:{SERVICE_PATH}", "exec"), module.__dict__)
+    return module.nutrition_service
+
+
+def sample_recipes():
+    """Alle Mock-Templates (EN + DE) als Test-Rezepte"""
+    recipes = []
+    for templates in (MockRecipeGenerator.TEMPLATES_EN, MockRecipeGenerator.TEMPLATES_DE):
+        for template in templates.values():
+            recipes.append([
+                {**ing, "name": ing["name"].replace("{ingredient1}", "Tomate")}
+                for ing in template["ingredients"]
+            ])
+    return recipes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recipe nutrition calculation")
+    parser.add_argument("--rounds", type=int, default=200, help="Durchläufe pro Rezept (default: 200)")
+    parser.add_argument("--online", action="store_true", help="OpenFoodFacts für unbekannte Zutaten abfragen")
+    parser.add_argument("--legacy-ref", default=LEGACY_REF, help=f"Vergleichsstand (default: {LEGACY_REF})")
+    args = parser.parse_args()
+
+    if not args.online:
+        # Unbekannte Zutaten → Default-Werte statt Netzwerk
+        nutrition_service._fetch_product_sync = lambda cache_key: None
+
+    # get_nutrition_sync zählen - beide Stände nutzen denselben (aktuellen) Lookup
+    calls = {"count": 0}
+    original = nutrition_service.get_nutrition_sync
+
+    def counting_lookup(ingredient_name):
+        calls["count"] += 1
+        return original(ingredient_name)
+
+    legacy_service = load_legacy_service(args.legacy_ref)
+    legacy_service.get_nutrition_sync = counting_lookup
+    nutrition_service.get_nutrition_sync = counting_lookup
+
+    recipes = sample_recipes()
+    print(f"\n🚀 Recipe Nutrition Benchmark ({len(recipes)} recipes, {args.rounds} rounds, "
+          f"before = {args.legacy_ref})")
+    print("=" * 60)
+
+    def measure(service):
+        """→ (Lookups pro Rezept, ms pro Rezept)"""
+        lookups, durations_ms = [], []
+        for ingredients in recipes:
+            calls["count"] = 0
+            service.calculate_recipe_nutrition(ingredients, servings=2)
+            lookups.append(calls["count"])
+
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                service.calculate_recipe_nutrition(ingredients, servings=2)
+            durations_ms.append((time.perf_counter() - start) * 1000 / args.rounds)
+        return lookups, durations_ms
+
+    legacy_calls, legacy_ms = measure(legacy_service)
+    per_recipe_calls, durations_ms = measure(nutrition_service)
+
+    print(f"Lookups per recipe (before): {statistics.mean(legacy_calls):.1f}")
+    print(f"Lookups per recipe (now):    {statistics.mean(per_recipe_calls):.1f}")
+    print(f"Reduction:                   {1 - sum(per_recipe_calls) / sum(legacy_calls):.0%}")
+    print(f"Time per recipe (before):    {statistics.mean(legacy_ms):.3f} ms (median {statistics.median(legacy_ms):.3f} ms)")
+    print(f"Time per recipe (now):       {statistics.mean(durations_ms):.3f} ms (median {statistics.median(durations_ms):.3f} ms)")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+SQLite Profile Benchmark - Lese/Schreib-Durchsatz pro SQLITE_PROFILE
+
+Pro Profil (default = SQLite-Defaults, tuned = WAL + synchronous=NORMAL + ...)
+wird eine frische Datenbank mit den App-Models angelegt und befüllt. Danach
+laufen für `--duration` Sekunden gleichzeitig:
+- Leser: Rezept-Historie eines Users (wie GET /api/recipes/history) + User-Lookup
+- Schreiber: generiertes Rezept speichern + Tageszähler erhöhen (wie /generate)
+
+Ausgegeben werden Lese-/Schreib-Operationen pro Sekunde, p95-Latenz und
+Lock-Fehler ("database is locked"). Die Datenbanken liegen neben der echten
+DB (./database), damit dasselbe Dateisystem gemessen wird (SD-Karte auf dem Pi).
+
+Usage:
+    python scripts/bench_sqlite_profile.py
+    python scripts/bench_sqlite_profile.py --readers 8 --writers 2 --duration 10 --json sqlite.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DEBUG", "True")
+
+import argparse
+import json
+import math
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROFILES = ["default", "tuned"]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def prepare(profile: str, users: int, recipes_per_user: int):
+    """Frische DB für das Profil anlegen und befüllen → (engine, Session, Pfad)"""
+    from app.models import user, ingredient, recipe, favorite, diet_profile, meal_log, recipe_db  # noqa: F401
+    from app.models.recipe import Recipe
+    from app.models.user import User
+    from app.utils.database import Base, create_db_engine
+
+    path = f"./database/bench_sqlite_{profile}.db"
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    engine = create_db_engine(f"sqlite:///{path}", profile=profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    for index in range(users):
+        bench_user = User(email=f"bench{index}@example.com", username=f"bench{index}", hashed_password="-")
+        db.add(bench_user)
+        db.flush()
+        db.add_all(
+            Recipe(user_id=bench_user.id, name=f"Rezept {n}", ai_provider="ollama",
+                   ingredients_json=[{"name": "Tomate", "amount": "200 g"}])
+            for n in range(recipes_per_user)
+        )
+    db.commit()
+    db.close()
+    return engine, Session, path
+
+
+def run_profile(profile: str, args):
+    from app.models.recipe import Recipe
+    from app.models.user import User
+
+    engine, Session, path = prepare(profile, args.users, args.recipes_per_user)
+    with engine.connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"read": [], "write": [], "read_errors": 0, "write_errors": 0}
+
+    def reader(worker_index):
+        db = Session()
+        user_id = worker_index % args.users + 1
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                db.query(User).filter(User.id == user_id).first()
+                db.query(Recipe).filter(Recipe.user_id == user_id).order_by(Recipe.generated_at.desc()).limit(20).all()
+                db.commit()  # Read-Transaktion beenden (wie am Ende eines Requests)
+                elapsed, key = time.perf_counter() - started, "read"
+            except OperationalError:
+                db.rollback()
+                elapsed, key = None, "read_errors"
+            with lock:
+                if elapsed is None:
+                    stats[key] += 1
+                else:
+                    stats[key].append(elapsed)
+        db.close()
+
+    def writer(worker_index):
+        db = Session()
+        user_id = worker_index % args.users + 1
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                db.add(Recipe(user_id=user_id, name="Neues Rezept", ai_provider="ollama",
+                              ingredients_json=[{"name": "Zwiebel", "amount": "1"}]))
+                user = db.query(User).filter(User.id == user_id).first()
+                user.daily_recipe_count = (user.daily_recipe_count or 0) + 1
+                db.commit()
+                elapsed, key = time.perf_counter() - started, "write"
+            except OperationalError:
+                db.rollback()
+                elapsed, key = None, "write_errors"
+            with lock:
+                if elapsed is None:
+                    stats[key] += 1
+                else:
+                    stats[key].append(elapsed)
+        db.close()
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    engine.dispose()
+
+    if not args.keep:
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    def ms(values, pct):
+        value = percentile(values, pct)
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "journal_mode": journal_mode,
+        "reads_per_second": round(len(stats["read"]) / wall, 1),
+        "writes_per_second": round(len(stats["write"]) / wall, 1),
+        "read_p95_ms": ms(stats["read"], 95),
+        "write_p95_ms": ms(stats["write"], 95),
+        "read_errors": stats["read_errors"],
+        "write_errors": stats["write_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite profiles under concurrent reads and writes")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=PROFILES)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=5.0, help="Sekunden pro Profil")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--recipes-per-user", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="Bench-Datenbanken nicht löschen")
+    parser.add_argument("--json", help="Ergebnisse als JSON speichern")
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)  # ./database wie in DATABASE_URL
+    results = {}
+
+    print(f"\n🗄️  SQLite Profile Benchmark ({args.readers} readers, {args.writers} writers, {args.duration:.0f}s each)")
+    print("=" * 84)
+    print(f"{'Profile':<9} {'Journal':<8} {'reads/s':>9} {'writes/s':>9} {'read p95':>10} {'write p95':>10}  Lock errors")
+    print("-" * 84)
+    for profile in args.profiles:
+        result = results[profile] = run_profile(profile, args)
+        print(
+            f"{profile:<9} {result['journal_mode']:<8} {result['reads_per_second']:>9.1f} "
+            f"{result['writes_per_second']:>9.1f} {result['read_p95_ms']:>8.2f}ms {result['write_p95_ms']:>8.2f}ms"
+            f"  {result['read_errors'] + result['write_errors']}"
+        )
+    print("=" * 84)
+
+    if "default" in results and "tuned" in results:
+        before, after = results["default"], results["tuned"]
+        for key in ("reads_per_second", "writes_per_second"):
+            if before[key]:
+                print(f"{key}: ×{after[key] / before[key]:.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "profiles": results}, f, indent=2)
+        print(f"Saved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
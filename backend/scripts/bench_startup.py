@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Import-Zeit pro Modul
+
+Jedes Modul wird in einem frischen Interpreter mit `python -X importtime`
+importiert (kalter Start wie nach einem Container-Restart). Ausgegeben werden:
+- kumulative Import-Zeit pro App-Modul (inkl. allem, was es nachzieht)
+- die teuersten Einzel-Importe (self time) beim Import von app.main
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --modules app.routes.recipes app.main --json startup.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import pkgutil
+import subprocess
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def default_modules():
+    """app.main + alle Routen, Services und Middlewares"""
+    modules = []
+    for package in ("app.middleware", "app.services", "app.routes"):
+        path = os.path.join(BACKEND_DIR, *package.split("."))
+        modules += [f"{package}.{info.name}" for info in pkgutil.iter_modules([path])]
+    return modules + ["app.main"]
+
+
+def measure(module: str):
+    """Import in frischem Prozess → (kumulative µs, {modul: self µs}, Fehler)"""
+    env = {**os.environ, "DEBUG": os.environ.get("DEBUG", "True")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+
+    self_times = {}
+    cumulative = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.rstrip()
+        self_times[name.strip()] = int(self_us)
+        if name.strip() == module and not name.startswith("  "):
+            cumulative = int(cumulative_us)
+
+    error = None
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+    return cumulative, self_times, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time per module")
+    parser.add_argument("--modules", nargs="*", help="Module (Default: app.main + routes/services/middleware)")
+    parser.add_argument("--top", type=int, default=15, help="Teuerste Einzel-Importe von app.main")
+    parser.add_argument("--json", help="Ergebnisse als JSON speichern")
+    args = parser.parse_args()
+
+    modules = args.modules or default_modules()
+    results = {}
+
+    print("\n🚀 Startup Benchmark (cold import per module)")
+    print("=" * 70)
+    print(f"{'Module':<45} {'Import ms':>10}  Status")
+    print("-" * 70)
+
+    main_self_times = {}
+    for module in modules:
+        cumulative, self_times, error = measure(module)
+        results[module] = {
+            "import_ms": round(cumulative / 1000, 1) if cumulative is not None else None,
+            "error": error,
+        }
+        if module == "app.main":
+            main_self_times = self_times
+        shown = f"{cumulative / 1000:>10.1f}" if cumulative is not None else f"{'-':>10}"
+        print(f"{module:<45} {shown}  {'❌ ' + error if error else '✅'}")
+
+    if main_self_times:
+        heaviest = sorted(main_self_times.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print("\nHeaviest single imports while importing app.main (self time):")
+        for name, self_us in heaviest:
+            print(f"  {name:<50} {self_us / 1000:>8.1f} ms")
+        results["_heaviest_imports_ms"] = {name: round(us / 1000, 1) for name, us in heaviest}
+
+    print("=" * 70)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
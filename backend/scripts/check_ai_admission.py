@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Check: AI-Admission nur um echte Provider-Aufrufe (Fake AI Server)
+
+Ollama-Pool mit 1 Slot + 1 Queue-Platz, beides von außen belegt:
+- Mock-Generierung (Template) → 200, berührt den Pool nicht
+- Cache-Treffer → 200 ohne Pool und ohne LLM-Lauf
+- echter Miss → 429 mit eta_seconds + Retry-After, Stream → Event
+  rate_limit_exceeded
+- Stream, der auf den Slot wartet → `event: queued` mit Position + ETA,
+  danach die Rezepte
+Danach Pool frei:
+- N identische Anfragen gleichzeitig → ein LLM-Lauf, ein Slot, keine 429
+  (Follower hängen sich vor der Admission an) - für /generate und den Stream
+- Cache-Schlüssel enthält den Provider: PRO (Gemini) und FREE (Ollama)
+  bekommen nie das Ergebnis des anderen, auch nicht nach einem Fallback
+- Route-Deklaration wählt den Pool: eine Route mit pool="gemini" zieht
+  auch für Ollama-Aufrufe Slots aus dem Gemini-Pool
+- /health/ai zeigt nur Slot-Zahlen, /health/ai/details nur für Admins
+
+Usage:
+    python scripts/check_ai_admission.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import json
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CHECK_DB = "./database/check_ai_admission.db"
+IDENTICAL_REQUESTS = 4
+
+os.chdir(BACKEND_DIR)
+for suffix in ("", "-wal", "-shm"):
+    if os.path.exists(CHECK_DB + suffix):
+        os.remove(CHECK_DB + suffix)
+
+from scripts.fake_ai_server import FAKE_STATE, start_in_thread
+
+# Fake Server muss laufen, bevor der Generator (Singleton) importiert wird
+BASE_URL, _server = start_in_thread()
+os.environ.update({
+    "DEBUG": "True",
+    "DATABASE_URL": f"sqlite:///{CHECK_DB}",
+    "SERVICE_WARMUP": "False",
+    "AI_SLOT_BACKEND": "local",
+    "OLLAMA_MAX_CONCURRENT": "1",
+    "OLLAMA_QUEUE_SIZE": "1",
+    "GEMINI_MAX_CONCURRENT": "1",
+    "GEMINI_QUEUE_SIZE": "1",
+    "OLLAMA_BASE_URL": BASE_URL,
+    "GOOGLE_AI_API_KEY": "fake-key",
+    "GEMINI_BASE_URL": f"{BASE_URL}/v1beta",
+    "AI_FANOUT_MODE": "serial",
+})
+
+import httpx
+
+from app.main import app
+from app.middleware.admission import ai_admission
+from app.middleware.rate_limit import admission_controller
+from app.services.ai_recipe_generator import ai_generator
+from app.models.ingredient import Ingredient
+from app.models.user import SubscriptionTier, User
+from app.services.generation_cache import generation_cache
+from app.utils.database import SessionLocal, async_engine, engine, init_db
+from app.utils.jwt import create_access_token
+
+
+@app.post("/admission-check/gemini-pool")
+@ai_admission(pool="gemini")
+async def gemini_pool_route():
+    """Ollama-Aufrufe dieser Route ziehen Slots aus dem Gemini-Pool"""
+    recipes = await ai_generator.generate_recipes(["Tomate"], count=3, servings=2, user_tier="free")
+    return {"recipes": len(recipes)}
+
+
+def seed_user(db, tier: SubscriptionTier):
+    """User mit einer Zutat → (Auth-Header, Zutat-ID)"""
+    name = tier.value.lower()
+    user = User(email=f"admission-{name}@example.com", username=f"admission-{name}", hashed_password="-",
+                subscription_tier=tier, email_verified=True)
+    db.add(user)
+    db.flush()
+    ingredient = Ingredient(user_id=user.id, name="Tomate")
+    db.add(ingredient)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'user_id': user.id})}"}, ingredient.id
+
+
+def seed():
+    init_db()
+    db = SessionLocal()
+    result = (seed_user(db, SubscriptionTier.FREE), seed_user(db, SubscriptionTier.PRO))
+    db.close()
+    return result
+
+
+async def main():
+    (headers, ingredient_id), (pro_headers, pro_ingredient_id) = seed()
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    def body(provider="ai", servings=2):
+        return {"ingredient_ids": [ingredient_id], "ai_provider": provider, "servings": servings}
+
+    print(f"\n🎫 AI Admission Check (fake server: {BASE_URL})")
+    print("=" * 60)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        # Cache füllen (Pool frei)
+        response = await client.post("/api/recipes/generate", json=body(), headers=headers)
+        check("AI generation with a free pool", response.status_code == 200, f"({response.status_code})")
+
+        # Pool voll: ein laufender Slot + ein Wartender (andere User)
+        limiter = await admission_controller.limiter("ollama")
+        await limiter.acquire("holder", user_id="other-1")
+        filler = asyncio.ensure_future(limiter.acquire("filler", user_id="other-2"))
+        await asyncio.sleep(0.05)
+        llm_runs = FAKE_STATE["requests"]["ollama"]
+
+        response = await client.post("/api/recipes/generate", json=body("mock"), headers=headers)
+        check("Mock generation ignores the full pool", response.status_code == 200, f"({response.status_code})")
+
+        response = await client.post("/api/recipes/generate", json=body(), headers=headers)
+        check("Cache hit ignores the full pool",
+              response.status_code == 200 and FAKE_STATE["requests"]["ollama"] == llm_runs,
+              f"({response.status_code}, {FAKE_STATE['requests']['ollama'] - llm_runs} LLM runs)")
+
+        response = await client.post("/api/recipes/generate", json=body(servings=4), headers=headers)
+        detail = response.json().get("detail", {}) if response.status_code == 429 else {}
+        check("Cache miss with a full queue → 429 with ETA",
+              "eta_seconds" in detail and "retry-after" in response.headers,
+              f"({response.status_code}, eta {detail.get('eta_seconds')}s, "
+              f"Retry-After {response.headers.get('retry-after')})")
+
+        response = await client.post("/api/recipes/generate/stream", json=body(servings=4), headers=headers)
+        check("Stream with a full queue → rate_limit_exceeded event",
+              "event: rate_limit_exceeded" in response.text, f"({response.status_code})")
+        check("Rejected requests left the queue", len(limiter.waiting) == 1, f"({len(limiter.waiting)} queued)")
+
+        await limiter.release("holder")
+        await filler
+
+        # Slot belegt, Queue frei: der Stream wartet und meldet sich mit event: queued
+        stream = asyncio.ensure_future(
+            client.post("/api/recipes/generate/stream", json=body(servings=6), headers=headers)
+        )
+        await asyncio.sleep(0.5)
+        await limiter.release("filler")
+        response = await stream
+        queued = [json.loads(block.split("data: ", 1)[1]) for block in response.text.split("\n\n")
+                  if block.startswith("event: queued")]
+        check("Waiting stream reports position + ETA, then its recipes",
+              bool(queued) and queued[0]["position"] == 1 and "eta_seconds" in queued[0]
+              and queued[-1]["position"] == 0 and "event: recipe\n" in response.text,
+              f"(queued events {[event['position'] for event in queued]}, "
+              f"waited {queued[-1]['waited_seconds'] if queued else '-'}s)")
+
+        # Identische Anfragen gleichzeitig: ein Lauf, Follower ohne Slot
+        generation_cache.clear()
+        FAKE_STATE["first_token_delay"] = 0.3
+        llm_runs = FAKE_STATE["requests"]["ollama"]
+        responses = await asyncio.gather(*(
+            client.post("/api/recipes/generate", json=body(servings=3), headers=headers)
+            for _ in range(IDENTICAL_REQUESTS)
+        ))
+        codes = [response.status_code for response in responses]
+        check(f"{IDENTICAL_REQUESTS} identical requests on 1 slot + 1 queue place → one LLM run",
+              codes == [200] * IDENTICAL_REQUESTS and FAKE_STATE["requests"]["ollama"] - llm_runs == 1,
+              f"({codes}, {FAKE_STATE['requests']['ollama'] - llm_runs} LLM runs)")
+        llm_runs = FAKE_STATE["requests"]["ollama"]
+        streams = await asyncio.gather(*(
+            client.post("/api/recipes/generate/stream", json=body(servings=5), headers=headers)
+            for _ in range(IDENTICAL_REQUESTS)
+        ))
+        saved = [response.text.count("event: recipe\n") for response in streams]
+        check(f"{IDENTICAL_REQUESTS} identical streams → one LLM run, every client gets the recipes",
+              saved == [3] * IDENTICAL_REQUESTS and FAKE_STATE["requests"]["ollama"] - llm_runs == 1,
+              f"(recipes per client {saved}, {FAKE_STATE['requests']['ollama'] - llm_runs} LLM runs)")
+        check("Pool idle afterwards", limiter.current_requests == 0 and not limiter.waiting)
+
+        # Gleiche Zutaten, anderer Provider → eigener Cache-Eintrag
+        runs = dict(FAKE_STATE["requests"])
+        pro_body = {**body(servings=3), "ingredient_ids": [pro_ingredient_id]}
+        response = await client.post("/api/recipes/generate", json=pro_body, headers=pro_headers)
+        providers = {recipe["ai_provider"] for recipe in response.json().get("recipes", [])}
+        check("PRO request is not served the FREE (Ollama) cache entry",
+              providers == {"gemini"} and FAKE_STATE["requests"]["gemini"] - runs["gemini"] == 1,
+              f"({response.status_code}, providers {sorted(providers)})")
+        response = await client.post("/api/recipes/generate", json=body(servings=3), headers=headers)
+        providers = {recipe["ai_provider"] for recipe in response.json().get("recipes", [])}
+        check("FREE request still hits its own Ollama entry",
+              providers == {"ollama"} and FAKE_STATE["requests"]["ollama"] == runs["ollama"],
+              f"({response.status_code}, providers {sorted(providers)})")
+
+        # Gemini fällt aus → PRO bekommt Ollama, aber nicht unter dem Gemini-Schlüssel gespeichert
+        fallback_body = {**body(servings=4), "ingredient_ids": [pro_ingredient_id]}
+        FAKE_STATE["gemini_fail"] = True
+        fallback = await client.post("/api/recipes/generate", json=fallback_body, headers=pro_headers)
+        FAKE_STATE["gemini_fail"] = False
+        runs = dict(FAKE_STATE["requests"])
+        response = await client.post("/api/recipes/generate", json=fallback_body, headers=pro_headers)
+        fallback_providers = {recipe["ai_provider"] for recipe in fallback.json().get("recipes", [])}
+        providers = {recipe["ai_provider"] for recipe in response.json().get("recipes", [])}
+        check("Ollama fallback of a PRO request is not cached under the Gemini key",
+              fallback_providers == {"ollama"} and providers == {"gemini"}
+              and FAKE_STATE["requests"]["gemini"] - runs["gemini"] == 1,
+              f"(fallback {sorted(fallback_providers)}, next PRO request {sorted(providers)})")
+
+        # Route-Pool entscheidet: Gemini-Pool voll → die Route mit pool="gemini" wartet/429,
+        # /api/recipes/generate (pool="ollama") läuft normal
+        gemini = await admission_controller.limiter("gemini")
+        await gemini.acquire("gemini-holder", user_id="other-1")
+        filler = asyncio.ensure_future(gemini.acquire("gemini-filler", user_id="other-2"))
+        await asyncio.sleep(0.05)
+        routed = await client.post("/admission-check/gemini-pool", headers=headers)
+        generation_cache.clear()
+        regular = await client.post("/api/recipes/generate", json=body(servings=2), headers=headers)
+        check("Route pool declaration picks the slot pool",
+              routed.status_code == 429 and routed.json()["detail"].get("pool") == "gemini"
+              and regular.status_code == 200,
+              f"(pool=\"gemini\" route {routed.status_code}, pool=\"ollama\" route {regular.status_code})")
+        await gemini.release("gemini-holder")
+        await filler
+        await gemini.release("gemini-filler")
+
+        # Status-Endpoints
+        public = (await client.get("/health/ai")).json()
+        anonymous = await client.get("/health/ai/details")
+        free_user = await client.get("/health/ai/details", headers=headers)
+        check("/health/ai shows slot counts only, details need an admin",
+              set(public) == {"pools"} and set(public["pools"]["ollama"]) ==
+              {"max_concurrent", "in_use", "queued", "max_queue"}
+              and anonymous.status_code == 401 and free_user.status_code == 403,
+              f"(details: anonymous {anonymous.status_code}, FREE user {free_user.status_code})")
+
+    await async_engine.dispose()
+    engine.dispose()
+    _server.should_exit = True
+    print("=" * 60)
+    print(f"{sum(results)}/{len(results)} checks passed")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(CHECK_DB + suffix):
+            os.remove(CHECK_DB + suffix)
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Multi-Process Check: AI-Slots über mehrere Worker-Prozesse
+
+Simuliert uvicorn --workers N: jeder Prozess hat einen eigenen
+OllamaRateLimiter, alle teilen sich eine SQLiteSlotBackend-Datei.
+Geprüft wird:
+- nie mehr als --slots Generierungen gleichzeitig (über alle Prozesse)
+- alle Anfragen werden bedient (Queue statt 429)
+- ein abgestürzter Worker blockiert seine Slots nicht dauerhaft
+- hält ein anderer Prozess den Schreib-Lock der Slot-DB, wartet acquire()
+  im Thread - der Event Loop läuft weiter
+
+Usage:
+    python scripts/check_ai_slots_multiprocess.py
+    python scripts/check_ai_slots_multiprocess.py --workers 4 --requests 6 --slots 2
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import multiprocessing
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+def _worker(db_path, slots, requests_per_worker, hold_seconds, running, peak, served, lock):
+    """Ein 'uvicorn-Worker': parallele Anfragen gegen den geteilten Limiter"""
+    from app.middleware.rate_limit import OllamaRateLimiter
+    from app.middleware.slot_backends import SQLiteSlotBackend
+
+    limiter = OllamaRateLimiter(
+        max_queue=requests_per_worker,
+        max_queued_per_user=requests_per_worker,
+        backend=SQLiteSlotBackend(db_path, slots),
+    )
+
+    async def generate(index):
+        request_id = f"{os.getpid()}-{index}"
+        if not await limiter.acquire(request_id, user_id=index):
+            return
+        try:
+            with lock:
+                running.value += 1
+                peak.value = max(peak.value, running.value)
+            await asyncio.sleep(hold_seconds)
+            with lock:
+                running.value -= 1
+                served.value += 1
+        finally:
+            await limiter.release(request_id)
+
+    async def main():
+        await asyncio.gather(*(generate(i) for i in range(requests_per_worker)))
+
+    asyncio.run(main())
+
+
+def _crashing_worker(db_path, slots):
+    """Belegt einen Slot und stirbt ohne release()"""
+    from app.middleware.slot_backends import SQLiteSlotBackend
+
+    backend = SQLiteSlotBackend(db_path, slots)
+    backend.try_acquire("crashed-holder")
+    os._exit(1)
+
+
+async def _loop_lag_while_locked(db_path, slots, lock_seconds=1.0):
+    """Slot-DB von außen sperren, währenddessen acquire() → größte Event-Loop-Lücke"""
+    from app.middleware.rate_limit import OllamaRateLimiter
+    from app.middleware.slot_backends import SQLiteSlotBackend
+
+    limiter = OllamaRateLimiter(backend=SQLiteSlotBackend(db_path, slots))
+    blocker = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    threading.Timer(lock_seconds, lambda: blocker.execute("ROLLBACK")).start()
+
+    max_gap, ticking = 0.0, True
+
+    async def ticker():
+        nonlocal max_gap
+        last = time.perf_counter()
+        while ticking:
+            await asyncio.sleep(0.02)
+            now = time.perf_counter()
+            max_gap = max(max_gap, now - last)
+            last = now
+
+    tick = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.1)  # Ticker läuft, bevor acquire() startet
+    granted = await limiter.acquire("lag-check")
+    if granted:
+        await limiter.release("lag-check")
+    ticking = False
+    await tick
+    blocker.close()
+    return granted, max_gap
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cross-process AI slot limiting")
+    parser.add_argument("--workers", type=int, default=4, help="Anzahl Prozesse (default: 4)")
+    parser.add_argument("--requests", type=int, default=5, help="Anfragen pro Prozess (default: 5)")
+    parser.add_argument("--slots", type=int, default=2, help="Globale Slots (default: 2)")
+    parser.add_argument("--hold", type=float, default=0.2, help="Dauer einer 'Generierung' in Sekunden")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    running = ctx.Value("i", 0)
+    peak = ctx.Value("i", 0)
+    served = ctx.Value("i", 0)
+    lock = ctx.Lock()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "ai_slots.db")
+
+        print(f"\n🔒 AI Slot Check ({args.workers} workers × {args.requests} requests, {args.slots} slots)")
+        print("=" * 60)
+
+        # Abgestürzter Worker hinterlässt einen belegten Slot
+        crasher = ctx.Process(target=_crashing_worker, args=(db_path, args.slots))
+        crasher.start()
+        crasher.join()
+
+        start = time.time()
+        workers = [
+            ctx.Process(
+                target=_worker,
+                args=(db_path, args.slots, args.requests, args.hold, running, peak, served, lock)
+            )
+            for _ in range(args.workers)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(timeout=120)
+
+        elapsed = time.time() - start
+        expected = args.workers * args.requests
+        # Untergrenze: alle Anfragen nacheinander in 'slots' Bahnen
+        min_elapsed = expected * args.hold / args.slots
+
+        print(f"Served:           {served.value}/{expected}")
+        print(f"Peak concurrency: {peak.value} (limit {args.slots})")
+        print(f"Elapsed:          {elapsed:.2f}s (>= {min_elapsed:.2f}s expected)")
+
+        granted, max_gap = asyncio.run(_loop_lag_while_locked(db_path, args.slots))
+        print(f"Loop lag (DB locked by another process): {max_gap * 1000:.0f} ms max "
+              f"(acquire {'granted' if granted else 'not granted'})")
+        print("=" * 60)
+
+        ok = (
+            served.value == expected
+            and peak.value <= args.slots
+            and all(process.exitcode == 0 for process in workers)
+            and granted
+            and max_gap < 0.25
+        )
+        print("✅ PASS" if ok else "❌ FAIL")
+        return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
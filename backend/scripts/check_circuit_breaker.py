@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Check: Circuit Breaker + Health Probe gegen den Fake AI Server
+
+- Ollama fällt aus → Probe öffnet den Breaker, Anfragen scheitern sofort
+  (statt auf den 180s-Timeout zu warten)
+- Ollama kommt zurück → half_open → genau ein Probeaufruf (parallele
+  Anfragen weichen aus), dessen Erfolg schließt
+- Probe-Ergebnisse landen in beide Richtungen im Sliding Window
+- PRO: Gemini offen → Routing geht direkt zu Ollama
+- Routing-Entscheidung (ollama_available) dauert Mikrosekunden
+
+Usage:
+    python scripts/check_circuit_breaker.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import time
+
+from scripts.fake_ai_server import FAKE_STATE, start_in_thread
+
+# Fake Server muss laufen, bevor der Generator (Singleton) importiert wird
+BASE_URL, _server = start_in_thread()
+os.environ["GOOGLE_AI_API_KEY"] = "fake-key"
+os.environ["GEMINI_BASE_URL"] = f"{BASE_URL}/v1beta"
+os.environ["OLLAMA_BASE_URL"] = BASE_URL
+os.environ["AI_HEALTH_PROBE_INTERVAL"] = "0.1"
+os.environ["AI_BREAKER_OPEN_SECONDS"] = "0.5"
+os.environ.setdefault("DEBUG", "True")
+
+from app.services.ai_recipe_generator import AIRecipeGenerator
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+async def main():
+    generator = AIRecipeGenerator()
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n⚡ Circuit Breaker Check (fake server: {BASE_URL})")
+    print("=" * 60)
+
+    generator.start_health_probe()
+    await asyncio.sleep(0.3)
+    check("Both providers closed after probing", generator.ollama.breaker.state == "closed"
+          and generator.gemini.breaker.state == "closed")
+
+    # Ollama fällt aus
+    FAKE_STATE["ollama_fail"] = True
+    opened = await wait_for(lambda: generator.ollama.breaker.state == "open")
+    check("Probe opens Ollama breaker", opened, f"({generator.ollama.breaker.status()})")
+
+    start = time.perf_counter()
+    try:
+        await generator.generate_recipes(["Tomate"], count=3, user_tier="free")
+        check("Free request fails fast while open", False)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        check("Free request fails fast while open", elapsed < 0.01, f"({elapsed * 1e6:.0f} µs: {e})")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        generator.ollama_available
+    per_check = (time.perf_counter() - start) / 10_000
+    check("Routing decision takes microseconds", per_check < 50e-6, f"({per_check * 1e6:.2f} µs)")
+
+    # Ollama kommt zurück
+    FAKE_STATE["ollama_fail"] = False
+    recovered = await wait_for(lambda: generator.ollama.breaker.state == "half_open")
+    check("Probe moves recovered Ollama to half_open", recovered)
+    before = FAKE_STATE["requests"]["ollama"]
+    outcomes = await asyncio.gather(*(
+        generator.generate_recipes(["Tomate"], count=3, user_tier="free") for _ in range(3)
+    ), return_exceptions=True)
+    succeeded = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+    check("half_open lets exactly one trial call through",
+          len(succeeded) == 1 and FAKE_STATE["requests"]["ollama"] - before == 1,
+          f"({len(succeeded)}/3 succeeded, {FAKE_STATE['requests']['ollama'] - before} Ollama calls)")
+    check("Trial success closes breaker", generator.ollama.breaker.state == "closed"
+          and len(succeeded[0]) == 3 if succeeded else False)
+
+    # Probe-Ergebnisse: Erfolge zählen im Window genauso wie Fehler
+    breaker = CircuitBreaker("probe-check", min_calls=4, window_size=4, open_seconds=0)
+    for healthy in (True, True, False):
+        breaker.record_probe(healthy)
+    check("Probe successes and failures both land in the window",
+          breaker.status()["window"] == 3 and breaker.state == "closed",
+          f"(failure rate {breaker.failure_rate():.2f})")
+    breaker.record_probe(False)  # 2/4 → open, open_seconds=0 → sofort half_open
+    trial = breaker.begin_call()
+    try:
+        breaker.begin_call()
+        second = True
+    except CircuitOpenError:
+        second = False
+    breaker.cancel_trial()
+    check("Cancelled trial frees the half_open slot",
+          trial and not second and breaker.allow_request() and breaker.begin_call())
+
+    # Gemini fällt aus → PRO geht direkt zu Ollama
+    FAKE_STATE["gemini_fail"] = True
+    opened = await wait_for(lambda: generator.gemini.breaker.state == "open")
+    check("Probe opens Gemini breaker", opened)
+    before = FAKE_STATE["requests"]["gemini"]
+    recipes = await generator.generate_recipes(["Tomate"], count=3, user_tier="pro")
+    check("PRO skips open Gemini", FAKE_STATE["requests"]["gemini"] == before
+          and {r["ai_provider"] for r in recipes} == {"ollama"})
+    FAKE_STATE["gemini_fail"] = False
+
+    await generator.aclose()
+    check("Probe stopped on aclose", not generator.provider_health()["probe_running"])
+    print("=" * 60)
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Check: Event-Loop-Lag der async Routen (AsyncSession statt sync Session)
+
+Ein Ticker misst alle 5 ms, wie spät der Event Loop dran ist, während
+Anfragen (10 gleichzeitig) an die Hot-Endpoints gehen (Historie,
+Recipe-DB-Suche, Meal Tracking → alle 200). Für den Vorher/Nachher-Vergleich
+läuft die Recipe-DB-Suche (auf einige tausend Zeilen aufgeblasen) einmal
+über die echte Route und einmal über eine Kopie mit sync Session im
+`async def` - so liefen die Routen mit get_db() vorher. Verglichen wird,
+wie lange der Loop insgesamt blockiert war.
+
+Mock-Generierung (POST /recipes/generate, ai_provider=mock): Nährwerte
+unbekannter Zutaten kommen per sync OpenFoodFacts-Lookup - hier von einem
+lokalen Server, der jede Suche 200 ms hinhält. Die Route läuft im
+Threadpool, der Loop darf dabei nicht stehen bleiben.
+
+Usage:
+    python scripts/check_event_loop_lag.py
+    python scripts/check_event_loop_lag.py --requests 300 --doublings 11
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CHECK_DB = "./database/check_event_loop.db"
+
+os.chdir(BACKEND_DIR)
+for suffix in ("", "-wal", "-shm"):
+    if os.path.exists(CHECK_DB + suffix):
+        os.remove(CHECK_DB + suffix)
+os.environ.update({
+    "DEBUG": "True",
+    "DATABASE_URL": f"sqlite:///{CHECK_DB}",
+    "SERVICE_WARMUP": "False",
+})
+
+import httpx
+from fastapi import Depends, Query
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.ingredient import Ingredient
+from app.models.recipe_db import RecipeDB
+from app.models.user import SubscriptionTier, User
+from app.utils.database import SessionLocal, async_engine, get_db, init_db
+from app.utils.jwt import create_access_token
+from app.services.nutrition_service import nutrition_service
+from app.services.recipe_fts import paginate_with_total
+from seed_recipe_db import seed_recipes
+from sqlalchemy import text
+
+SEARCH = "/api/recipe-db/search?category=low_carb&limit=1"
+SLOW_LOOKUP_SECONDS = 0.2
+MOCK_REQUESTS = 6
+
+ENDPOINTS = [
+    "/api/recipes/history",
+    "/api/recipe-db/search?query=tomate",
+    "/api/recipe-db/search?category=low_carb",
+    "/api/recipe-db/categories/list",
+    "/api/meals/today",
+    "/api/meals/history?days=30",
+]
+
+
+@app.get("/lag-check/sync-search")
+async def sync_search(category: str = Query(...), limit: int = Query(20), db: Session = Depends(get_db)):
+    """Recipe-DB-Suche wie vor der AsyncSession: sync Queries im Event Loop"""
+    query = db.query(RecipeDB).filter(getattr(RecipeDB, f"is_{category}") == True)
+    total, recipes = paginate_with_total(query, RecipeDB.quality_score.desc(), limit, 0)
+    return {"total": total, "recipes": [recipe.to_dict() for recipe in recipes]}
+
+
+class SlowOpenFoodFacts(BaseHTTPRequestHandler):
+    """OpenFoodFacts-Suche, die SLOW_LOOKUP_SECONDS braucht (kein Treffer)"""
+
+    def do_GET(self):
+        time.sleep(SLOW_LOOKUP_SECONDS)
+        body = json.dumps({"products": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_slow_openfoodfacts() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowOpenFoodFacts)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    nutrition_service.SEARCH_URL = f"http://127.0.0.1:{server.server_port}/cgi/search.pl"
+    return server
+
+
+def seed(doublings: int):
+    init_db()
+    db = SessionLocal()
+    user = User(email="lag@example.com", username="lag", hashed_password="-",
+                subscription_tier=SubscriptionTier.BASIC, email_verified=True)
+    db.add(user)
+    db.flush()
+    # Zutaten ohne Fallback-Nährwerte → jeder Mock-Request fragt OpenFoodFacts
+    ingredient_ids = []
+    for i in range(MOCK_REQUESTS):
+        ingredient = Ingredient(user_id=user.id, name=f"Lagcheck-Wurzel {i}")
+        db.add(ingredient)
+        db.flush()
+        ingredient_ids.append(ingredient.id)
+    db.commit()
+    seed_recipes(db)
+
+    # Recipe-DB per INSERT ... SELECT vervielfachen (FTS-Trigger laufen mit)
+    columns = [column.name for column in RecipeDB.__table__.columns if column.name != "id"]
+    column_list = ", ".join(columns)
+    for _ in range(doublings):
+        db.execute(text(f"INSERT INTO recipe_db ({column_list}) SELECT {column_list} FROM recipe_db"))
+    db.commit()
+
+    token = create_access_token({"user_id": user.id})
+    db.close()
+    return token, ingredient_ids
+
+
+async def measure_lag(load) -> dict:
+    """Ticker (5 ms) neben `load` laufen lassen → max/summierte Verspätung in ms"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    tick_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await load()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick_task
+
+    return {
+        "max_ms": max(lags, default=0.0) * 1000,
+        "blocked_ms": sum(lags) * 1000,
+        "seconds": elapsed,
+    }
+
+
+async def main(args):
+    token, ingredient_ids = seed(args.doublings)
+    server = start_slow_openfoodfacts()
+    limit = asyncio.Semaphore(args.concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n⏱️  Event Loop Lag Check ({args.requests} concurrent requests)")
+    print("=" * 60)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = []
+
+        async def api_request(path):
+            async with limit:
+                response = await client.get(path, headers=headers)
+            statuses.append(response.status_code)
+
+        def load(paths):
+            async def run():
+                await asyncio.gather(*(api_request(paths[i % len(paths)]) for i in range(args.requests)))
+            return run
+
+        await load(ENDPOINTS)()
+        check("Hot endpoints answer via AsyncSession", set(statuses) == {200}, f"({sorted(set(statuses))})")
+
+        async_lag = await measure_lag(load([SEARCH]))
+        sync_lag = await measure_lag(load([SEARCH.replace("/api/recipe-db/search", "/lag-check/sync-search")]))
+
+        mock_statuses = []
+
+        async def mock_generate(ingredient_id):
+            body = {"ingredient_ids": [ingredient_id], "ai_provider": "mock", "servings": 2}
+            response = await client.post("/api/recipes/generate", json=body, headers=headers)
+            mock_statuses.append(response.status_code)
+
+        async def mock_load():
+            await asyncio.gather(*(mock_generate(ingredient_id) for ingredient_id in ingredient_ids))
+
+        mock_lag = await measure_lag(mock_load)
+
+    for name, lag in (("AsyncSession route", async_lag), ("sync Session in loop", sync_lag),
+                      ("mock generation", mock_lag)):
+        print(f"   {name:<21} max lag {lag['max_ms']:6.1f} ms, loop blocked {lag['blocked_ms']:7.1f} ms "
+              f"({args.requests / lag['seconds']:.0f} req/s)")
+    check("Shorter worst-case stall with AsyncSession", async_lag["max_ms"] < sync_lag["max_ms"])
+    check("Loop blocked less with AsyncSession", async_lag["blocked_ms"] < sync_lag["blocked_ms"])
+    check(f"Mock generation with {SLOW_LOOKUP_SECONDS * 1000:.0f} ms OpenFoodFacts lookups keeps the loop free",
+          set(mock_statuses) == {200} and mock_lag["max_ms"] < SLOW_LOOKUP_SECONDS * 1000 / 2,
+          f"({sorted(set(mock_statuses))}, max lag {mock_lag['max_ms']:.1f} ms)")
+
+    server.shutdown()
+
+    await async_engine.dispose()
+    print("=" * 60)
+    print(f"{sum(results)}/{len(results)} checks passed")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(CHECK_DB + suffix):
+            os.remove(CHECK_DB + suffix)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure event loop lag of the async DB routes")
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--doublings", type=int, default=10, help="Recipe-DB 2^n mal vervielfachen")
+    asyncio.run(main(parser.parse_args()))
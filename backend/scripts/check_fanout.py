@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Check: Parallel Fan-out (ein Prompt pro Rezept) gegen den Fake AI Server
+
+- Gemini (parallel möglich): auto wählt nach der Messphase Fan-out,
+  3 Rezepte in ~1/3 der seriellen Zeit, verschiedene Rezepte
+- Ollama mit nur einem Decode-Slot (OLLAMA_NUM_PARALLEL zu hoch konfiguriert):
+  Fan-out misst langsamer → auto bleibt seriell
+- Fan-out Teilfehler: restliche Rezepte kommen trotzdem
+- Fan-out belegt einen Admission-Slot pro gleichzeitigem Prompt; ist im
+  Pool nichts mehr frei, wird seriell generiert (ein Prompt)
+
+Usage:
+    python scripts/check_fanout.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import time
+
+from scripts.fake_ai_server import FAKE_STATE, start_in_thread
+
+# Fake Server muss laufen, bevor der Generator (Singleton) importiert wird
+BASE_URL, _server = start_in_thread()
+os.environ["GOOGLE_AI_API_KEY"] = "fake-key"
+os.environ["GEMINI_BASE_URL"] = f"{BASE_URL}/v1beta"
+os.environ["OLLAMA_BASE_URL"] = BASE_URL
+os.environ["OLLAMA_NUM_PARALLEL"] = "3"
+os.environ["AI_FANOUT_MODE"] = "auto"
+os.environ["AI_SLOT_BACKEND"] = "local"
+os.environ["GEMINI_MAX_CONCURRENT"] = "3"
+os.environ.setdefault("DEBUG", "True")
+
+from app.services.ai_recipe_generator import AIRecipeGenerator
+from app.services.fanout_planner import PARALLEL, SERIAL
+
+ARGS = dict(ingredients=["Tomate", "Zwiebel"], count=3, servings=2,
+            diet_profiles=None, diabetes_unit="KE", language="de")
+
+
+async def timed(generator, tier):
+    start = time.perf_counter()
+    recipes = await generator.generate_recipes(**ARGS, user_tier=tier)
+    return recipes, time.perf_counter() - start
+
+
+async def main():
+    generator = AIRecipeGenerator()
+    planner = generator.fanout
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n🌿 Fan-out Check (fake server: {BASE_URL})")
+    print("=" * 60)
+    FAKE_STATE["token_delay"] = 0.004
+
+    # Messphase: beide Modi je min_samples mal
+    def samples(provider):
+        stats = planner.status()["providers"].get(provider, {})
+        return {mode: stats.get(mode, {}).get("samples", 0) for mode in (PARALLEL, SERIAL)}
+
+    timings = {PARALLEL: [], SERIAL: []}
+    for _ in range(2 * planner.min_samples):
+        before = samples("gemini")
+        recipes, elapsed = await timed(generator, "pro")
+        after = samples("gemini")
+        mode = PARALLEL if after[PARALLEL] > before[PARALLEL] else SERIAL
+        timings[mode].append(elapsed)
+    parallel, serial = min(timings[PARALLEL]), min(timings[SERIAL])
+    check("Gemini fan-out faster than one long prompt", parallel < serial * 0.6,
+          f"({parallel * 1000:.0f} ms vs {serial * 1000:.0f} ms)")
+    check("Auto picks parallel for Gemini", planner.choose("gemini", 3) == PARALLEL)
+
+    recipes, _ = await timed(generator, "pro")
+    names = [recipe["name"] for recipe in recipes]
+    check("Fan-out merges 3 distinct recipes", len(set(names)) == 3, f"({names})")
+
+    # Ollama: nur ein Decode-Slot auf dem "Host"
+    FAKE_STATE["ollama_parallel"] = 1
+    for _ in range(2 * planner.min_samples):
+        await timed(generator, "free")
+    stats = planner.status()["providers"]["ollama"]
+    check("Auto stays serial on a single-slot Ollama", planner.choose("ollama", 3) == SERIAL,
+          f"(serial {stats[SERIAL]['seconds_per_recipe']} s/recipe, parallel {stats[PARALLEL]['seconds_per_recipe']} s/recipe)")
+    FAKE_STATE["ollama_parallel"] = 0
+
+    # Teilfehler: ein Einzel-Prompt scheitert
+    generator.fanout.mode = PARALLEL
+    original = generator._complete
+    calls = {"n": 0}
+
+    async def flaky(provider, prompt, budget_key):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("simulated provider error")
+        return await original(provider, prompt, budget_key)
+
+    generator._complete = flaky
+    recipes, _ = await timed(generator, "pro")
+    generator._complete = original
+    check("Partial fan-out failure still returns the rest", len(recipes) == 2, f"({len(recipes)} recipes)")
+
+    # Slots: ein Slot pro Einzel-Prompt, Peak während des Laufs messen
+    limiter = await generator.admission.limiter("gemini")
+    peak, sampling = 0, True
+
+    async def sample_in_use():
+        nonlocal peak
+        while sampling:
+            peak = max(peak, limiter.current_requests)
+            await asyncio.sleep(0.005)
+
+    sampler = asyncio.ensure_future(sample_in_use())
+    await timed(generator, "pro")
+    sampling = False
+    await sampler
+    check("Fan-out holds one admission slot per parallel prompt", peak == 3,
+          f"(peak {peak} of {limiter.max_concurrent} Gemini slots)")
+
+    # Pool bis auf einen Slot belegt → kein Fan-out, ein einziger Prompt
+    await limiter.acquire("holder-1")
+    await limiter.acquire("holder-2")
+    before = FAKE_STATE["requests"]["gemini"]
+    recipes, _ = await timed(generator, "pro")
+    prompts = FAKE_STATE["requests"]["gemini"] - before
+    await limiter.release("holder-1")
+    await limiter.release("holder-2")
+    check("No spare slots → serial generation", prompts == 1 and len(recipes) == 3,
+          f"({prompts} prompt(s), {len(recipes)} recipes)")
+
+    await generator.aclose()
+    print("=" * 60)
+    print(f"Planner: {planner.status()}")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
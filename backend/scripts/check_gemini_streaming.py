@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Check: Provider-abhängiges Streaming gegen den Fake AI Server
+
+- PRO:  Tokens kommen von Gemini (streamGenerateContent), erstes Token < 1s
+- FREE: Tokens kommen von Ollama
+- Gemini down: PRO fällt vor dem ersten Token auf Ollama zurück
+- Alle Streams ergeben 3 vollständige Rezepte (IncrementalRecipeParser)
+
+Usage:
+    python scripts/check_gemini_streaming.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import time
+
+from scripts.fake_ai_server import FAKE_STATE, start_in_thread
+
+# Fake Server muss laufen, bevor der Generator (Singleton) importiert wird
+BASE_URL, _server = start_in_thread()
+os.environ["GOOGLE_AI_API_KEY"] = "fake-key"
+os.environ["GEMINI_BASE_URL"] = f"{BASE_URL}/v1beta"
+os.environ["OLLAMA_BASE_URL"] = BASE_URL
+os.environ.setdefault("DEBUG", "True")
+
+from app.services.ai_recipe_generator import AIRecipeGenerator
+from app.services.recipe_stream_parser import IncrementalRecipeParser
+
+
+async def run_stream(generator, tier):
+    parser = IncrementalRecipeParser()
+    providers = set()
+    recipes = []
+    start = time.perf_counter()
+    first_token = None
+
+    async for token in generator.generate_with_streaming(
+        ingredients=["Tomate", "Zwiebel"], count=3, servings=2,
+        diet_profiles=None, diabetes_unit="KE", language="de", user_tier=tier
+    ):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        providers.add(token.provider)
+        recipes.extend(parser.feed(token))
+
+    return providers, recipes, first_token, time.perf_counter() - start
+
+
+async def main():
+    generator = AIRecipeGenerator()
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n🌊 Streaming Check (fake server: {BASE_URL})")
+    print("=" * 60)
+
+    providers, recipes, first, total = await run_stream(generator, "pro")
+    check("PRO streams from Gemini", providers == {"gemini"}, f"({providers})")
+    check("PRO first token < 1s", first < 1.0, f"({first * 1000:.0f} ms, total {total * 1000:.0f} ms)")
+    check("PRO stream yields 3 recipes", len(recipes) == 3, f"({len(recipes)})")
+
+    providers, recipes, first, total = await run_stream(generator, "free")
+    check("FREE streams from Ollama", providers == {"ollama"}, f"({providers})")
+    check("FREE stream yields 3 recipes", len(recipes) == 3, f"({len(recipes)})")
+
+    FAKE_STATE["gemini_fail"] = True
+    providers, recipes, first, total = await run_stream(generator, "pro")
+    FAKE_STATE["gemini_fail"] = False
+    check("PRO falls back to Ollama when Gemini fails", providers == {"ollama"}, f"({providers})")
+    check("Fallback stream yields 3 recipes", len(recipes) == 3, f"({len(recipes)})")
+
+    recipes = await generator.generate_recipes(["Tomate"], count=3, user_tier="pro")
+    check("Non-streaming PRO uses Gemini", {r["ai_provider"] for r in recipes} == {"gemini"})
+
+    await generator.aclose()
+    print("=" * 60)
+    print(f"Requests: {FAKE_STATE['requests']}")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
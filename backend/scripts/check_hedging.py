@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Check: Hedged PRO-Generierung gegen den Fake AI Server
+
+- Gemini schnell:  kein Hedge, Gemini gewinnt
+- Gemini hängt:    nach dem Budget startet Ollama, Ollama gewinnt,
+                   Gemini-Request wird abgebrochen (Latenz ≈ Budget + Ollama)
+- Gemini fällt aus: Ergebnis kommt trotzdem (serieller Fallback)
+- Hedge scheitert: langsames Gemini gewinnt trotzdem
+- Queue-Zeit vor dem Gemini-Slot zählt nicht ins Budget
+- Budget folgt dem gemessenen First-Byte-p95 (AI_HEDGE_AFTER_SECONDS = Untergrenze)
+
+Usage:
+    python scripts/check_hedging.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import time
+
+from scripts.fake_ai_server import FAKE_STATE, start_in_thread
+
+# Fake Server muss laufen, bevor der Generator (Singleton) importiert wird
+BASE_URL, _server = start_in_thread()
+os.environ["GOOGLE_AI_API_KEY"] = "fake-key"
+os.environ["GEMINI_BASE_URL"] = f"{BASE_URL}/v1beta"
+os.environ["OLLAMA_BASE_URL"] = BASE_URL
+os.environ["AI_HEDGE_ENABLED"] = "True"
+os.environ["AI_HEDGE_AFTER_SECONDS"] = "0.3"
+os.environ["AI_HEDGE_MIN_SAMPLES"] = "5"
+os.environ["AI_SLOT_BACKEND"] = "local"
+os.environ["GEMINI_MAX_CONCURRENT"] = "1"
+os.environ.setdefault("DEBUG", "True")
+
+from app.middleware.rate_limit import admission_controller
+from app.services.ai_recipe_generator import AIRecipeGenerator
+
+
+async def timed_generate(generator):
+    start = time.perf_counter()
+    recipes = await generator.generate_recipes(["Tomate"], count=3, user_tier="pro")
+    return recipes, time.perf_counter() - start
+
+
+async def main():
+    generator = AIRecipeGenerator()
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n🏁 Hedging Check (fake server: {BASE_URL}, budget {generator.hedge_after_seconds}s)")
+    print("=" * 60)
+
+    recipes, elapsed = await timed_generate(generator)
+    check("Fast Gemini wins without hedge", {r["ai_provider"] for r in recipes} == {"gemini"},
+          f"({elapsed * 1000:.0f} ms)")
+    check("No hedge fired", generator.hedge_stats["hedged"] == 0)
+
+    FAKE_STATE["gemini_first_token_delay"] = 5.0
+    recipes, elapsed = await timed_generate(generator)
+    check("Slow Gemini → Ollama wins", {r["ai_provider"] for r in recipes} == {"ollama"},
+          f"({elapsed * 1000:.0f} ms)")
+    check("Hedged latency ≈ budget + Ollama (< 1s, not 5s)", elapsed < 1.0)
+    check("Hedge counted", generator.hedge_stats["hedged"] == 1 and generator.hedge_stats["secondary_won"] == 1)
+    FAKE_STATE["gemini_first_token_delay"] = None
+
+    FAKE_STATE["gemini_fail"] = True
+    recipes, elapsed = await timed_generate(generator)
+    FAKE_STATE["gemini_fail"] = False
+    check("Failing Gemini → Ollama result", {r["ai_provider"] for r in recipes} == {"ollama"},
+          f"({elapsed * 1000:.0f} ms)")
+
+    FAKE_STATE["gemini_first_token_delay"] = 5.0
+    FAKE_STATE["ollama_fail"] = True
+    recipes, elapsed = await timed_generate(generator)
+    check("Failing hedge → slow Gemini still wins", {r["ai_provider"] for r in recipes} == {"gemini"},
+          f"({elapsed * 1000:.0f} ms)")
+    FAKE_STATE["gemini_first_token_delay"] = None
+    FAKE_STATE["ollama_fail"] = False
+
+    # Gemini-Slot belegt: 0.6s in der Queue > Budget, aber Gemini selbst ist schnell
+    gemini_pool = await admission_controller.limiter("gemini")
+    await gemini_pool.acquire("holder", user_id="other")
+    hedged_before = generator.hedge_stats["hedged"]
+    pending = asyncio.ensure_future(timed_generate(generator))
+    await asyncio.sleep(0.6)
+    await gemini_pool.release("holder")
+    recipes, elapsed = await pending
+    check("Queue time before the Gemini slot does not trigger a hedge",
+          {r["ai_provider"] for r in recipes} == {"gemini"} and generator.hedge_stats["hedged"] == hedged_before,
+          f"({elapsed * 1000:.0f} ms incl. queue)")
+    await generator.aclose()
+    print(f"Metrics: {generator.hedging_metrics()}")
+
+    # Frischer Generator: 5 Gemini-Antworten mit 0.6s First Byte (kein Hedge-Platz frei) → Budget ≈ p95
+    measured = AIRecipeGenerator()
+    check("Budget defaults to AI_HEDGE_AFTER_SECONDS without samples", measured.hedge_timeout() == 0.3)
+    FAKE_STATE["gemini_first_token_delay"] = 0.6
+    measured.hedge_max_inflight = 0
+    for _ in range(measured.hedge_min_samples):
+        await timed_generate(measured)
+    measured.hedge_max_inflight = 1
+    budget = measured.hedge_timeout()
+    check("Budget follows the measured first-byte p95", 0.6 <= budget < 1.0, f"({budget:.2f}s)")
+
+    FAKE_STATE["gemini_first_token_delay"] = 0.45
+    hedged_before = measured.hedge_stats["hedged"]
+    recipes, elapsed = await timed_generate(measured)
+    FAKE_STATE["gemini_first_token_delay"] = None
+    check("Gemini within the p95 budget (above the floor) is not hedged",
+          {r["ai_provider"] for r in recipes} == {"gemini"} and measured.hedge_stats["hedged"] == hedged_before,
+          f"({elapsed * 1000:.0f} ms)")
+
+    await measured.aclose()
+    print("=" * 60)
+    print(f"Metrics: {measured.hedging_metrics()}")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Check: Ollama Keep-Warm + keep_alive gegen den Fake AI Server
+
+- Aktive Stunden: Ping lädt das Modell vor → User-Anfrage ohne Kaltstart
+- Eviction wird erkannt und das Modell neu geladen
+- keep_alive: aktiv/viel Traffic → lang, sonst Ollama-Default
+- Traffic-Zähler bleibt in aktiven Stunden begrenzt (alte Zeitstempel fallen raus)
+- Ohne Keep-Warm zahlt der User den Kaltstart (Vergleich)
+
+Usage:
+    python scripts/check_ollama_residency.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import time
+
+from scripts.fake_ai_server import FAKE_STATE, start_in_thread
+
+# Fake Server muss laufen, bevor der Generator (Singleton) importiert wird
+BASE_URL, _server = start_in_thread()
+os.environ["OLLAMA_BASE_URL"] = BASE_URL
+os.environ["OLLAMA_KEEP_WARM_INTERVAL"] = "0.2"
+os.environ.setdefault("DEBUG", "True")
+
+from app.services.ai_recipe_generator import AIRecipeGenerator
+
+LOAD_TIME = 1.0
+
+
+async def timed_generate(generator):
+    start = time.perf_counter()
+    await generator.generate_recipes(["Tomate"], count=3, user_tier="free")
+    return time.perf_counter() - start
+
+
+async def main():
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n🔥 Ollama Residency Check (fake server: {BASE_URL}, load time {LOAD_TIME}s)")
+    print("=" * 60)
+    FAKE_STATE["ollama_load_time"] = LOAD_TIME
+
+    # Ohne aktive Stunden: erster User zahlt den Kaltstart, keep_alive = idle
+    os.environ["OLLAMA_ACTIVE_HOURS"] = ""
+    cold = AIRecipeGenerator()
+    residency = cold.ollama.residency
+    FAKE_STATE["ollama_loaded"] = False
+    elapsed = await timed_generate(cold)
+    check("Without keep-warm the user pays the cold load", elapsed >= LOAD_TIME,
+          f"({elapsed * 1000:.0f} ms, cold_loads_request={residency.stats['cold_loads_request']})")
+    check("Idle keep_alive outside active hours", FAKE_STATE["ollama_keep_alive"][-1] == "5m",
+          f"({FAKE_STATE['ollama_keep_alive'][-1]})")
+    for _ in range(residency.busy_requests):
+        await cold.generate_recipes(["Tomate"], count=3, user_tier="free")
+    check("Busy traffic extends keep_alive", FAKE_STATE["ollama_keep_alive"][-1] == "30m",
+          f"({FAKE_STATE['ollama_keep_alive'][-1]})")
+    await cold.aclose()
+
+    # Aktive Stunden rund um die Uhr: Keep-Warm lädt vor
+    os.environ["OLLAMA_ACTIVE_HOURS"] = "0-24"
+    generator = AIRecipeGenerator()
+    residency = generator.ollama.residency
+    FAKE_STATE["ollama_loaded"] = False
+    generator.start_background_tasks()
+    await asyncio.sleep(LOAD_TIME + 0.5)
+    check("Keep-warm ping loaded the model", FAKE_STATE["ollama_loaded"] and residency.stats["cold_loads_ping"] == 1)
+
+    elapsed = await timed_generate(generator)
+    check("User request without cold load", elapsed < LOAD_TIME and residency.stats["cold_loads_request"] == 0,
+          f"({elapsed * 1000:.0f} ms)")
+    check("Active keep_alive on requests", FAKE_STATE["ollama_keep_alive"][-1] == "30m")
+
+    # Aktive Stunden: jede Anfrage entscheidet "lang" - die Zeitstempel dürfen trotzdem nicht wachsen
+    window = residency.traffic_window_seconds
+    residency.traffic_window_seconds = 0.0
+    for _ in range(10_000):
+        residency.keep_alive_for_request()
+    tracked = len(residency._requests)  # ungekürzte Deque, nicht über recent_requests()
+    residency.traffic_window_seconds = window
+    check("Request timestamps pruned during active hours", tracked <= 1, f"({tracked} timestamps after 10000 requests)")
+
+    # Eviction (z.B. anderes Modell geladen) → erkannt + neu geladen
+    FAKE_STATE["ollama_loaded"] = False
+    await asyncio.sleep(LOAD_TIME + 0.5)
+    check("Eviction detected", residency.stats["evictions"] >= 1, f"(events: {[e['event'] for e in residency.events]})")
+    check("Model reloaded by ping", FAKE_STATE["ollama_loaded"] and residency.stats["cold_loads_ping"] == 2)
+
+    await generator.aclose()
+    check("Keep-warm loop stopped", not residency.status()["running"])
+    print("=" * 60)
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
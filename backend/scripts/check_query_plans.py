@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Check: Query-Pläne der Hot-Routen (EXPLAIN QUERY PLAN, SQLite)
+
+Die Routen werden echt aufgerufen (Historie, Vorrat, Favoriten, Profile,
+Meal Tracking, Stripe-Kunden-Lookup, Account löschen). Jede dabei abgesetzte
+Abfrage wird mitgeschnitten und per EXPLAIN QUERY PLAN geprüft:
+- kein Full Scan auf den User-Tabellen (SCAN recipes, SCAN meal_logs, ...)
+- der erwartete Index wird benutzt
+- bei sortierten Listen keine Extra-Sortierung (USE TEMP B-TREE FOR ORDER BY)
+
+Drei Durchläufe:
+1. frisches Schema aus den Models (init_db) → alles grün
+2. Schema ohne die Indizes (Stand vor migrations/003) → der Check muss die
+   Full Scans finden, sonst taugt er nicht als Regressionstest
+3. migrations/003_add_user_query_indexes.sql angewendet → wieder alles grün
+
+Usage:
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --verbose
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CHECK_DB = "./database/check_query_plans.db"
+MIGRATION = os.path.join(BACKEND_DIR, "migrations", "003_add_user_query_indexes.sql")
+
+os.chdir(BACKEND_DIR)
+for suffix in ("", "-wal", "-shm"):
+    if os.path.exists(CHECK_DB + suffix):
+        os.remove(CHECK_DB + suffix)
+os.environ.update({
+    "DEBUG": "True",
+    "DATABASE_URL": f"sqlite:///{CHECK_DB}",
+    "SERVICE_WARMUP": "False",
+})
+
+import httpx
+from sqlalchemy import event
+
+from app.main import app
+from app.models.diet_profile import DietProfile
+from app.models.favorite import Favorite
+from app.models.ingredient import Ingredient
+from app.models.meal_log import MealLog
+from app.models.recipe import Recipe
+from app.models.user import SubscriptionTier, User
+from app.routes.stripe_routes import _user_for_customer
+from app.utils.database import AsyncSessionLocal, SessionLocal, async_engine, engine, init_db
+from app.utils.jwt import create_access_token
+
+USER_TABLES = {"users", "recipes", "ingredients", "favorites", "diet_profiles", "meal_logs"}
+SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+# (Name, Methode, Pfad | None, erwartete Indizes, sortierte Liste?)
+ROUTES = [
+    ("GET /recipes/history", "GET", "/api/recipes/history", {"ix_recipes_user_id_generated_at"}, True),
+    ("GET /ingredients", "GET", "/api/ingredients/", {"ix_ingredients_user_id_added_at"}, True),
+    ("GET /favorites", "GET", "/api/favorites/", {"ix_favorites_user_id_added_at"}, True),
+    ("GET /profiles", "GET", "/api/profiles/", set(), False),
+    ("GET /meals/today", "GET", "/api/meals/today",
+     {"ix_meal_logs_user_id_consumed_at", "ix_diet_profiles_user_id_type_active"}, True),
+    ("GET /meals/history", "GET", "/api/meals/history?days=30", {"ix_meal_logs_user_id_consumed_at"}, True),
+    ("Stripe customer lookup", "STRIPE", None, {"ix_users_stripe_customer_id"}, False),
+    ("DELETE /users/me", "DELETE", "/api/users/me", {"ix_favorites_recipe_id", "ix_meal_logs_recipe_id"}, False),
+]
+
+INGREDIENTS_JSON = [{"name": "Tomate", "amount": "200 g"}]
+NUTRITION_JSON = {"calories": 300, "protein": 10, "carbs": 40, "fat": 8}
+
+captured = []
+
+
+def capture(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+        # executemany (z.B. Cascade-Deletes): Plan der ersten Parameterzeile reicht
+        captured.append((statement, parameters[0] if executemany else parameters))
+
+
+event.listen(engine, "before_cursor_execute", capture)
+event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+def seed_user(db, index: int, **fields) -> User:
+    """User mit Rezepten, Vorrat, Favoriten, Diabetes-Profil und Mahlzeiten"""
+    user = User(email=f"plan{index}@example.com", username=f"plan{index}", hashed_password="-",
+                subscription_tier=SubscriptionTier.PRO, email_verified=True, **fields)
+    db.add(user)
+    db.flush()
+    now = datetime.utcnow()
+    recipes = [Recipe(user_id=user.id, name=f"Rezept {n}", generated_at=now - timedelta(hours=n),
+                      ingredients_json=INGREDIENTS_JSON, nutrition_json=NUTRITION_JSON)
+               for n in range(20)]
+    db.add_all(recipes)
+    db.flush()
+    db.add_all(Ingredient(user_id=user.id, name=f"Zutat {n}", added_at=now - timedelta(hours=n)) for n in range(20))
+    db.add_all(Favorite(user_id=user.id, recipe_id=recipe.id, added_at=now - timedelta(hours=n))
+               for n, recipe in enumerate(recipes[:5]))
+    db.add(DietProfile(user_id=user.id, profile_type="diabetic", name="Diabetes",
+                       settings_json={"daily_carb_limit": 150}))
+    db.add_all(MealLog(user_id=user.id, recipe_id=recipes[n % 20].id, meal_name=f"Mahlzeit {n}",
+                       carbs_grams=40, ke=4, be=3.3, consumed_at=now - timedelta(hours=4 * n))
+               for n in range(60))
+    db.commit()
+    return user
+
+
+def seed() -> dict:
+    init_db()
+    db = SessionLocal()
+    for index in range(2, 30):  # Fremde Daten, damit user_id wirklich filtert
+        seed_user(db, index)
+    user = seed_user(db, 0, stripe_customer_id="cus_plan_check")
+    tokens = {"main": create_access_token({"user_id": user.id})}
+    db.close()
+    return tokens
+
+
+def deletable_user_token() -> str:
+    db = SessionLocal()
+    stale = db.query(User).filter(User.email == "plan1@example.com").first()
+    if stale:
+        db.delete(stale)
+        db.commit()
+    user = seed_user(db, 1)
+    token = create_access_token({"user_id": user.id})
+    db.close()
+    return token
+
+
+def explain(statement: str, parameters) -> list:
+    conn = sqlite3.connect(CHECK_DB)
+    try:
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())]
+    finally:
+        conn.close()
+
+
+async def run_route(client, method, path, headers):
+    if method == "STRIPE":
+        async with AsyncSessionLocal() as db:
+            await _user_for_customer(db, "cus_plan_check")
+        return 200
+    response = await client.request(method, path, headers=headers)
+    return response.status_code
+
+
+async def check_routes(client, headers, verbose: bool) -> list:
+    """Alle Routen aufrufen und die Pläne prüfen → Liste der Probleme"""
+    problems = []
+    for name, method, path, expected, ordered in ROUTES:
+        route_headers = headers
+        if method == "DELETE":
+            # Wegwerf-User anlegen, bevor mitgeschnitten wird
+            route_headers = {"Authorization": f"Bearer {deletable_user_token()}"}
+        captured.clear()
+        status = await run_route(client, method, path, route_headers)
+        if status >= 400:
+            problems.append(f"{name}: HTTP {status}")
+            continue
+
+        used, route_problems = set(), []
+        for statement, parameters in list(captured):
+            plan = explain(statement, parameters)
+            used.update(re.findall(r"INDEX (\w+)", " ".join(plan)))
+            for line in plan:
+                match = SCAN.match(line)
+                if match and match.group(1) in USER_TABLES:
+                    route_problems.append(f"full scan: {line}")
+                if ordered and "TEMP B-TREE FOR ORDER BY" in line:
+                    route_problems.append(f"extra sort: {statement.split('FROM')[1].split()[0]}")
+            if verbose:
+                print(f"      {' '.join(statement.split())[:100]}")
+                for line in plan:
+                    print(f"         {line}")
+        route_problems += [f"index not used: {index}" for index in sorted(expected - used)]
+
+        print(f"   {'✅' if not route_problems else '❌'} {name:<24} {len(captured)} queries"
+              + (f"  ({'; '.join(dict.fromkeys(route_problems))})" if route_problems else ""))
+        problems += [f"{name}: {problem}" for problem in route_problems]
+    return problems
+
+
+async def main(args):
+    tokens = seed()
+    headers = {"Authorization": f"Bearer {tokens['main']}"}
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    with open(MIGRATION) as f:
+        migration_sql = f.read()
+    migration_indexes = re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", migration_sql)
+
+    print(f"\n🔎 Query Plan Check ({len(ROUTES)} routes, SQLite {sqlite3.sqlite_version})")
+    print("=" * 60)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        print("Schema from models (init_db):")
+        problems = await check_routes(client, headers, args.verbose)
+        check("Index plans with the model schema", not problems, f"({len(problems)} problems)")
+
+        conn = sqlite3.connect(CHECK_DB)
+        for index in migration_indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        conn.close()
+        print("\nSchema before migration 003 (indexes dropped):")
+        problems = await check_routes(client, headers, args.verbose)
+        check("Check detects the missing indexes", any("full scan" in problem for problem in problems),
+              f"({len(problems)} problems)")
+
+        conn = sqlite3.connect(CHECK_DB)
+        conn.executescript(migration_sql)
+        conn.close()
+        print("\nAfter migrations/003_add_user_query_indexes.sql:")
+        problems = await check_routes(client, headers, args.verbose)
+        check("Index plans after the migration", not problems, f"({len(problems)} problems)")
+
+    await async_engine.dispose()
+    engine.dispose()
+    print("=" * 60)
+    print(f"{sum(results)}/{len(results)} checks passed")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(CHECK_DB + suffix):
+            os.remove(CHECK_DB + suffix)
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN regression check for the hot routes")
+    parser.add_argument("--verbose", action="store_true", help="Abfragen und Pläne ausgeben")
+    asyncio.run(main(parser.parse_args()))
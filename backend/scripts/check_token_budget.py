@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Check: Adaptives Token-Budget gegen den Fake AI Server
+
+- Nach ein paar Anfragen sinkt num_predict von 2048 auf p95 × Marge
+- Modell "redet weiter" → Worst Case endet am gelernten Budget statt bei 2048 Tokens
+- Zu knappes Budget → abgeschnittene Antwort wird per Continuation vervollständigt
+  (blockierend und im Stream), danach steigt das Budget
+- Gemini liefert MAX_TOKENS ebenso → Continuation
+
+Usage:
+    python scripts/check_token_budget.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import time
+
+from scripts.fake_ai_server import FAKE_STATE, start_in_thread
+
+# Fake Server muss laufen, bevor der Generator (Singleton) importiert wird
+BASE_URL, _server = start_in_thread()
+os.environ["GOOGLE_AI_API_KEY"] = "fake-key"
+os.environ["GEMINI_BASE_URL"] = f"{BASE_URL}/v1beta"
+os.environ["OLLAMA_BASE_URL"] = BASE_URL
+os.environ["AI_TOKEN_BUDGET_MIN"] = "16"
+os.environ["AI_FANOUT_MODE"] = "serial"  # Budget pro Bucket prüfen, nicht Fan-out
+os.environ.setdefault("DEBUG", "True")
+
+from app.services.ai_recipe_generator import AIRecipeGenerator
+from app.services.recipe_stream_parser import IncrementalRecipeParser
+
+ARGS = dict(ingredients=["Tomate", "Zwiebel"], count=3, servings=2,
+            diet_profiles=None, diabetes_unit="KE", language="de")
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+
+async def main():
+    generator = AIRecipeGenerator()
+    estimator = generator.token_budget
+    key = estimator.bucket(3, "de", None)
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n🎯 Token Budget Check (fake server: {BASE_URL})")
+    print("=" * 60)
+    FAKE_STATE["token_delay"] = 0.001
+
+    check("Unknown bucket starts at default", estimator.budget(key) == 2048, f"({estimator.budget(key)})")
+    for _ in range(estimator.min_samples):
+        await generator.generate_recipes(**ARGS, user_tier="free")
+    learned = estimator.budget(key)
+    check("Budget learned from observed lengths", learned < 2048, f"({learned} tokens)")
+    check("Other counts extrapolated per recipe", estimator.budget(estimator.bucket(1, "de", None)) < learned,
+          f"(count=1: {estimator.budget(estimator.bucket(1, 'de', None))})")
+
+    # Worst Case: Modell redet nach dem JSON weiter bis zum Limit
+    FAKE_STATE["ramble_tokens"] = 3000
+    recipes, adaptive = await timed(generator.generate_recipes(**ARGS, user_tier="free"))
+    fixed = generator.token_budget
+    generator.token_budget = type(fixed)()  # frischer Schätzer = pauschal 2048
+    _, unbounded = await timed(generator.generate_recipes(**ARGS, user_tier="free"))
+    generator.token_budget = fixed
+    FAKE_STATE["ramble_tokens"] = 0
+    check("Rambling output still parses", len(recipes) == 3)
+    check("Worst case bounded by learned budget", adaptive < unbounded / 3,
+          f"({adaptive * 1000:.0f} ms vs {unbounded * 1000:.0f} ms with 2048)")
+    check("Rambling not learned as output length", estimator.budget(key) == learned)
+
+    # Zu knapp: jeder Fall eigener Bucket (Rezeptanzahl), Budget künstlich auf ~1/4 gedrückt
+    def tight(count):
+        bucket = estimator.bucket(count, "en", None)
+        for _ in range(estimator.min_samples):
+            estimator.record(bucket, 12 * count)
+        return {**ARGS, "count": count, "language": "en"}
+
+    before = dict(estimator.stats)
+    recipes = await generator.generate_recipes(**tight(3), user_tier="free")
+    check("Truncated Ollama output completed via continuation",
+          len(recipes) == 3 and estimator.stats["truncated"] == before["truncated"] + 1,
+          f"(continuations: {estimator.stats['continuations'] - before['continuations']})")
+
+    before = dict(estimator.stats)
+    parser = IncrementalRecipeParser()
+    streamed = []
+    async for token in generator.generate_with_streaming(**tight(2), user_tier="free"):
+        streamed.extend(parser.feed(token))
+    check("Truncated stream continued seamlessly",
+          len(streamed) == 2 and estimator.stats["truncated"] == before["truncated"] + 1,
+          f"({len(streamed)} recipes)")
+
+    before = dict(estimator.stats)
+    recipes = await generator.generate_recipes(**tight(4), user_tier="pro")
+    check("Gemini MAX_TOKENS completed via continuation",
+          len(recipes) == 4 and {r["ai_provider"] for r in recipes} == {"gemini"}
+          and estimator.stats["truncated"] == before["truncated"] + 1)
+
+    generator.max_continuations = 0
+    try:
+        await generator.generate_recipes(**tight(5), user_tier="free")
+        check("Without continuations the truncated JSON fails", False)
+    except ValueError:
+        check("Without continuations the truncated JSON fails", True)
+
+    await generator.aclose()
+    print("=" * 60)
+    print(f"Budget status: {estimator.status()}")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
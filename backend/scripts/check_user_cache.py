@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Check: User Cache (angemeldeter User ohne SELECT pro Request)
+
+Zählt die SELECTs auf `users` pro Request (Event-Hook auf beiden Engines):
+- warmer Cache: async Route, sync Route → 0 User-SELECTs
+- AI-Route (Rate Limiter + get_current_user): User wird pro Request nur
+  einmal aufgelöst und geteilt
+- Invalidierung: Stripe-Kündigung (echter Webhook-Handler) → Tier sofort
+  FREE, E-Mail-Verifizierung (echte Route) → sofort verifiziert
+- Write an der App vorbei (anderer Worker, rohes SQL) → spätestens nach
+  der TTL sichtbar (für den Check USER_CACHE_TTL_SECONDS=1)
+- Tageszähler: Rezepte eines anderen Workers bei warmem Cache gehen nicht
+  verloren (atomares UPDATE statt Snapshot += 1)
+
+Usage:
+    python scripts/check_user_cache.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CHECK_DB = "./database/check_user_cache.db"
+TTL_SECONDS = 1
+
+os.chdir(BACKEND_DIR)
+for suffix in ("", "-wal", "-shm"):
+    if os.path.exists(CHECK_DB + suffix):
+        os.remove(CHECK_DB + suffix)
+os.environ.update({
+    "DEBUG": "True",
+    "DATABASE_URL": f"sqlite:///{CHECK_DB}",
+    "SERVICE_WARMUP": "False",
+    "AI_SLOT_BACKEND": "local",
+    "OLLAMA_BASE_URL": "http://127.0.0.1:9",  # Stream-Route: nur der Zähler zählt, kein LLM nötig
+    "USER_CACHE_TTL_SECONDS": str(TTL_SECONDS),
+})
+
+import httpx
+from sqlalchemy import event, text
+
+from app.main import app
+from app.models.ingredient import Ingredient
+from app.models.user import SubscriptionTier, User
+from app.routes.email import generate_token
+from app.routes.stripe_routes import _handle_subscription_deleted
+from app.services.user_cache import user_cache
+from app.utils.database import AsyncSessionLocal, SessionLocal, async_engine, engine, init_db
+from app.utils.jwt import create_access_token
+from seed_recipe_db import seed_recipes
+
+user_selects = []
+
+
+def count_user_selects(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+        user_selects.append(statement)
+
+
+event.listen(engine, "before_cursor_execute", count_user_selects)
+event.listen(async_engine.sync_engine, "before_cursor_execute", count_user_selects)
+
+
+def seed():
+    init_db()
+    db = SessionLocal()
+    seed_recipes(db)
+    user = User(email="cache@example.com", username="cache", hashed_password="-",
+                subscription_tier=SubscriptionTier.PRO, stripe_customer_id="cus_cache_check",
+                email_verified=False)
+    db.add(user)
+    db.flush()
+    ingredient = Ingredient(user_id=user.id, name="Tomate")
+    db.add(ingredient)
+    db.commit()
+    result = (user.id, create_access_token({"user_id": user.id}), ingredient.id)
+    db.close()
+    return result
+
+
+async def main():
+    user_id, token, ingredient_id = seed()
+    headers = {"Authorization": f"Bearer {token}"}
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name} {detail}")
+
+    print(f"\n👤 User Cache Check (TTL {TTL_SECONDS}s)")
+    print("=" * 60)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def request(method, path, **kwargs):
+            user_selects.clear()
+            response = await client.request(method, path, headers=headers, **kwargs)
+            return response, len(user_selects)
+
+        # Kalt → warm
+        _, cold = await request("GET", "/api/recipes/history")
+        for path, kind in (("/api/recipes/history", "async"), ("/api/ingredients/", "sync")):
+            response, selects = await request("GET", path)
+            check(f"Warm {kind} route without user SELECT", response.status_code == 200 and selects == 0,
+                  f"({path}: {selects} SELECTs, cold request: {cold})")
+
+        # AI-Route: Rate Limiter + Dependency teilen sich die Auflösung. Die Route
+        # selbst lädt den User nach ihren Commits neu (Tageszähler) → Differenz kalt/warm
+        generate = {"ingredient_ids": [ingredient_id], "ai_provider": "mock", "servings": 2}
+        await request("POST", "/api/recipes/generate", json=generate)  # Tageszähler-Reset
+        await request("GET", "/api/recipes/history")
+        response, warm = await request("POST", "/api/recipes/generate", json=generate)
+        user_cache.clear()
+        response, cold = await request("POST", "/api/recipes/generate", json=generate)
+        check("AI route resolves the user once per request", response.status_code == 200 and cold - warm == 1,
+              f"(cold {cold} / warm {warm} SELECTs incl. the route's reloads after commit)")
+        response, selects = await request("GET", "/api/recipes/history")
+        check("Counter write invalidated the entry", selects == 1, f"({selects} SELECTs)")
+
+        # Anderer Worker zählt 5 Rezepte, während dieser Prozess den User gecacht hat
+        def recipe_count():
+            with engine.connect() as conn:
+                return conn.execute(text("SELECT daily_recipe_count FROM users WHERE id = :id"),
+                                    {"id": user_id}).scalar()
+
+        before = recipe_count()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE users SET daily_recipe_count = daily_recipe_count + 5 WHERE id = :id"),
+                         {"id": user_id})
+        # Stream-Route: zählt direkt nach dem Limit-Check (kein Commit dazwischen, der neu lädt)
+        await request("POST", "/api/recipes/generate/stream", json={**generate, "ai_provider": "ai"})
+        check("Counter writes of other workers are not lost", recipe_count() == before + 6,
+              f"({before} → {recipe_count()}, expected {before + 6})")
+
+        # Stripe-Kündigung über den echten Webhook-Handler
+        response, _ = await request("GET", "/api/recipe-db/search?limit=1")
+        before = response.status_code
+        async with AsyncSessionLocal() as db:
+            await _handle_subscription_deleted({"customer": "cus_cache_check"}, db)
+        response, _ = await request("GET", "/api/recipe-db/search?limit=1")
+        check("Tier downgrade visible immediately", before == 200 and response.status_code == 403,
+              f"(recipe-db search {before} → {response.status_code})")
+
+        # E-Mail-Verifizierung über die echte Route
+        response, _ = await request("GET", "/api/email/status")
+        before = response.json()["verified"]
+        await client.post("/api/email/verify", json={"token": generate_token("cache@example.com")})
+        response, _ = await request("GET", "/api/email/status")
+        check("Email verification visible immediately", before is False and response.json()["verified"] is True)
+
+        # Write an der App vorbei (anderer Worker) → erst nach der TTL
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE users SET subscription_tier = 'PRO' WHERE id = :id"), {"id": user_id})
+        stale, _ = await request("GET", "/api/recipe-db/search?limit=1")
+        time.sleep(TTL_SECONDS + 0.2)
+        fresh, _ = await request("GET", "/api/recipe-db/search?limit=1")
+        check("External write visible after the TTL", fresh.status_code == 200,
+              f"(within TTL {stale.status_code}, after {fresh.status_code})")
+
+    await async_engine.dispose()
+    engine.dispose()
+    print("=" * 60)
+    print(f"Cache stats: {user_cache.stats}")
+    print(f"{sum(results)}/{len(results)} checks passed")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(CHECK_DB + suffix):
+            os.remove(CHECK_DB + suffix)
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Fake AI Server - Gemini + Ollama API lokal nachgebaut (für Checks & Benchmarks)
+
+Endpoints:
+- POST /v1beta/models/{model}:generateContent
+- POST /v1beta/models/{model}:streamGenerateContent?alt=sse
+- GET  /v1beta/models/{model}  (Gemini Health Check)
+- POST /api/generate          (Ollama, stream true/false)
+- GET  /api/tags              (Ollama Health Check)
+- GET  /api/ps                (Ollama: geladene Modelle)
+
+Antwortet mit festen Rezepten, Latenzen über FAKE_STATE einstellbar
+(deterministisch: Fehlerinjektion über einen geseedeten Zufallsgenerator).
+Ein Token = ein Chunk (chunk_size Zeichen); num_predict / maxOutputTokens
+schneiden die Antwort ab (done_reason "length" / finishReason "MAX_TOKENS"),
+Continuation-Prompts bekommen den fehlenden Rest.
+
+Usage:
+    python scripts/fake_ai_server.py --port 8099 --tokens-per-second 8 --first-token-delay 1.5 \\
+        --ollama-parallel 1 --ollama-fail-rate 0.05 --seed 42
+    # Backend dagegen starten:
+    OLLAMA_BASE_URL=http://127.0.0.1:8099 GEMINI_BASE_URL=http://127.0.0.1:8099/v1beta \\
+        GOOGLE_AI_API_KEY=fake uvicorn app.main:app
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import threading
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Verhalten zur Laufzeit änderbar (Checks laufen im selben Prozess)
+FAKE_STATE = {
+    "first_token_delay": 0.05,  # Sekunden bis zum ersten Token
+    "gemini_first_token_delay": None,  # Überschreibt first_token_delay nur für Gemini
+    "token_delay": 0.002,  # Sekunden zwischen Tokens
+    "chunk_size": 12,  # Zeichen pro Token
+    "gemini_fail": False,  # Gemini antwortet mit 503
+    "ollama_fail": False,  # Ollama antwortet mit 503
+    "gemini_fail_rate": 0.0,  # Anteil zufälliger 503 (geseedet)
+    "ollama_fail_rate": 0.0,
+    "seed": 42,
+    "ollama_loaded": True,  # Modell im Speicher? (False → nächste Anfrage lädt)
+    "ollama_load_time": 0.0,  # Sekunden zum Laden des Modells
+    "ollama_keep_alive": [],  # keep_alive Werte der empfangenen Anfragen
+    "ollama_parallel": 0,  # Wie OLLAMA_NUM_PARALLEL: gleichzeitige Generierungen (0 = unbegrenzt)
+    "ramble_tokens": 0,  # Modell redet nach dem JSON weiter (Whitespace-Tokens bis zum Limit)
+    "requests": {"gemini": 0, "ollama": 0},
+}
+
+SAMPLE_RECIPE = {
+    "name": "Tomaten-Pfanne",
+    "description": "Schnelle Pfanne mit Tomaten und Kräutern.",
+    "difficulty": 2,
+    "cooking_time": "20 min",
+    "method": "pan",
+    "ingredients": [
+        {"name": "Tomate", "amount": "300g", "carbs": 9},
+        {"name": "Zwiebel", "amount": "1 piece", "carbs": 7},
+    ],
+    "nutrition_per_serving": {"calories": 180, "protein": 5, "carbs": 16, "fat": 9, "ke": 1.6},
+    "used_ingredients": ["Tomate", "Zwiebel"],
+    "leftover_tips": "Reste als Nudelsoße verwenden.",
+}
+
+
+_rng = random.Random(FAKE_STATE["seed"])
+
+
+def configure(**overrides):
+    """FAKE_STATE setzen; tokens_per_second → token_delay, seed → Zufallsgenerator neu"""
+    tokens_per_second = overrides.pop("tokens_per_second", None)
+    if tokens_per_second:
+        overrides["token_delay"] = 1.0 / tokens_per_second
+    FAKE_STATE.update(overrides)
+    if "seed" in overrides:
+        _rng.seed(overrides["seed"])
+
+
+def _should_fail(provider: str) -> bool:
+    if FAKE_STATE[f"{provider}_fail"]:
+        return True
+    rate = FAKE_STATE[f"{provider}_fail_rate"]
+    return rate > 0 and _rng.random() < rate
+
+
+def recipes_text(count: int = 3, first: int = 1) -> str:
+    recipes = [{**SAMPLE_RECIPE, "name": f"{SAMPLE_RECIPE['name']} {first + i}"} for i in range(count)]
+    return json.dumps(recipes, ensure_ascii=False, indent=2)
+
+
+CONTINUATION_MARKER = "This is what you wrote so far:\n"
+
+
+def completion(prompt: str, limit=None):
+    """Antwort auf einen Prompt → (Chunks, abgeschnitten?)"""
+    match = re.search(r"Generate (\d+) ", prompt)
+    variation = re.search(r"This is variation (\d+) of", prompt)
+    text = recipes_text(int(match.group(1)) if match else 3, int(variation.group(1)) if variation else 1)
+
+    if CONTINUATION_MARKER in prompt:
+        partial = prompt.split(CONTINUATION_MARKER, 1)[1].split("\n\nContinue EXACTLY", 1)[0]
+        if text.startswith(partial):
+            text = text[len(partial):]
+
+    chunks = list(_chunks(text)) + ["\n"] * FAKE_STATE["ramble_tokens"]
+    truncated = limit is not None and len(chunks) > limit
+    return (chunks[:limit] if truncated else chunks), truncated
+
+
+def _chunks(text: str):
+    size = FAKE_STATE["chunk_size"]
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def _first_token_delay(provider: str) -> float:
+    override = FAKE_STATE.get(f"{provider}_first_token_delay")
+    return FAKE_STATE["first_token_delay"] if override is None else override
+
+
+async def _timed_chunks(chunks, provider: str):
+    await asyncio.sleep(_first_token_delay(provider))
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(FAKE_STATE["token_delay"])
+
+
+def _generation_time(chunks, provider: str) -> float:
+    return _first_token_delay(provider) + FAKE_STATE["token_delay"] * len(chunks)
+
+
+def _gemini_request(body):
+    prompt = body["contents"][0]["parts"][0]["text"]
+    return completion(prompt, body.get("generationConfig", {}).get("maxOutputTokens"))
+
+
+def _gemini_chunk(text: str, finish_reason=None, tokens=None):
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}}
+    payload = {"candidates": [candidate]}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+        payload["usageMetadata"] = {"candidatesTokenCount": tokens}
+    return payload
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Fake AI Server")
+
+    ollama_slots = {}
+
+    def ollama_slot():
+        """Semaphore passend zu FAKE_STATE["ollama_parallel"] (0 = unbegrenzt)"""
+        parallel = FAKE_STATE["ollama_parallel"] or 10_000
+        if parallel not in ollama_slots:
+            ollama_slots[parallel] = asyncio.Semaphore(parallel)
+        return ollama_slots[parallel]
+
+    def unavailable(provider: str):
+        return JSONResponse(status_code=503, content={"error": f"{provider} unavailable (fake)"})
+
+    # --- Gemini ---
+
+    @app.get("/v1beta/models/{model}")
+    async def gemini_model(model: str):
+        if FAKE_STATE["gemini_fail"]:
+            return unavailable("gemini")
+        return {"name": f"models/{model}", "displayName": model}
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def gemini_generate(model: str, request: Request):
+        FAKE_STATE["requests"]["gemini"] += 1
+        if _should_fail("gemini"):
+            return unavailable("gemini")
+        chunks, truncated = _gemini_request(await request.json())
+        await asyncio.sleep(_generation_time(chunks, "gemini"))
+        return _gemini_chunk("".join(chunks), "MAX_TOKENS" if truncated else "STOP", len(chunks))
+
+    @app.post("/v1beta/models/{model}:streamGenerateContent")
+    async def gemini_stream(model: str, request: Request):
+        FAKE_STATE["requests"]["gemini"] += 1
+        if _should_fail("gemini"):
+            return unavailable("gemini")
+        chunks, truncated = _gemini_request(await request.json())
+
+        async def events():
+            sent = 0
+            async for chunk in _timed_chunks(chunks, "gemini"):
+                sent += 1
+                finish = ("MAX_TOKENS" if truncated else "STOP") if sent == len(chunks) else None
+                yield f"data: {json.dumps(_gemini_chunk(chunk, finish, sent))}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # --- Ollama ---
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        if FAKE_STATE["ollama_fail"]:
+            return unavailable("ollama")
+        return {"models": [{"name": "llama3.2"}]}
+
+    @app.get("/api/ps")
+    async def ollama_ps():
+        return {"models": [{"name": "llama3.2:latest"}] if FAKE_STATE["ollama_loaded"] else []}
+
+    async def load_model() -> int:
+        """Kaltstart simulieren → load_duration in ns"""
+        if FAKE_STATE["ollama_loaded"]:
+            return 1_000_000
+        await asyncio.sleep(FAKE_STATE["ollama_load_time"])
+        FAKE_STATE["ollama_loaded"] = True
+        return int(FAKE_STATE["ollama_load_time"] * 1e9)
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        FAKE_STATE["requests"]["ollama"] += 1
+        if _should_fail("ollama"):
+            return unavailable("ollama")
+
+        body = await request.json()
+        FAKE_STATE["ollama_keep_alive"].append(body.get("keep_alive"))
+        load_duration = await load_model()
+
+        # Leerer Prompt = nur laden (Keep-Warm)
+        if not body.get("prompt"):
+            return {"model": body.get("model"), "response": "", "done": True, "load_duration": load_duration}
+
+        chunks, truncated = completion(body["prompt"], body.get("options", {}).get("num_predict"))
+        final = {
+            "model": body.get("model"),
+            "done": True,
+            "done_reason": "length" if truncated else "stop",
+            "eval_count": len(chunks),
+            "load_duration": load_duration,
+        }
+
+        if not body.get("stream", True):
+            async with ollama_slot():
+                await asyncio.sleep(_generation_time(chunks, "ollama"))
+            return {**final, "response": "".join(chunks)}
+
+        async def lines():
+            async with ollama_slot():
+                async for chunk in _timed_chunks(chunks, "ollama"):
+                    yield json.dumps({"model": body.get("model"), "response": chunk, "done": False}) + "\n"
+            yield json.dumps({**final, "response": ""}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_in_thread(port: int = 0, app=None):
+    """Server (Default: Fake AI, sonst `app`) im Hintergrund-Thread starten → (base_url, server)"""
+    import uvicorn
+
+    port = port or free_port()
+    server = uvicorn.Server(uvicorn.Config(app or create_app(), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("Server did not start")
+        time.sleep(0.02)
+
+    return f"http://127.0.0.1:{port}", server
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Gemini/Ollama API server")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--first-token-delay", type=float, default=FAKE_STATE["first_token_delay"])
+    parser.add_argument("--token-delay", type=float, default=FAKE_STATE["token_delay"])
+    parser.add_argument("--tokens-per-second", type=float, help="Überschreibt --token-delay")
+    parser.add_argument("--ollama-parallel", type=int, default=0, help="Gleichzeitige Ollama-Decodes (0 = unbegrenzt)")
+    parser.add_argument("--ollama-load-time", type=float, default=0.0, help="Kaltstart des Modells in Sekunden")
+    parser.add_argument("--gemini-fail-rate", type=float, default=0.0)
+    parser.add_argument("--ollama-fail-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=FAKE_STATE["seed"])
+    args = parser.parse_args()
+
+    configure(
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        tokens_per_second=args.tokens_per_second,
+        ollama_parallel=args.ollama_parallel,
+        ollama_load_time=args.ollama_load_time,
+        ollama_loaded=args.ollama_load_time == 0,
+        gemini_fail_rate=args.gemini_fail_rate,
+        ollama_fail_rate=args.ollama_fail_rate,
+        seed=args.seed,
+    )
+
+    uvicorn.run(create_app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
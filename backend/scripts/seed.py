@@ -10,7 +10,6 @@ Usage:
 import sys
 import os
 from datetime import datetime, timedelta
-import json
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -165,9 +164,9 @@ def seed_recipes(db: Session, users):
                 cooking_time=recipe_data["cooking_time"],
                 method=recipe_data["method"],
                 servings=recipe_data["servings"],
-                used_ingredients=json.dumps([ing["name"] for ing in recipe_data["ingredients"]]),
-                ingredients_json=json.dumps(recipe_data["ingredients"]),
-                nutrition_json=json.dumps(recipe_data["nutrition"]),
+                used_ingredients=[ing["name"] for ing in recipe_data["ingredients"]],
+                ingredients_json=recipe_data["ingredients"],
+                nutrition_json=recipe_data["nutrition"],
                 ai_provider="seed"
             )
             db.add(recipe)
@@ -14,6 +14,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from sqlalchemy.orm import Session
 from app.utils.database import engine, Base
 from app.models.recipe_db import RecipeDB, RecipeDifficulty
+from app.services.ingredient_index import ingredient_index
+from app.services.recipe_fts import recipe_fts
 
 
 def seed_recipes(db: Session):
@@ -407,6 +409,10 @@ def main():
     Base.metadata.create_all(bind=engine)
     print("✅ Tables created")
 
+    # FTS5-Tabelle + Trigger (neue Rezepte werden automatisch indexiert)
+    if recipe_fts.ensure_schema(engine):
+        print("✅ Full-text index ready")
+
     # Create session
     from sqlalchemy.orm import sessionmaker
     SessionLocal = sessionmaker(bind=engine)
@@ -414,6 +420,11 @@ def main():
 
     try:
         seed_recipes(db)
+
+        # Zutaten-Index (Posting-Listen) komplett neu aufbauen
+        postings = ingredient_index.rebuild(db)
+        print(f"🔎 Ingredient index built ({postings} postings)")
+
         print("=" * 50)
         print("✅ Seeding completed!")
 
@@ -140,7 +140,7 @@ const Recipes = {
             <div style="padding: var(--spacing-xl);">
                 <div style="display: flex; align-items: center; gap: var(--spacing-sm); margin-bottom: var(--spacing-md); color: var(--text-muted);">
                     <div class="spinner" style="width: 20px; height: 20px;"></div>
-                    <span>${streamingMsg}</span>
+                    <span id="streaming-status">${streamingMsg}</span>
                 </div>
                 <div id="streaming-output" style="
                     font-family: monospace;
@@ -152,9 +152,10 @@ const Recipes = {
                     color: var(--text-light);
                 "></div>
             </div>
-        `;
+        `);
 
         const outputDiv = document.getElementById('streaming-output');
+        const statusSpan = document.getElementById('streaming-status');
 
         try {
             // Get active diet profiles
@@ -177,6 +178,35 @@ const Recipes = {
             });
 
             let fullText = '';
+            let streamedRecipes = [];
+
+            // Waiting for an AI slot: position + ETA (position 0 = slot granted, generation starts)
+            eventSource.addEventListener('queued', (event) => {
+                const status = JSON.parse(event.data);
+                if (status.position > 0) {
+                    statusSpan.textContent = i18n.currentLang === 'de'
+                        ? `⏳ In der Warteschlange: Platz ${status.position} (ca. ${status.eta_seconds}s)`
+                        : `⏳ In queue: position ${status.position} (about ${status.eta_seconds}s)`;
+                } else {
+                    statusSpan.textContent = streamingMsg;
+                }
+            });
+
+            // Queue full - server rejected the request (stream ends right after)
+            eventSource.addEventListener('rate_limit_exceeded', (event) => {
+                const detail = JSON.parse(event.data);
+                eventSource.close();
+                UI.error(detail.message || detail.error);
+                btn.disabled = false;
+                btn.textContent = i18n.t('recipes.generate');
+            });
+
+            // Server parses + saves each recipe as soon as it is complete
+            eventSource.addEventListener('recipe', (event) => {
+                streamedRecipes.push(JSON.parse(event.data));
+                this.generatedRecipes = streamedRecipes;
+                this.renderGeneratedRecipes();
+            });
 
             eventSource.onmessage = (event) => {
                 const data = JSON.parse(event.data);
@@ -192,6 +222,14 @@ const Recipes = {
                 if (data.done) {
                     eventSource.close();
 
+                    // Recipes already arrived as 'recipe' events
+                    if (streamedRecipes.length > 0) {
+                        UI.success(i18n.currentLang === 'de' ? 'Rezept fertig!' : 'Recipe complete!');
+                        btn.disabled = false;
+                        btn.textContent = i18n.t('recipes.generate');
+                        return;
+                    }
+
                     // Parse final JSON and display recipes
                     try {
                         // Extract JSON from fullText